@@ -12,6 +12,8 @@ parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, parent_dir)
 
 from qdrant_manager import QdrantManager
+from metrics import start_metrics_server
+from asset_server import start_asset_server
 import config
 
 # Page configuration
@@ -22,12 +24,49 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Storage directories (kept out of config so importing it has no side effects)
+config.ensure_directories()
+
+# Opt-in profiling: time QdrantManager/MetadataStore calls for this rerun.
+# Instrumenting patches classes for the whole process, so ?debug=1 only counts
+# when the operator allowed it in config
+profiling_enabled = config.PROFILING_ENABLED is True or (
+    config.PROFILING_ENABLED == "debug" and st.query_params.get("debug") == "1"
+)
+if profiling_enabled:
+    from profiling import RerunProfiler, instrument_app
+    instrument_app()
+    if 'profiler' not in st.session_state:
+        st.session_state.profiler = RerunProfiler(history_size=config.PROFILING_HISTORY)
+    script_profiler = st.session_state.get('profiling_script_profiler', "Off")
+    st.session_state.profiler.start_rerun(None if script_profiler == "Off" else script_profiler)
+
+# Local metrics endpoint, started once per process
+if config.METRICS_PORT:
+    start_metrics_server(config.METRICS_PORT, host=config.METRICS_HOST)
+
+# Model warm-up in the background, so the first upload or search does not wait for the weights
+if config.MODEL_WARMUP == "startup":
+    from embedding_model import start_warmup
+    start_warmup()
+
+# Asset server for the PDF viewer and thumbnails, started once per process
+if config.ASSET_SERVER_PORT:
+    start_asset_server(config.ASSET_SERVER_PORT, host=config.ASSET_SERVER_HOST)
+
 # Initialize session state
 if 'qdrant_manager' not in st.session_state:
     st.session_state.qdrant_manager = QdrantManager(
         url=config.QDRANT_URL,
         api_key=config.QDRANT_API_KEY
     )
+    # Re-enable indexing of collections whose bulk load crashed
+    st.session_state.qdrant_manager.recover_bulk_loads()
+
+# Scheduled storage reconciler, started once per process
+if config.RECONCILE_INTERVAL:
+    from reconciler import start_scheduled_reconcile
+    start_scheduled_reconcile(st.session_state.qdrant_manager, config.RECONCILE_INTERVAL)
 
 if 'selected_collection' not in st.session_state:
     st.session_state.selected_collection = None
@@ -90,3 +129,8 @@ elif st.session_state.page == "Manage":
 # Minimal Footer
 st.markdown("---")
 st.caption("Built with Streamlit, ColPali, and Qdrant | Document Vector Store Manager")
+
+if profiling_enabled:
+    st.session_state.profiler.end_rerun(page=st.session_state.page)
+    from views import profiling_panel
+    profiling_panel.render(st.session_state.profiler)
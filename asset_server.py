@@ -0,0 +1,262 @@
+"""
+Asset Server Module
+Small HTTP server, started alongside the Streamlit app, for the files the
+browser loads directly (the inline PDF viewer and page thumbnails):
+- /documents/<path>: PDFs under Documents/
+- /pages/<unique_id>/<page_number>: page images from the page archives
+- Byte ranges (206 Partial Content), so PDF viewers fetch only what they show
+- ETags and long Cache-Control lifetimes; URLs carry a version parameter,
+  so a replaced file gets a new URL instead of a stale cached copy
+The server has no authentication of its own: expose it only through the
+same proxy (and login) as the app, and point ASSET_PUBLIC_URL at that path.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+import config
+from page_store import PageStore
+
+CHUNK_SIZE = 256 * 1024
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _etag(size: int, mtime_ns: int) -> str:
+    return '"' + hashlib.sha1(f"{size}-{mtime_ns}".encode()).hexdigest()[:16] + '"'
+
+
+def _image_type(data: bytes) -> str:
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    return "image/png"
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range Range header
+
+    Returns:
+        Inclusive (start, end), None to send the whole file, or (-1, -1) if unsatisfiable
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if not match or not any(match.groups()):
+        # Multiple ranges and other units are legal to ignore: send the whole file
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or start > end:
+        return (-1, -1)
+    return (start, end)
+
+
+class _AssetHandler(BaseHTTPRequestHandler):
+    page_store: PageStore = None
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+    def do_GET(self):
+        self._serve(head=False)
+
+    def _serve(self, head: bool):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        try:
+            if path.startswith("/documents/"):
+                self._serve_document(path[len("/documents/"):], head)
+            elif path.startswith("/pages/"):
+                self._serve_page(path[len("/pages/"):], head)
+            else:
+                self.send_error(404)
+        except (BrokenPipeError, ConnectionResetError):
+            # The viewer cancels range requests it no longer needs
+            pass
+
+    def _serve_document(self, relative_path: str, head: bool):
+        root = os.path.realpath(self.page_store.documents_root)
+        file_path = os.path.realpath(os.path.join(root, relative_path))
+        if not file_path.startswith(root + os.sep) or not os.path.isfile(file_path):
+            self.send_error(404)
+            return
+        stat = os.stat(file_path)
+        etag = _etag(stat.st_size, stat.st_mtime_ns)
+        if self._not_modified(etag):
+            return
+
+        byte_range = None
+        if_range = self.headers.get("If-Range")
+        if not if_range or if_range == etag:
+            byte_range = parse_range(self.headers.get("Range"), stat.st_size)
+        if byte_range == (-1, -1):
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{stat.st_size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = byte_range or (0, stat.st_size - 1)
+        length = end - start + 1 if stat.st_size else 0
+        self.send_response(206 if byte_range else 200)
+        self._send_cache_headers(etag)
+        self.send_header("Content-Type", "application/pdf" if file_path.endswith(".pdf") else "application/octet-stream")
+        self.send_header("Content-Length", str(length))
+        if byte_range:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{stat.st_size}")
+        self.end_headers()
+        if head or not length:
+            return
+
+        with open(file_path, "rb") as f:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    def _serve_page(self, relative_path: str, head: bool):
+        unique_id, _, page = relative_path.rpartition("/")
+        if not unique_id or not page.isdigit():
+            self.send_error(404)
+            return
+        data = self.page_store.read_page(unique_id, int(page))
+        if data is None:
+            self.send_error(404)
+            return
+        etag = '"' + hashlib.sha1(data).hexdigest()[:16] + '"'
+        if self._not_modified(etag):
+            return
+        self.send_response(200)
+        self._send_cache_headers(etag)
+        self.send_header("Content-Type", _image_type(data))
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(data)
+
+    def _not_modified(self, etag: str) -> bool:
+        if_none_match = self.headers.get("If-None-Match")
+        if not if_none_match or etag not in [tag.strip() for tag in if_none_match.split(",")]:
+            return False
+        self.send_response(304)
+        self._send_cache_headers(etag)
+        self.end_headers()
+        return True
+
+    def _send_cache_headers(self, etag: str):
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", f"private, max-age={config.ASSET_CACHE_MAX_AGE}")
+        self.send_header("Accept-Ranges", "bytes")
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_failed = False
+_server_lock = threading.Lock()
+
+
+def start_asset_server(port: int, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """Serve documents and page images in a daemon thread; safe to call on every Streamlit rerun
+
+    Returns:
+        The running server, or None if the port could not be bound
+    """
+    global _server, _server_failed
+    with _server_lock:
+        if _server is None and not _server_failed:
+            handler = type("AssetHandler", (_AssetHandler,), {"page_store": PageStore()})
+            try:
+                _server = ThreadingHTTPServer((host, port), handler)
+            except OSError as e:
+                print(f"Asset server not started on {host}:{port}: {e}")
+                _server_failed = True
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="asset-server", daemon=True).start()
+            print(f"Serving documents at http://{host}:{_server.server_address[1]}/documents/")
+        return _server
+
+
+def _base_url() -> Optional[str]:
+    # Only a configured public URL is known to be reachable from the user's browser
+    # (a localhost or plain-HTTP address breaks for remote users and under HTTPS)
+    if config.ASSET_PUBLIC_URL:
+        return config.ASSET_PUBLIC_URL.rstrip("/")
+    return None
+
+
+def document_url(pdf_path: str) -> str:
+    """Browser URL of a stored PDF (asset server, or Streamlit static serving as a fallback)"""
+    relative_path = urllib.parse.quote(
+        os.path.relpath(pdf_path, config.BASE_STORAGE_PATH).replace(os.sep, "/")
+    )
+    base = _base_url()
+    if base is None:
+        # Files in 'static' at root are served at 'app/static/...' (static/documents -> Documents)
+        return f"/app/static/documents/{relative_path}"
+    # Version parameter: an updated PDF gets a new URL, so it can be cached for long
+    return f"{base}/documents/{relative_path}?v={os.stat(pdf_path).st_mtime_ns}"
+
+
+def page_url(unique_id: str, page_number: int) -> Optional[str]:
+    """Browser URL of a page image, or None without an asset server"""
+    base = _base_url()
+    if base is None:
+        return None
+    archive_path = PageStore().archive_path(unique_id)
+    version = os.stat(archive_path).st_mtime_ns if os.path.exists(archive_path) else 0
+    return f"{base}/pages/{urllib.parse.quote(unique_id)}/{int(page_number)}?v={version}"
+
+
+def linearize_pdf(path: str) -> bool:
+    """Rewrite a PDF linearized ("fast web view"), so viewers can show page 1 before the rest arrives
+
+    Uses pikepdf if installed, else the qpdf command line tool.
+
+    Returns:
+        True if the file was linearized
+    """
+    temp_path = path + ".linearized"
+    try:
+        try:
+            import pikepdf
+        except ImportError:
+            pikepdf = None
+        if pikepdf is not None:
+            with pikepdf.open(path) as pdf:
+                pdf.save(temp_path, linearize=True)
+        elif shutil.which("qpdf"):
+            completed = subprocess.run(
+                ["qpdf", "--linearize", path, temp_path], capture_output=True, text=True
+            )
+            # Exit code 3: written, with warnings
+            if completed.returncode not in (0, 3):
+                raise RuntimeError(completed.stderr.strip())
+        else:
+            print("Warning: PDF linearization needs pikepdf or qpdf; skipped")
+            return False
+        os.replace(temp_path, path)
+        return True
+    except Exception as e:
+        print(f"Warning: Could not linearize {path}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
@@ -0,0 +1,251 @@
+"""
+HNSW tuning harness: recall@k versus p50/p99 search latency for a sweep of
+index (m, ef_construct) and search-time (hnsw_ef) parameters. Recall is
+measured against exact search (exact=True) on the same collection.
+
+Synthetic pages and queries (default) need no model; a labeled query set
+runs real queries against copies of an existing collection:
+
+    python -m benchmarks.bench_hnsw --url http://localhost:6333 --documents 2000 --m 8,16,32 --hnsw-ef 16,64,256
+    python -m benchmarks.bench_hnsw --url http://localhost:6333 --collection docs --queries queries.jsonl
+
+A query set is a JSON-lines file of {"query": "...", "relevant": [[unique_document_id, page_number], ...]};
+"relevant" is optional and adds label recall to the results. The default
+in-memory Qdrant has no HNSW index (every search is exact), so tune against
+a server with --url.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import numpy as np
+import config
+from benchmarks.common import base_parser, emit, environment, parse_sizes, percentile
+from benchmarks.synthetic import QUERY_TOKENS, random_multivector
+
+COLLECTION_PREFIX = "bench_hnsw"
+
+
+@contextmanager
+def _scratch_catalog():
+    """Use a temporary catalog as the process-wide one while the benchmark runs"""
+    import metadata_store
+
+    root = tempfile.mkdtemp(prefix="docmanager-hnsw-")
+    previous = metadata_store._shared_store
+    metadata_store._shared_store = metadata_store.MetadataStore(os.path.join(root, "metadata.db"))
+    try:
+        yield
+    finally:
+        metadata_store._shared_store = previous
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _manager(url: str):
+    from qdrant_manager import QdrantManager
+    if url == ":memory:":
+        from qdrant_client import QdrantClient
+        return QdrantManager(client=QdrantClient(":memory:"))
+    return QdrantManager(url=url, api_key=config.QDRANT_API_KEY)
+
+
+def synthetic_pages(documents: int, pages_per_document: int, tokens: int, dim: int, queries: int, seed: int = 0):
+    """Random page multivectors plus queries made from noisy subsets of random pages' tokens
+
+    Returns:
+        (points, query multivectors)
+    """
+    from qdrant_client.http import models as qdrant_models
+
+    rng = np.random.default_rng(seed)
+    total = documents * pages_per_document
+    query_pages = set(rng.choice(total, size=min(queries, total), replace=False).tolist())
+    points, query_vectors = [], []
+    for index in range(total):
+        vector = random_multivector(rng, tokens, dim)
+        if index in query_pages:
+            picked = np.asarray(vector)[rng.choice(tokens, size=min(QUERY_TOKENS, tokens), replace=False)]
+            noisy = picked + rng.normal(scale=0.5 / np.sqrt(dim), size=picked.shape)
+            query_vectors.append(noisy / np.linalg.norm(noisy, axis=1, keepdims=True))
+        points.append(qdrant_models.PointStruct(
+            id=index,
+            vector=vector,
+            payload={
+                "unique_document_id": f"doc{index // pages_per_document:07d}",
+                "page_number": index % pages_per_document + 1,
+            },
+        ))
+    return points, query_vectors
+
+
+def load_queries(path: str, stub_model: bool = False):
+    """Embed a labeled query set
+
+    Returns:
+        (query multivectors, relevant (unique_document_id, page_number) sets)
+    """
+    from qdrant_client import QdrantClient
+    from qdrant_manager import QdrantManager
+    from search_engine import SearchEngine
+
+    with open(path, "r", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    model = processor = None
+    if stub_model:
+        from benchmarks.synthetic import StubColPaliModel, StubColPaliProcessor
+        model, processor = StubColPaliModel(), StubColPaliProcessor()
+    engine = SearchEngine(QdrantManager(client=QdrantClient(":memory:")), model=model, processor=processor)
+    embeddings = engine.embed_queries([row["query"] for row in rows])
+    relevant = [{(uid, int(page)) for uid, page in row.get("relevant", [])} for row in rows]
+    return embeddings, relevant
+
+
+def _search(manager, collection: str, query, top_k: int, params) -> List:
+    response = manager.client.query_points(
+        collection_name=collection,
+        query=np.asarray(query).tolist(),
+        limit=top_k,
+        search_params=params,
+        with_payload=["unique_document_id", "page_number"],
+    )
+    return response.points
+
+
+def sweep_search(manager, collection: str, queries, top_k: int, hnsw_efs: List[int], repeat: int,
+                 relevant: Optional[List[set]] = None) -> List[Dict]:
+    """Recall@k and latency of each hnsw_ef against exact search on one collection"""
+    from qdrant_client.http import models as qdrant_models
+
+    def run(params):
+        latencies, results = [], []
+        for _ in range(repeat):
+            results = []
+            for query in queries:
+                start = time.perf_counter()
+                results.append(_search(manager, collection, query, top_k, params))
+                latencies.append((time.perf_counter() - start) * 1000)
+        return results, latencies
+
+    exact_results, exact_latencies = run(qdrant_models.SearchParams(exact=True))
+    truth = [{point.id for point in points} for points in exact_results]
+
+    def summarize(label, results, latencies):
+        row = {
+            "hnsw_ef": label,
+            f"recall@{top_k}": float(np.mean([
+                len({point.id for point in points} & expected) / max(len(expected), 1)
+                for points, expected in zip(results, truth)
+            ])),
+            "p50_ms": percentile(latencies, 50),
+            "p99_ms": percentile(latencies, 99),
+        }
+        if relevant and any(relevant):
+            found = [
+                len({(p.payload["unique_document_id"], p.payload["page_number"]) for p in points} & labels) / len(labels)
+                for points, labels in zip(results, relevant) if labels
+            ]
+            row[f"label_recall@{top_k}"] = float(np.mean(found))
+        return row
+
+    rows = [summarize("exact", exact_results, exact_latencies)]
+    for hnsw_ef in hnsw_efs:
+        results, latencies = run(qdrant_models.SearchParams(hnsw_ef=hnsw_ef))
+        rows.append(summarize(hnsw_ef, results, latencies))
+    return rows
+
+
+def run(url: str = ":memory:", m_values: List[int] = (16,), ef_constructs: List[int] = (100,),
+        hnsw_efs: List[int] = (16, 32, 64, 128), top_k: int = 10, repeat: int = 3,
+        documents: int = 500, pages_per_document: int = 4, tokens: int = 32, dim: int = config.VECTOR_SIZE,
+        query_count: int = 50, collection: Optional[str] = None, queries_path: Optional[str] = None,
+        stub_model: bool = False, keep: bool = False) -> Dict:
+    # bulk_load and migrate_collection write to the catalog; keep the real one untouched
+    with _scratch_catalog():
+        manager = _manager(url)
+        relevant = None
+        if collection:
+            queries, relevant = load_queries(queries_path, stub_model)
+            points = None
+        else:
+            points, queries = synthetic_pages(documents, pages_per_document, tokens, dim, query_count)
+
+        runs = []
+        for m in m_values:
+            for ef_construct in ef_constructs:
+                name = f"{COLLECTION_PREFIX}_m{m}_ef{ef_construct}"
+                if name in manager.list_collections():
+                    manager.delete_collection(name)
+                started = time.perf_counter()
+                if points is None:
+                    if not manager.migrate_collection(collection, name, hnsw_m=m, ef_construct=ef_construct):
+                        raise RuntimeError(f"Could not copy '{collection}' into '{name}'")
+                else:
+                    manager.create_collection(name, dim, text_index=False, hnsw_m=m, ef_construct=ef_construct)
+                    with manager.bulk_load(name, wait=True):
+                        manager.client.upload_points(name, points, batch_size=256, wait=True)
+                build_seconds = time.perf_counter() - started
+
+                rows = sweep_search(manager, name, queries, top_k, hnsw_efs, repeat, relevant)
+                runs.append({"m": m, "ef_construct": ef_construct, "build_seconds": build_seconds, "curve": rows})
+                if not keep:
+                    manager.delete_collection(name)
+
+        return {
+            "url": url,
+            "source": collection or "synthetic",
+            "points": manager.count_points(collection) if collection else len(points),
+            "queries": len(queries),
+            "top_k": top_k,
+            "runs": runs,
+        }
+
+
+def print_curves(results: Dict):
+    """Recall versus latency table, one block per index configuration"""
+    top_k = results["top_k"]
+    for entry in results["runs"]:
+        print(f"\nm={entry['m']} ef_construct={entry['ef_construct']} (built in {entry['build_seconds']:.1f}s)",
+              file=sys.stderr)
+        print(f"{'hnsw_ef':>8} {'recall@' + str(top_k):>10} {'p50 ms':>8} {'p99 ms':>8}", file=sys.stderr)
+        for row in entry["curve"]:
+            print(f"{row['hnsw_ef']!s:>8} {row[f'recall@{top_k}']:>10.3f} {row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f}",
+                  file=sys.stderr)
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--url", default=":memory:", help="Qdrant server to tune (default: in-memory, no HNSW)")
+    parser.add_argument("--m", type=parse_sizes, default=[16], help="Comma-separated HNSW m values")
+    parser.add_argument("--ef-construct", type=parse_sizes, default=[100])
+    parser.add_argument("--hnsw-ef", type=parse_sizes, default=[16, 32, 64, 128])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--documents", type=int, default=500)
+    parser.add_argument("--pages-per-document", type=int, default=4)
+    parser.add_argument("--tokens", type=int, default=32, help="Vectors per synthetic page")
+    parser.add_argument("--query-count", type=int, default=50, help="Synthetic queries")
+    parser.add_argument("--collection", help="Copy this collection instead of synthetic pages (needs --queries)")
+    parser.add_argument("--queries", help="JSON-lines labeled query set")
+    parser.add_argument("--stub-model", action="store_true", help="Embed --queries with the stub model")
+    parser.add_argument("--keep", action="store_true", help="Keep the tuned collections")
+    args = parser.parse_args()
+    if args.collection and not args.queries:
+        parser.error("--collection needs --queries")
+
+    results = run(
+        url=args.url, m_values=args.m, ef_constructs=args.ef_construct, hnsw_efs=args.hnsw_ef,
+        top_k=args.top_k, repeat=args.repeat, documents=args.documents,
+        pages_per_document=args.pages_per_document, tokens=args.tokens, query_count=args.query_count,
+        collection=args.collection, queries_path=args.queries, stub_model=args.stub_model, keep=args.keep,
+    )
+    print_curves(results)
+    emit({"benchmark": "hnsw", "environment": environment(), "results": results}, args.output)
+
+
+if __name__ == "__main__":
+    main()
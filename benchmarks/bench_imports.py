@@ -0,0 +1,113 @@
+"""
+Import-time benchmark: cumulative `python -X importtime` cost of the modules on
+the app's startup path, checked against per-module budgets. Heavy model
+dependencies must only be imported once they are needed (e.g. when processing
+starts), never as a side effect of importing these modules.
+
+    python -m benchmarks.bench_imports --output imports.json
+    python -m benchmarks.bench_imports --check   # exit 1 when over budget
+
+CI runs the --check form from the repository root as a gate; it also works
+as `python benchmarks/bench_imports.py --check`.
+"""
+
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if __package__ in (None, ""):
+    # Run as a script: make the `benchmarks` package importable
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.common import base_parser, emit, environment
+
+# Cumulative import time budget per module, in milliseconds (best of --repeat runs).
+# The views include streamlit itself, which accounts for most of their budget.
+IMPORT_BUDGETS_MS = {
+    "config": 25,
+    "metadata_store": 60,
+    "document_processor": 250,
+    "views.home_page": 1500,
+    "views.collections_page": 1500,
+    "views.upload_page": 1500,
+    "views.manage_page": 1500,
+}
+
+# Must not be imported by any module above
+HEAVY_MODULES = ("torch", "transformers", "colpali_engine", "pdf2image", "PyPDF2", "tqdm")
+
+
+def import_profile(module: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds of every module imported by `import module`"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+    profile = {}
+    for line in completed.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def run(modules: List[str], repeat: int = 3) -> Dict:
+    results = []
+    for module in modules:
+        best = None
+        for _ in range(repeat):
+            profile = import_profile(module)
+            if best is None or profile[module] < best[module]:
+                best = profile
+        budget = IMPORT_BUDGETS_MS.get(module)
+        cumulative_ms = best[module] / 1000
+        heavy = sorted(name for name in best if name.split(".")[0] in HEAVY_MODULES and "." not in name)
+        results.append({
+            "module": module,
+            "cumulative_ms": cumulative_ms,
+            "budget_ms": budget,
+            "heavy_imports": heavy,
+            "ok": (budget is None or cumulative_ms <= budget) and not heavy,
+        })
+    return {"repeat": repeat, "runs": results}
+
+
+def check(repeat: int = 3) -> List[str]:
+    """Return one message per module that is over budget or imports a heavy dependency"""
+    problems = []
+    for result in run(list(IMPORT_BUDGETS_MS), repeat)["runs"]:
+        if result["heavy_imports"]:
+            problems.append(f"{result['module']} imports {', '.join(result['heavy_imports'])}")
+        if result["cumulative_ms"] > result["budget_ms"]:
+            problems.append(
+                f"{result['module']} takes {result['cumulative_ms']:.0f} ms to import "
+                f"(budget {result['budget_ms']} ms)"
+            )
+    return problems
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--modules", help="Comma-separated modules (default: all budgeted modules)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 when a budget is exceeded")
+    args = parser.parse_args()
+
+    modules = args.modules.split(",") if args.modules else list(IMPORT_BUDGETS_MS)
+    results = run(modules, args.repeat)
+    emit({"benchmark": "imports", "environment": environment(), "results": results}, args.output)
+    if args.check and not all(result["ok"] for result in results["runs"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Ingestion benchmark: DocumentProcessor.process_document on synthetic PDFs with
+a stub model and an in-memory Qdrant, reporting pages/sec overall and per stage.
+
+    python -m benchmarks.bench_ingest --pages 10,50 --output ingest.json
+"""
+
+import os
+import shutil
+import time
+from typing import Dict, List
+from benchmarks.common import base_parser, emit, environment, parse_sizes, peak_rss_bytes
+from benchmarks.synthetic import StubColPaliModel, StubColPaliProcessor, isolated_storage, make_pdf
+
+
+def run(page_counts: List[int], batch_size: int = 4, convert_batch_size: int = 10) -> Dict:
+    if shutil.which("pdftoppm") is None:
+        # pdf2image needs poppler to rasterize; everything else here is pure Python
+        return {"skipped": "poppler (pdftoppm) is not installed"}
+
+    from qdrant_client import QdrantClient
+    from qdrant_manager import QdrantManager
+    from document_processor import DocumentProcessor
+    from metadata_store import MetadataStore
+
+    results = []
+    for pages in page_counts:
+        with isolated_storage() as root:
+            client = QdrantClient(":memory:")
+            QdrantManager(client=client).create_collection("bench")
+            processor = DocumentProcessor(
+                "bench",
+                client=client,
+                model=StubColPaliModel(),
+                processor=StubColPaliProcessor(),
+                metadata_store=MetadataStore(os.path.join(root, "metadata.db")),
+            )
+            pdf_path = make_pdf(os.path.join(root, "input.pdf"), pages)
+
+            events = []
+            start = time.perf_counter()
+            processor.process_document(
+                pdf_path,
+                f"synthetic_{pages}.pdf",
+                batch_size=batch_size,
+                convert_batch_size=convert_batch_size,
+                event_callback=events.append,
+            )
+            elapsed = time.perf_counter() - start
+
+            stage_seconds = events[-1]["stage_seconds"] if events else {}
+            results.append({
+                "pages": pages,
+                "seconds": elapsed,
+                "pages_per_second": pages / elapsed,
+                "stage_seconds": stage_seconds,
+                "stage_pages_per_second": {
+                    stage: pages / seconds for stage, seconds in stage_seconds.items() if seconds > 0
+                },
+                "peak_rss_bytes": peak_rss_bytes(),
+            })
+    return {"batch_size": batch_size, "convert_batch_size": convert_batch_size, "runs": results}
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--pages", type=parse_sizes, default=[10, 50], help="Comma-separated page counts")
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--convert-batch-size", type=int, default=10)
+    args = parser.parse_args()
+    emit({
+        "benchmark": "ingest",
+        "environment": environment(),
+        "results": run(args.pages, args.batch_size, args.convert_batch_size),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Listing benchmark: latency of QdrantManager document listing and statistics
+versus collection size, against an in-memory Qdrant.
+
+    python -m benchmarks.bench_listing --documents 100,1000 --output listing.json
+"""
+
+from typing import Dict, List
+from benchmarks.common import base_parser, emit, environment, measure, parse_sizes, peak_rss_bytes
+from benchmarks.synthetic import seed_collection
+
+
+def run(document_counts: List[int], pages_per_document: int = 10, repeat: int = 5) -> Dict:
+    from qdrant_client import QdrantClient
+    from qdrant_manager import QdrantManager
+
+    results = []
+    for documents in document_counts:
+        manager = QdrantManager(client=QdrantClient(":memory:"))
+        manager.create_collection("bench")
+        seed_collection(manager.client, "bench", documents, pages_per_document)
+
+        results.append({
+            "documents": documents,
+            "points": documents * pages_per_document,
+            "list_documents_in_collection": measure(
+                lambda: manager.list_documents_in_collection("bench"), repeat
+            ),
+            "count_documents": measure(lambda: manager.count_documents("bench"), repeat),
+            "get_collection_stats": measure(lambda: manager.get_collection_stats("bench"), repeat),
+            "peak_rss_bytes": peak_rss_bytes(),
+        })
+    return {"pages_per_document": pages_per_document, "runs": results}
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--documents", type=parse_sizes, default=[100, 1000], help="Comma-separated document counts")
+    parser.add_argument("--pages-per-document", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    emit({
+        "benchmark": "listing",
+        "environment": environment(),
+        "results": run(args.documents, args.pages_per_document, args.repeat),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
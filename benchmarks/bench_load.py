@@ -0,0 +1,252 @@
+"""
+Concurrent-user load test of the Streamlit app: every simulated user is an
+AppTest session running app.py in its own thread, against one shared
+in-memory Qdrant seeded with N collections of M documents (and their catalog
+entries). Reports script render latency percentiles and Qdrant round trips
+per page as users and data size grow.
+
+    python -m benchmarks.bench_load --users 1,8,32 --documents 100,1000 --output load.json
+    python -m benchmarks.bench_load --baseline load.json --tolerance 0.25
+
+With --baseline, the run fails (exit code 1) when a page's p95 render time
+grows by more than --tolerance (and --min-delta-ms), or its mean round trips
+grow by more than --tolerance, against the same (users, documents) entry of
+a previous result file.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+import numpy as np
+import config
+from benchmarks.common import base_parser, emit, environment, parse_sizes, percentile
+from benchmarks.synthetic import seed_collection
+
+APP_PATH = os.path.join(config.APP_DIR, "app.py")
+PAGES = ["Home", "Collections", "Upload", "Manage"]
+
+
+def _configure_app(root: str):
+    """Point the app at an in-memory Qdrant and a scratch catalog, with profiling on"""
+    import metadata_store
+
+    config.QDRANT_URL = ":memory:"
+    config.METRICS_PORT = 0
+    config.ASSET_SERVER_PORT = 0
+    config.MODEL_WARMUP = "off"
+    # The profiler records each rerun's script time and Qdrant round trips
+    config.PROFILING_ENABLED = True
+    config.BASE_STORAGE_PATH = os.path.join(root, "Documents")
+    config.IMAGES_BASE_PATH = os.path.join(root, "Images")
+    config.VECTOR_STORE_PATH = os.path.join(root, "VectorStore")
+    metadata_store._shared_store = metadata_store.MetadataStore(os.path.join(root, "metadata.db"))
+
+
+def _allow_concurrent_sessions():
+    """AppTest installs a mock Runtime for each run and removes it when the run
+    ends, which breaks other sessions still running; keep the last one in place
+    """
+    from streamlit.runtime.runtime import Runtime
+
+    if getattr(Runtime, "_load_test_patched", False):
+        return
+    original = Runtime.instance.__func__
+    last = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last["runtime"] = cls._instance
+            return cls._instance
+        return last["runtime"] if "runtime" in last else original(cls)
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or "runtime" in last)
+    Runtime._load_test_patched = True
+
+
+def seed(collections: int, documents: int, pages_per_document: int) -> List[str]:
+    """Create `collections` collections of `documents` documents and catalog them
+
+    Returns:
+        The collection names
+    """
+    from metadata_store import get_metadata_store
+    from qdrant_manager import QdrantManager
+
+    manager = QdrantManager(url=":memory:")
+    store = get_metadata_store()
+    names = []
+    for index in range(collections):
+        name = f"load_{documents}_{index}"
+        if name in manager.list_collections():
+            manager.delete_collection(name)
+        manager.create_collection(name)
+        prefix = f"{name}_doc"
+        seed_collection(manager.client, name, documents, pages_per_document, id_prefix=prefix)
+        store.backfill_collection(name, manager.list_documents_in_collection(name))
+        names.append(name)
+    return names
+
+
+def _user(rounds: int, think_seconds: float, samples: Dict[str, List], errors: List[str], lock: threading.Lock):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(APP_PATH, default_timeout=300)
+    # First round warms this session (imports, model-free page setup); not measured
+    for round_index in range(rounds + 1):
+        for page in PAGES:
+            app.session_state["page"] = page
+            started = time.perf_counter()
+            app.run()
+            wall_ms = (time.perf_counter() - started) * 1000
+            record = app.session_state["profiler"].history[-1]
+            with lock:
+                if app.exception:
+                    errors.append(f"{page}: {app.exception[0].message}")
+                if round_index:
+                    samples.setdefault(page, []).append((record["total_ms"], wall_ms, record["round_trips"]))
+            if think_seconds:
+                time.sleep(think_seconds)
+
+
+def run_users(users: int, rounds: int, think_seconds: float = 0.0) -> Dict:
+    """Run `users` concurrent sessions through every page `rounds` times"""
+    samples: Dict[str, List] = {}
+    errors: List[str] = []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=_user, args=(rounds, think_seconds, samples, errors, lock), daemon=True)
+        for _ in range(users)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - started
+
+    pages = {}
+    for page, page_samples in samples.items():
+        render = [sample[0] for sample in page_samples]
+        pages[page] = {
+            "renders": len(render),
+            "p50_ms": percentile(render, 50),
+            "p95_ms": percentile(render, 95),
+            "p99_ms": percentile(render, 99),
+            "wall_p95_ms": percentile([sample[1] for sample in page_samples], 95),
+            "round_trips_mean": float(np.mean([sample[2] for sample in page_samples])),
+            "round_trips_max": int(max(sample[2] for sample in page_samples)),
+        }
+    renders = sum(page["renders"] for page in pages.values())
+    return {
+        "users": users,
+        "seconds": seconds,
+        "renders_per_second": renders / seconds if seconds else 0.0,
+        "pages": pages,
+        "errors": errors[:20],
+    }
+
+
+def run(user_counts: List[int], document_counts: List[int], collections: int = 2,
+        pages_per_document: int = 5, rounds: int = 3, think_seconds: float = 0.0) -> Dict:
+    root = tempfile.mkdtemp(prefix="docmanager-load-")
+    try:
+        _configure_app(root)
+        _allow_concurrent_sessions()
+        runs = []
+        for documents in document_counts:
+            seed(collections, documents, pages_per_document)
+            for users in user_counts:
+                print(f"{users} user(s), {collections} x {documents} documents...", file=sys.stderr)
+                result = run_users(users, rounds, think_seconds)
+                result["documents"] = documents
+                runs.append(result)
+        return {
+            "collections": collections,
+            "pages_per_document": pages_per_document,
+            "rounds": rounds,
+            "runs": runs,
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """Regressions of `results` against a previous run
+
+    Returns:
+        One message per regressed (users, documents, page)
+    """
+    previous = {(entry["users"], entry["documents"]): entry for entry in baseline["runs"]}
+    regressions = []
+    for entry in results["runs"]:
+        base = previous.get((entry["users"], entry["documents"]))
+        if base is None:
+            continue
+        for page, stats in entry["pages"].items():
+            base_stats = base["pages"].get(page)
+            if base_stats is None:
+                continue
+            label = f"{page} ({entry['users']} users, {entry['documents']} documents)"
+            limit = base_stats["p95_ms"] * (1 + tolerance)
+            if stats["p95_ms"] > limit and stats["p95_ms"] - base_stats["p95_ms"] > min_delta_ms:
+                regressions.append(f"{label}: p95 {stats['p95_ms']:.1f} ms, was {base_stats['p95_ms']:.1f} ms")
+            if stats["round_trips_mean"] > base_stats["round_trips_mean"] * (1 + tolerance) + 0.5:
+                regressions.append(
+                    f"{label}: {stats['round_trips_mean']:.1f} Qdrant round trips, was {base_stats['round_trips_mean']:.1f}"
+                )
+    return regressions
+
+
+def print_table(results: Dict):
+    print(f"{'users':>5} {'docs':>6} {'page':<12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'trips':>6}", file=sys.stderr)
+    for entry in results["runs"]:
+        for page in PAGES:
+            stats = entry["pages"].get(page)
+            if stats:
+                print(f"{entry['users']:>5} {entry['documents']:>6} {page:<12} {stats['p50_ms']:>8.1f} "
+                      f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['round_trips_mean']:>6.1f}",
+                      file=sys.stderr)
+        for error in entry["errors"]:
+            print(f"  error: {error}", file=sys.stderr)
+
+
+def main():
+    import json
+
+    parser = base_parser(__doc__)
+    parser.add_argument("--users", type=parse_sizes, default=[1, 4, 16], help="Comma-separated concurrent users")
+    parser.add_argument("--documents", type=parse_sizes, default=[100, 1000], help="Documents per collection")
+    parser.add_argument("--collections", type=int, default=2)
+    parser.add_argument("--pages-per-document", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=3, help="Measured visits of every page per user")
+    parser.add_argument("--think", type=float, default=0.0, help="Seconds each user waits between pages")
+    parser.add_argument("--baseline", help="Previous result file to gate regressions against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative growth")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore p95 growth below this")
+    args = parser.parse_args()
+
+    results = run(args.users, args.documents, args.collections, args.pages_per_document, args.rounds, args.think)
+    print_table(results)
+    output = {"benchmark": "load", "environment": environment(), "results": results}
+    regressions: Optional[List[str]] = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline.get("results", baseline), args.tolerance, args.min_delta_ms)
+        output["regressions"] = regressions
+    emit(output, args.output)
+
+    errors = [error for entry in results["runs"] for error in entry["errors"]]
+    if regressions:
+        print("Regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+    if regressions or errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
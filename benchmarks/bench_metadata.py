@@ -0,0 +1,66 @@
+"""
+Metadata catalog benchmark: MetadataStore operation latency versus the number
+of cataloged documents.
+
+    python -m benchmarks.bench_metadata --documents 1000,10000 --output metadata.json
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List
+from benchmarks.common import base_parser, emit, environment, measure, parse_sizes
+from benchmarks.synthetic import catalog_entry
+
+
+def run(document_counts: List[int], repeat: int = 20) -> Dict:
+    from metadata_store import MetadataStore
+
+    results = []
+    for documents in document_counts:
+        root = tempfile.mkdtemp(prefix="docmanager-bench-")
+        try:
+            store = MetadataStore(os.path.join(root, "metadata.db"))
+            entries = [catalog_entry(i) for i in range(documents)]
+
+            start = time.perf_counter()
+            for entry in entries:
+                store.add_document(entry["unique_id"], entry)
+            insert_seconds = time.perf_counter() - start
+
+            probe = entries[len(entries) // 2]
+            last_page_offset = max(0, documents - 20)
+            results.append({
+                "documents": documents,
+                "add_document_avg_ms": insert_seconds / documents * 1000,
+                "get_document": measure(lambda: store.get_document(probe["unique_id"]), repeat),
+                "count_documents": measure(lambda: store.count_documents("bench"), repeat),
+                "list_first_page": measure(lambda: store.list_documents("bench", limit=20), repeat),
+                "list_last_page": measure(
+                    lambda: store.list_documents("bench", limit=20, offset=last_page_offset), repeat
+                ),
+                "search_substring": measure(lambda: store.search_documents("arterly sum", "bench", "substring"), repeat),
+                "search_prefix": measure(lambda: store.search_documents("Report 12", "bench", "prefix"), repeat),
+                "search_token": measure(lambda: store.search_documents("quart summ", "bench", "token"), repeat),
+                "database_bytes": os.path.getsize(store.storage_path),
+            })
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    return {"runs": results}
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--documents", type=parse_sizes, default=[1000, 10000], help="Comma-separated document counts")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    emit({
+        "benchmark": "metadata",
+        "environment": environment(),
+        "results": run(args.documents, args.repeat),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
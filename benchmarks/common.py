@@ -0,0 +1,72 @@
+"""
+Shared helpers for the benchmark scripts: timing and JSON output
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+
+def measure(fn: Callable, repeat: int = 5) -> Dict[str, float]:
+    """Run `fn` `repeat` times and return latency statistics in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": statistics.median(samples),
+        "min_ms": samples[0],
+        "max_ms": samples[-1],
+        "repeat": repeat,
+    }
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """q-th percentile (0-100) of `samples`, linearly interpolated"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+
+
+def parse_sizes(value: str):
+    return [int(v) for v in value.split(",") if v]
+
+
+def base_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--output", help="Write JSON results to this file (default: stdout)")
+    return parser
+
+
+def emit(results: Dict, output: str = None):
+    text = json.dumps(results, indent=2, default=str)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
@@ -0,0 +1,70 @@
+"""
+Runs every benchmark in its own process (so peak RSS is per benchmark) and
+writes one combined JSON document for regression tracking.
+
+    python -m benchmarks.run_benchmarks --output bench_results.json
+    python -m benchmarks.run_benchmarks --only metadata,listing --quick
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.common import base_parser, emit, environment
+
+BENCHMARKS = {
+    "hnsw": ["--documents", "500", "--m", "8,16", "--hnsw-ef", "16,64,128"],
+    "imports": ["--repeat", "3"],
+    "ingest": ["--pages", "10,50"],
+    "listing": ["--documents", "100,1000,5000"],
+    "load": ["--users", "1,8,32", "--documents", "100,1000"],
+    "metadata": ["--documents", "1000,10000,50000"],
+}
+
+QUICK = {
+    "hnsw": ["--documents", "50", "--query-count", "10", "--repeat", "1"],
+    "imports": ["--repeat", "1"],
+    "ingest": ["--pages", "4"],
+    "listing": ["--documents", "50,200"],
+    "load": ["--users", "1,4", "--documents", "50", "--rounds", "1"],
+    "metadata": ["--documents", "500,2000"],
+}
+
+
+def run_benchmark(name: str, args) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json") as tmp:
+        completed = subprocess.run(
+            [sys.executable, "-m", f"benchmarks.bench_{name}", *args, "--output", tmp.name],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        if completed.returncode != 0:
+            return {"benchmark": name, "error": completed.stderr[-2000:]}
+        with open(tmp.name) as f:
+            return json.load(f)
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument("--only", help="Comma-separated subset of: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--quick", action="store_true", help="Small sizes for a smoke run")
+    args = parser.parse_args()
+
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    presets = QUICK if args.quick else BENCHMARKS
+    results = {}
+    for name in selected:
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = run_benchmark(name, presets[name])
+
+    emit({
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "benchmarks": results,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
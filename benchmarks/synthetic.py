@@ -0,0 +1,146 @@
+"""
+Synthetic inputs for the offline benchmarks:
+- Multi-page PDFs drawn with Pillow
+- A stub ColPali model/processor with ColQwen2.5-like output shapes
+- Bulk seeding of collections and the metadata catalog
+- Isolated temporary storage so benchmarks never touch real data
+"""
+
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from typing import List
+import numpy as np
+from PIL import Image, ImageDraw
+import config
+
+# ColQwen2.5 produces roughly this many 128-d vectors per rendered page / query
+IMAGE_TOKENS = 768
+QUERY_TOKENS = 20
+
+
+def make_pdf(path: str, pages: int, size=(850, 1100), seed: int = 0) -> str:
+    """Write a PDF with `pages` pages of lines and text blocks (100 dpi Letter by default)"""
+    rng = np.random.default_rng(seed)
+    images = []
+    for page in range(pages):
+        image = Image.new("RGB", size, "white")
+        draw = ImageDraw.Draw(image)
+        draw.text((60, 40), f"Synthetic page {page + 1}", fill="black")
+        for _ in range(40):
+            x, y = int(rng.integers(40, size[0] - 300)), int(rng.integers(80, size[1] - 40))
+            draw.line((x, y, x + int(rng.integers(50, 300)), y), fill="black", width=2)
+        images.append(image)
+    images[0].save(path, save_all=True, append_images=images[1:], resolution=100.0)
+    return path
+
+
+class StubBatch(dict):
+    """Processor output that, like transformers' BatchFeature, supports .to()"""
+
+    def to(self, device):
+        return self
+
+
+class StubColPaliProcessor:
+    """Stands in for ColQwen2_5_Processor; only produces tensors of the right shape"""
+
+    def __init__(self, image_tokens: int = IMAGE_TOKENS, query_tokens: int = QUERY_TOKENS):
+        self.image_tokens = image_tokens
+        self.query_tokens = query_tokens
+
+    def process_images(self, images):
+        import torch
+        return StubBatch(attention_mask=torch.ones(len(images), self.image_tokens, dtype=torch.long))
+
+    def process_queries(self, queries):
+        import torch
+        return StubBatch(attention_mask=torch.ones(len(queries), self.query_tokens, dtype=torch.long))
+
+
+class StubColPaliModel:
+    """Stands in for ColQwen2_5: random unit vectors in bfloat16 on the CPU"""
+
+    def __init__(self, dim: int = config.VECTOR_SIZE, seed: int = 0):
+        import torch
+        self.dim = dim
+        self.device = torch.device("cpu")
+        self._generator = torch.Generator().manual_seed(seed)
+
+    def eval(self):
+        return self
+
+    def __call__(self, attention_mask=None, **kwargs):
+        import torch
+        n, tokens = attention_mask.shape
+        embeddings = torch.randn(n, tokens, self.dim, generator=self._generator)
+        embeddings = embeddings / embeddings.norm(dim=-1, keepdim=True)
+        return embeddings.to(torch.bfloat16) * attention_mask.unsqueeze(-1)
+
+
+def random_multivector(rng: np.random.Generator, tokens: int, dim: int) -> List[List[float]]:
+    vectors = rng.normal(size=(tokens, dim)).astype(np.float32)
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).tolist()
+
+
+def seed_collection(client, collection_name: str, documents: int, pages_per_document: int,
+                    tokens: int = 8, dim: int = config.VECTOR_SIZE, seed: int = 0, id_prefix: str = "doc"):
+    """Upsert documents*pages_per_document page points with the payload ingestion writes"""
+    from qdrant_client.http import models as qdrant_models
+
+    rng = np.random.default_rng(seed)
+    batch = []
+    for doc in range(documents):
+        unique_id = f"{id_prefix}{doc:07d}"
+        for page in range(1, pages_per_document + 1):
+            batch.append(qdrant_models.PointStruct(
+                id=str(uuid.uuid4()),
+                vector=random_multivector(rng, tokens, dim),
+                payload={
+                    "document_name": f"Document {doc}.pdf",
+                    "unique_document_id": unique_id,
+                    "page_number": page,
+                    "timestamp": "2024-01-01_00-00-00",
+                    "total_pages": pages_per_document,
+                },
+            ))
+            if len(batch) >= 256:
+                client.upsert(collection_name=collection_name, points=batch)
+                batch = []
+    if batch:
+        client.upsert(collection_name=collection_name, points=batch)
+
+
+def catalog_entry(index: int, collection: str = "bench") -> dict:
+    unique_id = f"Report {index} {uuid.uuid4().hex[:6]}_2024-01-01_00-00-00"
+    return {
+        "unique_id": unique_id,
+        "original_name": f"Report {index} quarterly summary.pdf",
+        "total_pages": index % 300 + 1,
+        "upload_date": f"2024-01-{index % 28 + 1:02d}_00-00-00",
+        "collection": collection,
+        "pdf_path": "",
+    }
+
+
+@contextmanager
+def isolated_storage():
+    """Point all file storage (PDFs, images, vectors) at a temp directory
+
+    The catalog is not shared: pass MetadataStore(os.path.join(root, "metadata.db"))
+    to DocumentProcessor.
+    """
+    saved = (config.BASE_STORAGE_PATH, config.IMAGES_BASE_PATH, config.VECTOR_STORE_PATH)
+    root = tempfile.mkdtemp(prefix="docmanager-bench-")
+    try:
+        config.BASE_STORAGE_PATH = os.path.join(root, "Documents")
+        config.IMAGES_BASE_PATH = os.path.join(root, "Images")
+        config.VECTOR_STORE_PATH = os.path.join(root, "VectorStore")
+        os.makedirs(config.BASE_STORAGE_PATH)
+        os.makedirs(config.IMAGES_BASE_PATH)
+        yield root
+    finally:
+        config.BASE_STORAGE_PATH, config.IMAGES_BASE_PATH, config.VECTOR_STORE_PATH = saved
+        shutil.rmtree(root, ignore_errors=True)
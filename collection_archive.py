@@ -0,0 +1,470 @@
+"""
+Collection Archive Module
+Streaming export/import of whole collections (backups, migrations between
+Qdrant servers) in a compact columnar format:
+
+    <archive>/manifest.json         collection config, partition plan, progress
+    <archive>/part-000012-000.npz   one shard of pages
+
+Each shard holds the ColPali multivectors as float16 token rows with per-page
+offsets, the BM25 sparse vectors (if the collection has a text index) as
+concatenated indices/values with offsets, and a JSON blob with point IDs,
+payloads and the local catalog entries of the shard's documents.
+
+Export scrolls partitions of documents in parallel, converts each scroll
+batch to float16 arrays at once and writes a shard as soon as it holds
+EXPORT_SHARD_BYTES of vectors, so memory is bounded by workers x (shard size
++ one scroll batch) whatever the collection size. Finished partitions are recorded in the manifest, and an
+interrupted export resumes from the first unfinished one.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+from qdrant_client.http import models as qdrant_models
+
+import config
+from lexical import TEXT_VECTOR_NAME
+from metadata_store import get_metadata_store
+from query_cache import bump_generation
+
+if TYPE_CHECKING:
+    from qdrant_manager import QdrantManager
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DOCUMENT_FIELD = "unique_document_id"
+
+
+def _write_json(path: str, data: Dict):
+    """Write JSON atomically so an interrupted write never corrupts the manifest"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def collection_config(qdrant_manager: 'QdrantManager', collection_name: str) -> Dict:
+    """The create_collection settings that recreate a collection"""
+    info = qdrant_manager.client.get_collection(collection_name)
+    params = info.config.params
+    vectors = params.vectors
+    quantization = info.config.quantization_config or vectors.quantization_config
+    hnsw = info.config.hnsw_config
+    multi_tenant = qdrant_manager.is_multi_tenant(collection_name)
+    return {
+        "vector_size": vectors.size,
+        "text_index": TEXT_VECTOR_NAME in (params.sparse_vectors or {}),
+        "multi_tenant": multi_tenant,
+        "shard_keys": qdrant_manager.list_shard_keys(collection_name),
+        "shard_number": params.shard_number,
+        "replication_factor": params.replication_factor,
+        "on_disk": bool(vectors.on_disk),
+        "datatype": vectors.datatype.value if vectors.datatype else None,
+        "hnsw_m": hnsw.payload_m if multi_tenant else hnsw.m,
+        "ef_construct": hnsw.ef_construct,
+        "quantization": (
+            "int8" if isinstance(quantization, qdrant_models.ScalarQuantization)
+            else "binary" if isinstance(quantization, qdrant_models.BinaryQuantization)
+            else None
+        ),
+    }
+
+
+def plan_partitions(qdrant_manager: 'QdrantManager', collection_name: str, documents_per_partition: int) -> List[Dict]:
+    """Split the collection into partitions of whole documents
+
+    Documents are listed with a facet over the unique_document_id index (a
+    payload-only scroll for collections without one). Points without a
+    document ID (none are written by this app) get a partition of their own.
+    """
+    document_ids = sorted(qdrant_manager.document_ids(collection_name, limit=10_000_000))
+    partitions = [
+        {"id": i, "documents": document_ids[start:start + documents_per_partition]}
+        for i, start in enumerate(range(0, len(document_ids), documents_per_partition))
+    ]
+    partitions.append({"id": len(partitions), "documents": None})
+    return partitions
+
+
+def partition_filter(partition: Dict) -> qdrant_models.Filter:
+    """Filter selecting the points of one planned partition"""
+    if partition["documents"] is None:
+        return qdrant_models.Filter(must=[
+            qdrant_models.IsEmptyCondition(is_empty=qdrant_models.PayloadField(key=DOCUMENT_FIELD))
+        ])
+    return qdrant_models.Filter(must=[
+        qdrant_models.FieldCondition(key=DOCUMENT_FIELD, match=qdrant_models.MatchAny(any=partition["documents"]))
+    ])
+
+
+def _shard_name(partition_id: int, sequence: int) -> str:
+    return f"part-{partition_id:06d}-{sequence:03d}.npz"
+
+
+def _convert_records(records: List, text_index: bool) -> List[Dict]:
+    """Turn scrolled records into compact entries right away
+
+    The client returns multivectors as nested lists of Python floats (about
+    30x the size of float16), so they are not kept beyond one scroll batch.
+    """
+    entries = []
+    for record in records:
+        vector = record.vector
+        if isinstance(vector, dict):
+            dense, sparse = vector.get(""), vector.get(TEXT_VECTOR_NAME)
+        else:
+            dense, sparse = vector, None
+        entry = {
+            "id": record.id,
+            "payload": record.payload or {},
+            "tokens": np.atleast_2d(np.asarray(dense if dense is not None else [], dtype=np.float16)),
+        }
+        if text_index:
+            entry["sparse_indices"] = np.asarray(sparse.indices if sparse is not None else [], dtype=np.uint32)
+            entry["sparse_values"] = np.asarray(sparse.values if sparse is not None else [], dtype=np.float32)
+        entries.append(entry)
+    return entries
+
+
+def _entry_bytes(entry: Dict) -> int:
+    return sum(entry[name].nbytes for name in ("tokens", "sparse_indices", "sparse_values") if name in entry)
+
+
+def _write_shard(path: str, entries: List[Dict], text_index: bool) -> int:
+    """Write converted entries to one npz shard
+
+    Returns:
+        Size of the shard file in bytes
+    """
+    rows = [entry["tokens"] for entry in entries]
+    width = max((r.shape[1] for r in rows if r.size), default=0)
+    rows = [r if r.size else np.zeros((0, width), dtype=np.float16) for r in rows]
+    arrays = {
+        "tokens": np.concatenate(rows) if rows else np.zeros((0, width), dtype=np.float16),
+        "offsets": np.concatenate([[0], np.cumsum([len(r) for r in rows])]).astype(np.int64),
+    }
+    if text_index:
+        indices = [entry["sparse_indices"] for entry in entries]
+        values = [entry["sparse_values"] for entry in entries]
+        arrays["sparse_indices"] = np.concatenate(indices) if indices else np.zeros(0, dtype=np.uint32)
+        arrays["sparse_values"] = np.concatenate(values) if values else np.zeros(0, dtype=np.float32)
+        arrays["sparse_offsets"] = np.concatenate([[0], np.cumsum([len(i) for i in indices])]).astype(np.int64)
+
+    store = get_metadata_store()
+    documents = {}
+    for entry in entries:
+        unique_id = entry["payload"].get(DOCUMENT_FIELD)
+        if unique_id and unique_id not in documents:
+            documents[unique_id] = store.get_document(unique_id)
+    meta = {
+        "ids": [entry["id"] for entry in entries],
+        "payloads": [entry["payload"] for entry in entries],
+        "documents": {uid: doc for uid, doc in documents.items() if doc is not None},
+    }
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def _export_partition(
+    qdrant_manager: 'QdrantManager',
+    collection_name: str,
+    output_dir: str,
+    partition: Dict,
+    text_index: bool,
+    shard_bytes: int,
+    scroll_batch: int,
+) -> Dict:
+    """Scroll one partition and write it as one or more shards"""
+    # Shards of an earlier, interrupted attempt at this partition are rewritten
+    for stale in glob.glob(os.path.join(output_dir, f"part-{partition['id']:06d}-*.npz")):
+        os.remove(stale)
+
+    shards, points, size = [], 0, 0
+    buffer, buffer_bytes = [], 0
+    offset = None
+    while True:
+        records, offset = qdrant_manager.client.scroll(
+            collection_name=collection_name,
+            scroll_filter=partition_filter(partition),
+            limit=scroll_batch,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        for entry in _convert_records(records, text_index):
+            buffer.append(entry)
+            buffer_bytes += _entry_bytes(entry)
+        del records
+        if buffer and (buffer_bytes >= shard_bytes or offset is None):
+            name = _shard_name(partition["id"], len(shards))
+            size += _write_shard(os.path.join(output_dir, name), buffer, text_index)
+            shards.append(name)
+            points += len(buffer)
+            buffer, buffer_bytes = [], 0
+        if offset is None:
+            break
+    return {"shards": shards, "points": points, "bytes": size}
+
+
+def export_collection(
+    qdrant_manager: 'QdrantManager',
+    collection_name: str,
+    output_dir: str,
+    parallel: int = config.EXPORT_PARALLEL,
+    documents_per_partition: int = config.EXPORT_PARTITION_DOCUMENTS,
+    shard_bytes: int = config.EXPORT_SHARD_BYTES,
+    scroll_batch: int = config.EXPORT_SCROLL_BATCH,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> Optional[Dict]:
+    """Export a collection to an archive directory, resuming an unfinished export there
+
+    Args:
+        qdrant_manager: QdrantManager connected to the source server
+        collection_name: Collection to export
+        output_dir: Archive directory (created if missing)
+        parallel: Partitions scrolled concurrently
+        documents_per_partition: Documents per partition, the unit of resume
+        shard_bytes: Vector bytes per shard file; memory is about parallel x shard_bytes
+        scroll_batch: Points per scroll request
+        progress_callback: Optional function(finished_partitions, total_partitions)
+
+    Returns:
+        Summary with points, documents, shards and bytes written, or None if error
+    """
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        manifest = _read_json(manifest_path)
+        if manifest is not None and manifest.get("collection") != collection_name:
+            print(f"Error exporting collection: '{output_dir}' holds an export of '{manifest.get('collection')}'")
+            return None
+        if manifest is None:
+            manifest = {
+                "format_version": FORMAT_VERSION,
+                "collection": collection_name,
+                "started_at": datetime.now().isoformat(),
+                "config": collection_config(qdrant_manager, collection_name),
+                "partitions": plan_partitions(qdrant_manager, collection_name, documents_per_partition),
+                "completed": {},
+                "complete": False,
+            }
+            _write_json(manifest_path, manifest)
+        else:
+            print(f"Resuming export of '{collection_name}': "
+                  f"{len(manifest['completed'])}/{len(manifest['partitions'])} partitions done")
+
+        pending = [p for p in manifest["partitions"] if str(p["id"]) not in manifest["completed"]]
+        total = len(manifest["partitions"])
+        lock = threading.Lock()
+        started = time.perf_counter()
+
+        def run(partition):
+            result = _export_partition(
+                qdrant_manager, collection_name, output_dir, partition,
+                manifest["config"]["text_index"], shard_bytes, scroll_batch,
+            )
+            with lock:
+                manifest["completed"][str(partition["id"])] = result
+                _write_json(manifest_path, manifest)
+                if progress_callback:
+                    progress_callback(len(manifest["completed"]), total)
+
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+            # list() re-raises the first failure; finished partitions stay recorded
+            list(executor.map(run, pending))
+
+        manifest["complete"] = True
+        manifest["finished_at"] = datetime.now().isoformat()
+        _write_json(manifest_path, manifest)
+
+        completed = manifest["completed"].values()
+        summary = {
+            "path": output_dir,
+            "points": sum(p["points"] for p in completed),
+            "documents": sum(len(p["documents"] or []) for p in manifest["partitions"]),
+            "shards": sum(len(p["shards"]) for p in completed),
+            "bytes": sum(p["bytes"] for p in completed),
+        }
+        print(f"Exported '{collection_name}': {summary['points']:,} points in {summary['shards']} shards "
+              f"({summary['bytes'] / 1e6:.1f} MB, {time.perf_counter() - started:.1f}s)")
+        return summary
+    except Exception as e:
+        print(f"Error exporting collection: {e}")
+        return None
+
+
+def read_shard(path: str) -> Dict:
+    """Load one shard
+
+    Returns:
+        Dictionary with ids, payloads, documents, tokens, offsets and, for
+        collections with a text index, sparse_indices/values/offsets
+    """
+    with np.load(path) as data:
+        shard = {name: data[name] for name in data.files if name != "meta"}
+        shard.update(json.loads(data["meta"].tobytes().decode("utf-8")))
+    return shard
+
+
+def _iter_points(shard: Dict) -> Iterator[qdrant_models.PointStruct]:
+    tokens, offsets = shard["tokens"], shard["offsets"]
+    has_sparse = "sparse_offsets" in shard
+    for i, (point_id, payload) in enumerate(zip(shard["ids"], shard["payloads"])):
+        dense = tokens[offsets[i]:offsets[i + 1]].astype(np.float32).tolist()
+        if has_sparse:
+            start, end = shard["sparse_offsets"][i], shard["sparse_offsets"][i + 1]
+            vector = {"": dense}
+            if end > start:
+                vector[TEXT_VECTOR_NAME] = qdrant_models.SparseVector(
+                    indices=shard["sparse_indices"][start:end].tolist(),
+                    values=shard["sparse_values"][start:end].tolist(),
+                )
+        else:
+            vector = dense
+        yield qdrant_models.PointStruct(id=point_id, vector=vector, payload=payload)
+
+
+def import_collection(
+    qdrant_manager: 'QdrantManager',
+    input_dir: str,
+    collection_name: Optional[str] = None,
+    parallel: int = config.EXPORT_PARALLEL,
+    batch_size: int = 64,
+    wait: bool = False,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> Optional[Dict]:
+    """Restore an exported archive into a collection, creating it if needed
+
+    Points are bulk-loaded with upload_points (parallel workers on a server)
+    in bulk-load mode, so the HNSW index is built once at the end.
+    Imported shards are recorded in import-<collection>.json in the archive,
+    so an interrupted import resumes; re-uploading a shard is harmless since
+    point IDs are kept.
+
+    Args:
+        qdrant_manager: QdrantManager connected to the target server
+        input_dir: Archive directory written by export_collection
+        collection_name: Target collection (default: the exported collection's name)
+        parallel: upload_points workers
+        batch_size: Points per upload request
+        wait: Wait for the index to be built before returning
+        progress_callback: Optional function(imported_shards, total_shards)
+
+    Returns:
+        Summary with points, documents and shards imported, or None if error
+    """
+    try:
+        manifest = _read_json(os.path.join(input_dir, MANIFEST_NAME))
+        if manifest is None:
+            print(f"Error importing collection: no {MANIFEST_NAME} in '{input_dir}'")
+            return None
+        if not manifest.get("complete"):
+            print("Error importing collection: the export is incomplete; run it again to resume")
+            return None
+        if manifest.get("format_version") != FORMAT_VERSION:
+            print(f"Error importing collection: unsupported archive version {manifest.get('format_version')}")
+            return None
+
+        collection_name = collection_name or manifest["collection"]
+        exported_config = manifest["config"]
+        if collection_name not in qdrant_manager.list_collections():
+            settings = dict(exported_config)
+            settings["shard_keys"] = settings["shard_keys"] or None
+            if not qdrant_manager.create_collection(collection_name, **settings):
+                return None
+
+        state_path = os.path.join(input_dir, f"import-{collection_name}.json")
+        state = _read_json(state_path) or {"imported": []}
+        imported = set(state["imported"])
+        shards = sorted(
+            name for partition in manifest["completed"].values() for name in partition["shards"]
+        )
+        store = get_metadata_store()
+        points = documents = 0
+
+        # Index once at the end instead of while loading
+        with qdrant_manager.bulk_load(collection_name, wait=wait):
+            for name in shards:
+                if name in imported:
+                    continue
+                shard = read_shard(os.path.join(input_dir, name))
+                if exported_config["shard_keys"]:
+                    # Custom-sharded collections take one shard key per upload call
+                    by_key: Dict[str, List] = {}
+                    for point in _iter_points(shard):
+                        by_key.setdefault(point.payload.get("shard_key"), []).append(point)
+                    for shard_key, key_points in by_key.items():
+                        qdrant_manager.client.upload_points(
+                            collection_name, key_points, batch_size=batch_size, parallel=parallel,
+                            wait=True, shard_key_selector=shard_key,
+                        )
+                else:
+                    qdrant_manager.client.upload_points(
+                        collection_name, _iter_points(shard), batch_size=batch_size, parallel=parallel, wait=True,
+                    )
+                points += len(shard["ids"])
+
+                for unique_id, metadata in shard["documents"].items():
+                    existing = store.get_document(unique_id)
+                    # Never take over the catalog entry of a document living in another collection
+                    if existing is None or existing.get("collection") == collection_name:
+                        store.add_document(unique_id, dict(metadata, collection=collection_name))
+                        documents += 1
+
+                imported.add(name)
+                _write_json(state_path, {"imported": sorted(imported)})
+                if progress_callback:
+                    progress_callback(len(imported), len(shards))
+
+        bump_generation(collection_name)
+        print(f"Imported {points:,} points into '{collection_name}'")
+        return {"collection": collection_name, "points": points, "documents": documents, "shards": len(shards)}
+    except Exception as e:
+        print(f"Error importing collection: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    import argparse
+    from qdrant_manager import QdrantManager
+
+    parser = argparse.ArgumentParser(description="Export or import a collection archive")
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("collection", help="Collection to export, or target collection of an import")
+    parser.add_argument("path", help="Archive directory")
+    parser.add_argument("--url", default=config.QDRANT_URL)
+    parser.add_argument("--parallel", type=int, default=config.EXPORT_PARALLEL)
+    args = parser.parse_args()
+
+    manager = QdrantManager(url=args.url, api_key=config.QDRANT_API_KEY)
+
+    def progress(done, total):
+        print(f"  {done}/{total}")
+
+    if args.action == "export":
+        result = manager.export_collection(args.collection, args.path, parallel=args.parallel,
+                                           progress_callback=progress)
+    else:
+        result = manager.import_collection(args.path, args.collection, parallel=args.parallel,
+                                           progress_callback=progress)
+    raise SystemExit(0 if result else 1)
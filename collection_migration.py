@@ -0,0 +1,281 @@
+"""
+Collection Migration Module
+Copies the points of a collection into a newly configured one (quantization,
+on-disk vectors, storage type, shard count, pooled vectors) without
+re-rasterizing PDFs or re-running the model:
+- Parallel scroll over partitions of documents, bulk upload to the target
+- Optional in-flight token pooling of the multivectors
+- Switch-over through a collection alias, so the app keeps using the old name
+"""
+
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+import numpy as np
+from qdrant_client.http import models as qdrant_models
+
+import config
+from collection_archive import collection_config, partition_filter, plan_partitions
+from lexical import TEXT_VECTOR_NAME
+from query_cache import bump_generation
+
+if TYPE_CHECKING:
+    from qdrant_manager import QdrantManager
+
+
+def transform_multivector(
+    vectors, pool_factor: int = 1, max_tokens: Optional[int] = None
+) -> List[List[float]]:
+    """Shrink a page multivector
+
+    Args:
+        vectors: Token vectors of one page
+        pool_factor: Mean-pool each run of this many consecutive tokens
+            (neighbouring tokens are mostly neighbouring image patches)
+        max_tokens: Pool further, with the smallest factor that brings the
+            page down to at most this many tokens
+
+    Returns:
+        The transformed token vectors
+    """
+    tokens = np.asarray(vectors, dtype=np.float32)
+    if tokens.ndim != 2 or len(tokens) == 0:
+        return tokens.tolist()
+    factor = max(1, pool_factor)
+    if max_tokens:
+        factor = max(factor, math.ceil(len(tokens) / max_tokens))
+    if factor == 1:
+        return tokens.tolist()
+    groups = math.ceil(len(tokens) / factor)
+    padded = np.zeros((groups * factor, tokens.shape[1]), dtype=np.float32)
+    padded[:len(tokens)] = tokens
+    counts = np.minimum(factor, len(tokens) - np.arange(groups) * factor)
+    pooled = padded.reshape(groups, factor, -1).sum(axis=1) / counts[:, None]
+    return pooled.tolist()
+
+
+def _transform_point(record, pool_factor: int, max_tokens: Optional[int]) -> qdrant_models.PointStruct:
+    vector = record.vector
+    if pool_factor > 1 or max_tokens:
+        if isinstance(vector, dict):
+            vector = dict(vector, **{"": transform_multivector(vector[""], pool_factor, max_tokens)})
+        else:
+            vector = transform_multivector(vector, pool_factor, max_tokens)
+    return qdrant_models.PointStruct(id=record.id, vector=vector, payload=record.payload or {})
+
+
+def _replace_with_alias(qdrant_manager: 'QdrantManager', source: str, target: str, attempts: int = 3) -> bool:
+    """Replace the plain collection `source` by an alias of `target`
+
+    Qdrant has no rename, so this is not atomic: between deleting `source`
+    and creating the alias, requests for the name fail. The target is first
+    given a staging alias, so a server that rejects alias changes fails
+    before anything is deleted, and if creating the final alias still fails
+    the data stays reachable through the staging alias.
+
+    Returns:
+        True if `source` now points to `target`
+    """
+    staging = f"{source}__migrating"
+    if not qdrant_manager.switch_alias(staging, target):
+        return False
+    try:
+        qdrant_manager.client.delete_collection(source)
+    except Exception as e:
+        print(f"Error deleting collection '{source}': {e}")
+        qdrant_manager.client.update_collection_aliases(change_aliases_operations=[
+            qdrant_models.DeleteAliasOperation(delete_alias=qdrant_models.DeleteAlias(alias_name=staging))
+        ])
+        return False
+
+    # The name resolves to nothing from here until the alias exists
+    operations = [
+        qdrant_models.DeleteAliasOperation(delete_alias=qdrant_models.DeleteAlias(alias_name=staging)),
+        qdrant_models.CreateAliasOperation(
+            create_alias=qdrant_models.CreateAlias(collection_name=target, alias_name=source)
+        ),
+    ]
+    for attempt in range(attempts):
+        try:
+            qdrant_manager.client.update_collection_aliases(change_aliases_operations=operations)
+            bump_generation(source)
+            print(f"Alias '{source}' now points to collection '{target}'")
+            return True
+        except Exception as e:
+            print(f"Error creating alias '{source}' (attempt {attempt + 1}/{attempts}): {e}")
+            time.sleep(2 ** attempt)
+    print(f"'{source}' was deleted but its alias could not be created; the data is in '{target}' "
+          f"(alias '{staging}'). Create it with QdrantManager.switch_alias('{source}', '{target}')")
+    return False
+
+
+def migrate_collection(
+    qdrant_manager: 'QdrantManager',
+    source: str,
+    target: str,
+    pool_factor: int = 1,
+    max_tokens: Optional[int] = None,
+    switch: bool = False,
+    drop_old: bool = False,
+    parallel: int = config.EXPORT_PARALLEL,
+    batch_size: int = config.EXPORT_SCROLL_BATCH,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    **settings,
+) -> Optional[Dict]:
+    """Copy a collection into a new collection with different settings
+
+    The target is created with the source's settings overridden by
+    `settings` (any create_collection option, e.g. quantization="int8",
+    on_disk=True, datatype="float16", shard_number=6). Re-running a failed
+    migration into an existing target overwrites the points copied so far.
+
+    With `switch`, `source` becomes an alias of the target once every point
+    is copied. Moving an existing alias is atomic. A plain collection cannot
+    be renamed, so it is deleted and the alias created right after it (see
+    _replace_with_alias): for that moment the name resolves to nothing.
+    Later migrations of the same name then swap atomically.
+
+    Args:
+        qdrant_manager: QdrantManager instance
+        source: Collection (or alias) to copy
+        target: Name of the new collection
+        pool_factor: Mean-pool this many consecutive tokens per page
+        max_tokens: Pool pages down to at most this many tokens
+        switch: Point the source name at the target when done
+        drop_old: With switch, delete the collection the alias pointed to before
+        parallel: Partitions copied concurrently
+        batch_size: Points per scroll and upload request
+        progress_callback: Optional function(points_copied, total_points)
+
+    Returns:
+        Summary with points copied, seconds and whether the alias was switched,
+        or None if error
+    """
+    try:
+        source_collection = qdrant_manager.resolve_collection(source)
+        total = qdrant_manager.count_points(source) or 0
+
+        if target not in qdrant_manager.list_collections():
+            target_settings = collection_config(qdrant_manager, source)
+            target_settings.update(settings)
+            target_settings["shard_keys"] = target_settings["shard_keys"] or None
+            if not qdrant_manager.create_collection(target, **target_settings):
+                return None
+        keyed = qdrant_manager.uses_shard_keys(target)
+        if qdrant_manager.has_text_index(source) and not qdrant_manager.has_text_index(target):
+            print(f"Warning: '{target}' has no text index; BM25 vectors of '{source}' are dropped")
+            keep_text = False
+        else:
+            keep_text = True
+
+        lock = threading.Lock()
+        copied = [0]
+        started = time.perf_counter()
+
+        def copy_partition(partition: Dict):
+            offset = None
+            while True:
+                records, offset = qdrant_manager.client.scroll(
+                    collection_name=source,
+                    scroll_filter=partition_filter(partition),
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=True,
+                )
+                points = [_transform_point(record, pool_factor, max_tokens) for record in records]
+                if not keep_text:
+                    for point in points:
+                        if isinstance(point.vector, dict):
+                            point.vector.pop(TEXT_VECTOR_NAME, None)
+                by_key: Dict[Optional[str], List] = {}
+                for point in points:
+                    by_key.setdefault(point.payload.get("shard_key") if keyed else None, []).append(point)
+                for shard_key, key_points in by_key.items():
+                    qdrant_manager.client.upload_points(
+                        target, key_points, batch_size=batch_size, wait=True, shard_key_selector=shard_key,
+                    )
+                with lock:
+                    copied[0] += len(points)
+                    if progress_callback:
+                        progress_callback(copied[0], total)
+                if offset is None:
+                    break
+
+        partitions = plan_partitions(qdrant_manager, source, config.EXPORT_PARTITION_DOCUMENTS)
+        # The target is not serving yet: build its index once, after the copy
+        with qdrant_manager.bulk_load(target, wait=True):
+            with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+                list(executor.map(copy_partition, partitions))
+
+        target_points = qdrant_manager.count_points(target)
+        if target_points != total:
+            print(f"Error migrating collection: '{target}' has {target_points} points, '{source}' has {total}")
+            return None
+
+        switched = False
+        if switch:
+            if source_collection == source:
+                switched = _replace_with_alias(qdrant_manager, source, target)
+            else:
+                switched = qdrant_manager.switch_alias(source, target)
+                if switched and drop_old and source_collection != target:
+                    qdrant_manager.client.delete_collection(source_collection)
+
+        seconds = time.perf_counter() - started
+        print(f"Migrated {copied[0]:,} points from '{source}' to '{target}' in {seconds:.1f}s")
+        return {"points": copied[0], "seconds": seconds, "switched": switched}
+    except Exception as e:
+        print(f"Error migrating collection: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    import argparse
+    from qdrant_manager import QdrantManager
+
+    parser = argparse.ArgumentParser(description="Copy a collection into a newly configured one")
+    parser.add_argument("source")
+    parser.add_argument("target")
+    parser.add_argument("--url", default=config.QDRANT_URL)
+    parser.add_argument("--pool-factor", type=int, default=1)
+    parser.add_argument("--max-tokens", type=int)
+    parser.add_argument("--quantization", choices=["int8", "binary"])
+    parser.add_argument("--datatype", choices=["float32", "float16", "uint8"])
+    parser.add_argument("--on-disk", action="store_true")
+    parser.add_argument("--shards", type=int)
+    parser.add_argument("--hnsw-m", type=int)
+    parser.add_argument("--ef-construct", type=int)
+    parser.add_argument("--switch", action="store_true", help="Make SOURCE an alias of TARGET when done")
+    parser.add_argument("--drop-old", action="store_true")
+    parser.add_argument("--parallel", type=int, default=config.EXPORT_PARALLEL)
+    args = parser.parse_args()
+
+    overrides = {}
+    if args.quantization:
+        overrides["quantization"] = args.quantization
+    if args.datatype:
+        overrides["datatype"] = args.datatype
+    if args.on_disk:
+        overrides["on_disk"] = True
+    if args.shards:
+        overrides["shard_number"] = args.shards
+    if args.hnsw_m is not None:
+        overrides["hnsw_m"] = args.hnsw_m
+    if args.ef_construct:
+        overrides["ef_construct"] = args.ef_construct
+
+    def progress(done, total):
+        print(f"  {done:,}/{total:,} points")
+
+    manager = QdrantManager(url=args.url, api_key=config.QDRANT_API_KEY)
+    result = migrate_collection(
+        manager, args.source, args.target,
+        pool_factor=args.pool_factor, max_tokens=args.max_tokens,
+        switch=args.switch, drop_old=args.drop_old, parallel=args.parallel,
+        progress_callback=progress, **overrides,
+    )
+    raise SystemExit(0 if result else 1)
@@ -0,0 +1,177 @@
+"""
+Collection Statistics Module
+Builds a dashboard snapshot of every collection from Qdrant's count/facet/info
+APIs, so its cost grows with the number of collections rather than points:
+- Per-collection stats from QdrantManager.get_collection_stats
+- Document counts from the local catalog when Qdrant has no facet index
+- Optional background refresh of the cached snapshot
+"""
+
+import threading
+import time
+from typing import Dict, Optional, TYPE_CHECKING
+import config
+
+if TYPE_CHECKING:
+    from qdrant_manager import QdrantManager
+    from metadata_store import MetadataStore
+
+
+class CollectionStatsCollector:
+    """Caches a snapshot of all collection statistics"""
+
+    def __init__(
+        self,
+        qdrant_manager: 'QdrantManager',
+        metadata_store: Optional['MetadataStore'] = None,
+        max_age: float = 10.0,
+    ):
+        """Initialize the collector
+
+        Args:
+            qdrant_manager: Manager used to query Qdrant
+            metadata_store: Optional catalog used for document counts of
+                collections without a unique_document_id index
+            max_age: Seconds a snapshot is served before it is rebuilt on access
+        """
+        self.qdrant_manager = qdrant_manager
+        self.metadata_store = metadata_store
+        self.max_age = max_age
+        self._snapshot: Dict[str, Dict] = {}
+        self._collected_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+        # Held while collecting, so concurrent sessions wait for one rebuild
+        self._collect_lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def collect(self) -> Dict[str, Dict]:
+        """Query Qdrant for the stats of every collection and store the snapshot
+
+        Returns:
+            Dictionary mapping collection name to its statistics
+        """
+        with self._collect_lock:
+            return self._collect()
+
+    def _collect(self) -> Dict[str, Dict]:
+        with self._lock:
+            generation = self._generation
+        snapshot = {}
+        for collection in self.qdrant_manager.list_collections():
+            stats = self.qdrant_manager.get_collection_stats(collection)
+            if not stats:
+                continue
+            if stats.get("total_documents") is None and self.metadata_store is not None:
+                stats["total_documents"] = self.metadata_store.count_documents(collection)
+            snapshot[collection] = stats
+
+        with self._lock:
+            self._snapshot = snapshot
+            # An invalidate() during the collect may not be reflected yet
+            self._collected_at = time.monotonic() if generation == self._generation else 0.0
+        return snapshot
+
+    def snapshot(self, max_age: Optional[float] = None) -> Dict[str, Dict]:
+        """Return the cached snapshot, collecting a new one if it is too old
+
+        Only one thread collects; others wait for it and share its snapshot.
+
+        Args:
+            max_age: Override for the collector's max_age (seconds)
+        """
+        max_age = self.max_age if max_age is None else max_age
+        snapshot = self._fresh_snapshot(max_age)
+        if snapshot is not None:
+            return snapshot
+        with self._collect_lock:
+            snapshot = self._fresh_snapshot(max_age)
+            if snapshot is not None:
+                return snapshot
+            return self._collect()
+
+    def _fresh_snapshot(self, max_age: float) -> Optional[Dict[str, Dict]]:
+        with self._lock:
+            if self._collected_at and time.monotonic() - self._collected_at <= max_age:
+                return dict(self._snapshot)
+        return None
+
+    def flags(self, collection: str) -> Dict:
+        """Stats of one collection, including the flags the pages read on every rerun
+
+        Collections missing from the snapshot (e.g. created by another process
+        since it was collected) are looked up directly.
+
+        Returns:
+            Dictionary with at least multi_tenant, tenant_ids, text_index,
+            custom_sharding and shard_keys
+        """
+        stats = self.snapshot().get(collection)
+        if stats is not None:
+            return stats
+        manager = self.qdrant_manager
+        multi_tenant = manager.is_multi_tenant(collection)
+        shard_keys = manager.list_shard_keys(collection)
+        return {
+            "multi_tenant": multi_tenant,
+            "tenant_ids": list(manager.list_tenants(collection)) if multi_tenant else [],
+            "text_index": manager.has_text_index(collection),
+            "custom_sharding": bool(shard_keys) or manager.uses_shard_keys(collection),
+            "shard_keys": shard_keys,
+        }
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last snapshot was collected, None if never"""
+        with self._lock:
+            return time.monotonic() - self._collected_at if self._collected_at else None
+
+    def invalidate(self):
+        """Force the next snapshot() call to query Qdrant (e.g. after creating a collection)"""
+        with self._lock:
+            self._collected_at = 0.0
+            self._generation += 1
+
+    def start(self, interval: float):
+        """Refresh the snapshot every `interval` seconds in a daemon thread"""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+        self._stop_event.clear()
+
+        def _run():
+            while not self._stop_event.is_set():
+                try:
+                    self.collect()
+                except Exception as e:
+                    print(f"Error refreshing collection stats: {e}")
+                self._stop_event.wait(interval)
+
+        self._refresh_thread = threading.Thread(target=_run, name="collection-stats", daemon=True)
+        self._refresh_thread.start()
+
+    def stop(self):
+        """Stop the background refresh thread"""
+        self._stop_event.set()
+
+
+_collector: Optional[CollectionStatsCollector] = None
+_collector_lock = threading.Lock()
+
+
+def get_collector(qdrant_manager: 'QdrantManager') -> CollectionStatsCollector:
+    """Return the process-wide collector shared by all Streamlit sessions
+
+    The background refresh is started when config.STATS_REFRESH_INTERVAL > 0.
+    """
+    global _collector
+    with _collector_lock:
+        if _collector is None:
+            from metadata_store import get_metadata_store
+            _collector = CollectionStatsCollector(
+                qdrant_manager,
+                metadata_store=get_metadata_store(),
+                max_age=config.STATS_MAX_AGE,
+            )
+            if config.STATS_REFRESH_INTERVAL > 0:
+                _collector.start(config.STATS_REFRESH_INTERVAL)
+        return _collector
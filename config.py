@@ -4,30 +4,121 @@ Configuration file for the Document Manager application
 
 import os
 
-# Qdrant Configuration
-QDRANT_URL = "http://localhost:6333"
-QDRANT_API_KEY = None  # Set this if your Qdrant instance requires authentication
+# Qdrant Configuration (QDRANT_URL / QDRANT_API_KEY / QDRANT_PREFER_GRPC can be set in the environment)
+QDRANT_URL = os.environ.get("QDRANT_URL", "http://localhost:6333")  # ":memory:" for a throwaway local instance
+QDRANT_API_KEY = os.environ.get("QDRANT_API_KEY") or None  # Set this if your Qdrant instance requires authentication
+QDRANT_PREFER_GRPC = os.environ.get("QDRANT_PREFER_GRPC", "").lower() in ("1", "true", "yes")
+QDRANT_GRPC_PORT = 6334
+QDRANT_TIMEOUT = 30  # Seconds per request
+QDRANT_MAX_CONNECTIONS = 20  # HTTP connections per process, shared by all sessions
+QDRANT_MAX_KEEPALIVE = 10  # Idle HTTP connections kept open for reuse
+QDRANT_KEEPALIVE_EXPIRY = 30  # Seconds an idle connection is kept
+QDRANT_RETRIES = 3  # Retries of transient failures (connection errors, 502/503/504)
+QDRANT_RETRY_BACKOFF = 0.5  # Seconds before the first retry, doubled for each further retry
+QDRANT_HEALTH_CHECK_INTERVAL = 15  # Seconds between background health checks
 
 # File Storage Configuration
-# Base directory where PDFs and images are stored
-BASE_STORAGE_PATH = os.path.join(
-    os.path.dirname(os.path.dirname(__file__)), "Documents"
-)
-BASE_STORAGE_PATH = "./Documents"
-IMAGES_BASE_PATH = "./Images"
+# Base directory where PDFs and images are stored (next to the app, where the
+# static/ symlinks point)
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_STORAGE_PATH = os.path.join(APP_DIR, "Documents")
+IMAGES_BASE_PATH = os.path.join(APP_DIR, "Images")
+# Page images are kept in one archive per document (see page_store.py)
+PAGE_IMAGE_FORMAT = "WEBP"  # "WEBP" or "JPEG"
+PAGE_IMAGE_QUALITY = 80
 
-# Ensure directories exist
-os.makedirs(BASE_STORAGE_PATH, exist_ok=True)
-os.makedirs(IMAGES_BASE_PATH, exist_ok=True)
 
 # ColPali Model Configuration
 COLPALI_MODEL_NAME = "vidore/colqwen2.5-v0.2"
+# Optional preconverted copy (python embedding_model.py PATH), loaded instead of the hub model when present
+COLPALI_LOCAL_MODEL_PATH = os.environ.get("COLPALI_LOCAL_MODEL_PATH") or None
+MODEL_WARMUP = os.environ.get("MODEL_WARMUP", "startup")  # Load the model in the background: "startup", "upload" (first Upload visit) or "off"
+MODEL_WARMUP_EMBED = True  # Run one tiny embedding after loading, so the first real one is not slowed by setup
 VECTOR_SIZE = 128  # For ColQwen2.5
 
 # Processing Configuration
 DEFAULT_BATCH_SIZE = 4
 DEFAULT_CONVERT_BATCH_SIZE = 10
 
+# Search Configuration
+DEFAULT_TOP_K = 5
+QUERY_EMBED_BATCH_SIZE = 32  # Queries embedded per forward pass in batched search
+QUERY_EMBEDDING_CACHE_SIZE = 1024  # Query multivectors kept in memory
+QUERY_EMBEDDING_CACHE_TTL = 3600  # Seconds
+SEARCH_RESULT_CACHE_SIZE = 512
+SEARCH_RESULT_CACHE_TTL = 30  # Seconds; results are also dropped when the collection changes
+
+# Hybrid (text + visual) search, see lexical.py
+TEXT_INDEX_ENABLED = True  # Create new collections with a BM25 sparse index of the PDF text layer
+SEARCH_MODE = "visual"  # "visual", "hybrid" (RRF fusion) or "lexical_prefilter"
+HYBRID_PREFETCH_LIMIT = 100  # Candidates fetched per retriever before fusion/rescoring
+
+# HNSW index (see benchmarks/bench_hnsw.py to pick values for your data)
+HNSW_M = None  # Graph links per node for new collections (None = Qdrant default, 16)
+HNSW_EF_CONSTRUCT = None  # Build-time beam width for new collections (None = Qdrant default, 100)
+SEARCH_HNSW_EF = None  # Search-time beam width (None = Qdrant default)
+SEARCH_EXACT = False  # Bypass the HNSW index and score every page
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_AVG_PAGE_TOKENS = 256
+
+# Local exact MaxSim (see maxsim.py)
+VECTOR_STORE_PATH = os.path.join(APP_DIR, "VectorStore")  # float16 copies of page multivectors
+LOCAL_VECTOR_STORE_ENABLED = False  # Write the local copy during ingestion
+SEARCH_BACKEND = "qdrant"  # "qdrant" or "local" (exact search over the local copy)
+EXACT_RERANK_CANDIDATES = 0  # Rerank this many Qdrant candidates exactly (0 = off)
+MAXSIM_CHUNK_TOKENS = 65536  # Page tokens scored at once; bounds scoring memory
+
+# Collection export/import (see collection_archive.py)
+EXPORT_PARALLEL = 4  # Concurrent scrolls on export / upload workers on import
+EXPORT_PARTITION_DOCUMENTS = 64  # Documents per export partition (the unit of resume)
+EXPORT_SHARD_BYTES = 64 * 1024 ** 2  # float16 vector bytes per shard file; bounds memory per worker
+EXPORT_SCROLL_BATCH = 16  # Points fetched per scroll request (held as Python floats until converted)
+
+# Bulk-load mode (QdrantManager.bulk_load): HNSW indexing is deferred while loading
+BULK_LOAD_FLUSH_INTERVAL = 60  # Seconds between flushes while loading (Qdrant default: 5)
+BULK_LOAD_SEGMENT_NUMBER = 2  # Fewer, larger segments while loading, so less merging
+BULK_LOAD_WAIT_TIMEOUT = 600  # Seconds to wait for the collection to turn green after loading
+
+# Storage reconciler (reconciler.py): reclaims files, catalog entries and vectors of documents without points
+RECONCILE_INTERVAL = 0  # Seconds between background runs (0 = only on demand)
+RECONCILE_GRACE_SECONDS = 3600  # Documents younger than this are left alone (uploads in progress)
+RECONCILE_BATCH_SIZE = 100  # Documents reclaimed per batch
+RECONCILE_MAX_PER_RUN = 1000  # Documents reclaimed per run; the rest are left for the next run
+RECONCILE_FACET_LIMIT = 1_000_000  # Larger collections are listed by scrolling instead
+
+# Metrics endpoint (Prometheus/OpenMetrics text at http://HOST:PORT/metrics)
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9464  # 0 disables the endpoint
+
+# Asset server (PDFs and page images for the browser, with byte ranges and caching; see asset_server.py)
+ASSET_SERVER_HOST = os.environ.get("ASSET_SERVER_HOST", "127.0.0.1")
+ASSET_SERVER_PORT = int(os.environ.get("ASSET_SERVER_PORT", "0"))  # 0 disables it (Streamlit static serving)
+# Where browsers reach the asset server, e.g. "https://docs.example.com/assets" behind the app's proxy;
+# without it the app keeps using Streamlit static serving
+ASSET_PUBLIC_URL = os.environ.get("ASSET_PUBLIC_URL") or None
+ASSET_CACHE_MAX_AGE = 30 * 24 * 3600  # Seconds browsers keep a document (URLs change when a file does)
+PDF_LINEARIZE = False  # Linearize PDFs on upload for a faster first page (needs pikepdf or qpdf)
+
+# Profiling panel (per-rerun call timings in the sidebar, see profiling.py)
+# False: off; True: every session; "debug": only sessions opened with ?debug=1
+PROFILING_ENABLED = False
+PROFILING_HISTORY = 20  # Reruns kept in the panel history
+
+# Statistics Configuration
+STATS_MAX_AGE = 10  # Seconds a collection stats snapshot is reused before it is rebuilt
+STATS_REFRESH_INTERVAL = 0  # Seconds between background refreshes (0 = refresh on access only)
+STATS_VECTOR_SAMPLE_MAX_AGE = 3600  # Seconds a sampled vectors-per-page average is reused for storage estimates
+
 # UI Configuration
 APP_TITLE = "📚 Document Manager"
 APP_ICON = "📚"
+MANAGE_PAGE_SIZE = 20  # Documents shown per page on the Manage page
+MANAGE_PAGE_SIZE_OPTIONS = [10, 20, 50, 100]
+SEARCH_RESULT_LIMIT = 200  # Maximum name-search matches returned from the catalog
+
+
+def ensure_directories():
+    """Create the storage directories (called once at app startup, not on import)"""
+    os.makedirs(BASE_STORAGE_PATH, exist_ok=True)
+    os.makedirs(IMAGES_BASE_PATH, exist_ok=True)
@@ -1,37 +1,153 @@
 import os
+import re
 import shutil
+import tempfile
+from contextlib import nullcontext
 from datetime import datetime
-import torch
-from pdf2image import convert_from_path
-from PyPDF2 import PdfReader
-from qdrant_client import QdrantClient
-from qdrant_client.http import models as qdrant_models
-from tqdm import tqdm
-import gc
+from typing import TYPE_CHECKING, Iterator, Tuple
+import hashlib
+import time
 import config
-from metadata_store import MetadataStore
+from metadata_store import get_metadata_store
+from page_store import PageStore, encode_image
+from embedding_model import get_model
+from query_cache import bump_generation
+from lexical import TEXT_VECTOR_NAME, document_sparse_vector
+from metrics import (
+    StageTimer,
+    INGEST_BATCH_SIZE,
+    INGEST_BYTES,
+    INGEST_DOCUMENTS,
+    INGEST_PAGES,
+    INGEST_POINTS,
+    INGEST_QUEUE_DEPTH,
+    gpu_memory_bytes,
+    process_rss_bytes,
+)
+
+# torch, pdf2image, PyPDF2 and tqdm are imported where they are used, so that
+# importing this module (e.g. from the Upload page) stays cheap.
+if TYPE_CHECKING:
+    from PIL import Image
+    from qdrant_client import QdrantClient
+    from metadata_store import MetadataStore
+
+# pdftoppm names each page file <prefix>-<page number>.<ext>, zero-padded to the
+# width of the document's last page number
+RENDERED_PAGE_NAME = re.compile(r"-(\d+)\.\w+$")
+
+def page_hash(image) -> str:
+    """Hash of a rendered page's pixels; pages with equal hashes look the same"""
+    digest = hashlib.sha1(f"{image.mode}{image.size}".encode("utf-8"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def iter_rendered_pages(
+    pdf_path: str,
+    total_pages: int,
+    window: int = config.DEFAULT_CONVERT_BATCH_SIZE,
+    timer: StageTimer = None,
+) -> Iterator[Tuple[int, "Image.Image"]]:
+    """Render the pages of a PDF one at a time
+
+    pdf2image renders `window` pages per pdftoppm call into a temporary
+    directory (paths_only), and each page is decoded only when the consumer
+    asks for it and its file removed right away, so this holds at most one
+    decoded page whatever the length of the PDF. Pages of a window that
+    fails to render are skipped with a message, as before. Page numbers are
+    read from the file names, so pages pdftoppm leaves out are not
+    misnumbered.
+
+    Yields:
+        (page_number, PIL image), page numbers 1-based
+    """
+    from pdf2image import convert_from_path
+    from PIL import Image
+
+    with tempfile.TemporaryDirectory(prefix="pages-") as output_folder:
+        for first_page in range(1, total_pages + 1, window):
+            last_page = min(first_page + window - 1, total_pages)
+            try:
+                with timer.stage("rasterize") if timer else nullcontext():
+                    paths = convert_from_path(
+                        pdf_path,
+                        first_page=first_page,
+                        last_page=last_page,
+                        output_folder=output_folder,
+                        paths_only=True,
+                    )
+            except Exception as e:
+                print(f"Error converting pages {first_page}-{last_page}: {e}")
+                continue
+            INGEST_BATCH_SIZE.observe(len(paths), stage="rasterize")
+            numbered = []
+            for path in paths:
+                match = RENDERED_PAGE_NAME.search(os.path.basename(path))
+                if match is None:
+                    print(f"Warning: Skipping rendered file with no page number: {path}")
+                    os.remove(path)
+                    continue
+                numbered.append((int(match.group(1)), path))
+            for page_number, path in sorted(numbered):
+                image = Image.open(path)
+                image.load()
+                os.remove(path)
+                yield page_number, image
+
+
+def iter_batches(pages, batch_size: int):
+    """Group an iterator of pages into lists of at most batch_size"""
+    batch = []
+    for page in pages:
+        batch.append(page)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-# Initialize MetadataStore
-metadata_store = MetadataStore()
 
 class DocumentProcessor:
-    def __init__(self, collection_name: str):
+    def __init__(self, collection_name: str, client: 'QdrantClient' = None, model=None, processor=None,
+                 metadata_store: 'MetadataStore' = None):
+        """
+        Args:
+            collection_name: Collection the documents are indexed into
+            client: Optional Qdrant client (default: the pooled client for config.QDRANT_URL)
+            model: Optional ColPali model (default: the shared model)
+            processor: Optional ColPali processor matching `model`
+            metadata_store: Optional catalog (default: the shared catalog)
+        """
         self.collection_name = collection_name
-        self.client = QdrantClient(url=config.QDRANT_URL, api_key=config.QDRANT_API_KEY)
+        if client is None:
+            from qdrant_pool import get_client
+            client = get_client()
+        self.client = client
+        self.metadata_store = metadata_store or get_metadata_store()
         
-        # Initialize ColPali model
-        # Note: Importing here to avoid heavy load if not processing
-        from colpali_engine.models import ColQwen2_5, ColQwen2_5_Processor
+        # Initialize ColPali model (shared with search, loaded once per process)
+        if model is None:
+            model, processor = get_model()
+        self.colpali_model, self.colpali_processor = model, processor
+        self.device = self.colpali_model.device
+        self.vector_store = None
+        if config.LOCAL_VECTOR_STORE_ENABLED:
+            from maxsim import PageVectorStore
+            self.vector_store = PageVectorStore()
         
-        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
-        self.colpali_model = ColQwen2_5.from_pretrained(
-            config.COLPALI_MODEL_NAME,
-            torch_dtype=torch.bfloat16,
-            device_map=self.device,
-        )
-        self.colpali_processor = ColQwen2_5_Processor.from_pretrained(
-            config.COLPALI_MODEL_NAME, use_fast=True
-        )
+        from qdrant_client.http import models as qdrant_models
+
+        from qdrant_manager import TENANT_FIELD
+
+        # Collections created with a text index also get BM25 sparse vectors
+        info = self.client.get_collection(collection_name)
+        params = info.config.params
+        self.text_index = TEXT_VECTOR_NAME in (params.sparse_vectors or {})
+        # Custom-sharded collections need a shard key for every write
+        self.uses_shard_keys = params.sharding_method == qdrant_models.ShardingMethod.CUSTOM
+        # Multi-tenant collections need a tenant for every document
+        self.multi_tenant = TENANT_FIELD in (info.payload_schema or {})
 
     def process_document(
         self,
@@ -39,7 +155,10 @@ class DocumentProcessor:
         original_filename: str,
         batch_size: int = 4,
         convert_batch_size: int = 10,
-        progress_callback = None
+        progress_callback = None,
+        shard_key: str = None,
+        tenant_id: str = None,
+        event_callback = None
     ):
         """
         Process document: Save PDF, Index to Qdrant, Save Images, Update Metadata
@@ -48,41 +167,62 @@ class DocumentProcessor:
             temp_file_path: Path to temporary PDF file
             original_filename: Original name of the uploaded file
             batch_size: Batch size for embedding generation
-            convert_batch_size: Batch size for PDF conversion
+            convert_batch_size: Pages rendered per pdftoppm call (to temporary files,
+                decoded one at a time)
             progress_callback: Optional callback function(current_page, total_pages) for progress updates
+            shard_key: Shard key to route the document's points to; required for
+                collections created with custom sharding
+            tenant_id: Tenant the document belongs to; required for multi-tenant
+                collections
+            event_callback: Optional callback function(event) called with each progress
+                update; `event` is a dict with throughput, ETA, per-stage timings and
+                memory usage (see _progress_event)
         """
+        from tqdm import tqdm
+
+        if self.uses_shard_keys and shard_key is None:
+            raise Exception(f"Collection '{self.collection_name}' uses shard keys; choose one for the document")
+        if self.multi_tenant and not tenant_id:
+            raise Exception(f"Collection '{self.collection_name}' is multi-tenant; choose a tenant for the document")
+
+        timer = StageTimer()
+        started = time.perf_counter()
+        
         # 1. Generate Unique ID and Paths
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         base_name = os.path.splitext(original_filename)[0]
         unique_id = f"{base_name}_{timestamp}"
         
-        # Create Documents directory if not exists
-        documents_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Documents")
-        os.makedirs(documents_dir, exist_ok=True)
-        
-        # Save PDF with unique name
-        saved_pdf_path = os.path.join(documents_dir, f"{unique_id}.pdf")
-        shutil.copy2(temp_file_path, saved_pdf_path)
+        # Save PDF with unique name (in a hash-fanned directory)
+        page_store = PageStore()
+        saved_pdf_path = page_store.pdf_path(unique_id)
+        os.makedirs(os.path.dirname(saved_pdf_path), exist_ok=True)
+        with timer.stage("save_pdf"):
+            shutil.copy2(temp_file_path, saved_pdf_path)
+        if config.PDF_LINEARIZE:
+            # Lets the viewer render page 1 before the whole file has arrived
+            from asset_server import linearize_pdf
+            with timer.stage("linearize"):
+                linearize_pdf(saved_pdf_path)
+        INGEST_BYTES.inc(os.path.getsize(saved_pdf_path), kind="pdf")
         
         print(f"🔄 Processing: {original_filename}")
         print(f"🆔 Unique ID: {unique_id}")
         
-        # 2. Get PDF Info
-        try:
-            with open(saved_pdf_path, "rb") as file:
-                pdf_reader = PdfReader(file)
-                total_pages = len(pdf_reader.pages)
-        except Exception as e:
-            raise Exception(f"Error reading PDF: {e}")
+        # 2. Get PDF Info (and the text layer while the reader is open)
+        with timer.stage("page_count"):
+            total_pages, page_texts = self._read_pdf(saved_pdf_path)
             
         # 3. Store Metadata
-        metadata_store.add_document(unique_id, {
+        self.metadata_store.add_document(unique_id, {
             "unique_id": unique_id,
             "original_name": original_filename,
             "total_pages": total_pages,
             "upload_date": timestamp,
             "collection": self.collection_name,
-            "pdf_path": saved_pdf_path
+            "pdf_path": saved_pdf_path,
+            "shard_key": shard_key,
+            "tenant_id": tenant_id
         })
 
         # 4. Process Pages
@@ -96,8 +236,6 @@ class DocumentProcessor:
         # This implies it OVERWRITES points 0, 1, 2... for EVERY document if they share the same collection!
         # This is a BUG in the original pipeline if multiple documents are in the same collection.
         # FIX: Use UUIDs for points.
-        
-        import uuid
 
         for start_page in range(0, total_pages + 1, batch_size): # Logic from rag_pipeline seems to be chunking by batch_size for processing?
             # Wait, the loop in rag_pipeline is `for start_page in range(0, total_pages + 1, batch_size):`
@@ -117,86 +255,365 @@ class DocumentProcessor:
             pass # We will implement the loop below
         
         # Implementation of processing loop
-        # We iterate through pages in chunks of `convert_batch_size`
-        current_page = 1 # 1-based index for pdf2image
+        # Pages stream in one at a time and are released once saved and
+        # embedded, so memory depends on batch_size, not on the PDF length
         pages_processed = 0
         
-        with tqdm(total=total_pages, desc="Processing Pages") as pbar:
-            while current_page <= total_pages:
-                end_page = min(current_page + convert_batch_size - 1, total_pages)
-                
-                # Convert
-                try:
-                    images = convert_from_path(
-                        saved_pdf_path, 
-                        first_page=current_page, 
-                        last_page=end_page
-                    )
-                except Exception as e:
-                    print(f"Error converting pages {current_page}-{end_page}: {e}")
-                    current_page = end_page + 1
-                    continue
-                
-                # Save Images Locally
-                # Structure: Images/unique_id/unique_id_pageNum.png
-                images_dir = os.path.join(config.IMAGES_BASE_PATH, unique_id) # User wanted folder name to be unique_id? 
-                # User said: "name of the document should be same as the origianl name along with the unique identifier... this naming should be used for the document in the collection as wel instead of something like tmph..."
-                # "Store it as tmph... Now when displaying in the document list this document name should be visible not the temporary name."
-                # I will use unique_id for the folder name to avoid conflicts.
-                os.makedirs(images_dir, exist_ok=True)
+        with tqdm(total=total_pages, desc="Processing Pages") as pbar, page_store.open_writer(unique_id) as page_archive:
+            pages = iter_rendered_pages(saved_pdf_path, total_pages, window=convert_batch_size, timer=timer)
+            for batch_pages in iter_batches(pages, batch_size):
+                INGEST_QUEUE_DEPTH.set(len(batch_pages))
                 
-                for i, img in enumerate(images):
-                    page_num = current_page + i
-                    img_path = os.path.join(images_dir, f"{unique_id}_{page_num}.png")
-                    img.save(img_path)
+                # Save Images Locally, appended to the document's page archive
+                with timer.stage("save_images"):
+                    for page_num, img in batch_pages:
+                        written = page_archive.add_page(page_num, encode_image(img))
+                        INGEST_BYTES.inc(written, kind="image")
                 
-                # Generate Embeddings in sub-batches
-                for i in range(0, len(images), batch_size):
-                    batch_imgs = images[i : i + batch_size]
-                    
-                    with torch.no_grad():
-                        processed_batch = self.colpali_processor.process_images(batch_imgs).to(self.colpali_model.device)
-                        embeddings = self.colpali_model(**processed_batch)
-                    
-                    # Upload to Qdrant
-                    points = []
-                    for j, emb in enumerate(embeddings):
-                        page_num = current_page + i + j
-                        vector = emb.cpu().float().numpy().tolist()
-                        
-                        # Payload uses original name for display, but unique ID for reference
-                        payload = {
-                            "document_name": original_filename, # Display Name
-                            "unique_document_id": unique_id,    # Internal ID
-                            "page_number": page_num,
-                            "timestamp": timestamp,
-                            "total_pages": total_pages
-                        }
-                        
-                        points.append(qdrant_models.PointStruct(
-                            id=str(uuid.uuid4()), # Unique Point ID
-                            vector=vector,
-                            payload=payload
-                        ))
-                    
-                    self.client.upsert(
-                        collection_name=self.collection_name,
-                        points=points
-                    )
+                self._index_pages(
+                    batch_pages, unique_id, original_filename, timestamp, total_pages, page_texts,
+                    timer, shard_key=shard_key, tenant_id=tenant_id,
+                )
+                INGEST_QUEUE_DEPTH.dec(len(batch_pages))
                 
                 # Update progress
-                pages_processed += len(images)
-                if progress_callback:
-                    progress_callback(pages_processed, total_pages)
-                
-                # Cleanup
-                current_page = end_page + 1
-                pbar.update(len(images))
-                del images
-                if torch.cuda.is_available():
-                    torch.cuda.empty_cache()
-                gc.collect()
+                pages_processed += len(batch_pages)
+                pbar.update(len(batch_pages))
+                self._report_progress(
+                    progress_callback, event_callback, unique_id, pages_processed, total_pages, started, timer
+                )
 
+        INGEST_DOCUMENTS.inc()
         return unique_id
 
+    def update_document(
+        self,
+        unique_id: str,
+        new_pdf_path: str,
+        batch_size: int = 4,
+        convert_batch_size: int = 10,
+        progress_callback = None,
+        event_callback = None,
+    ) -> dict:
+        """
+        Replace the PDF of an indexed document, re-embedding only the pages that changed
+
+        Every page of the new PDF is rendered and its pixel hash compared with
+        the page_hash stored in the payload of the same page number. Changed
+        and new pages are embedded and upserted (changed pages keep their point
+        ID), points of pages past the new end are deleted, and total_pages is
+        updated in the remaining payloads and in the catalog. Pages indexed
+        before page hashes were stored count as changed.
+
+        Args:
+            unique_id: Document to update (must belong to this collection)
+            new_pdf_path: Path to the new version of the PDF
+            batch_size: Batch size for embedding generation
+            convert_batch_size: Batch size for PDF conversion
+            progress_callback: Optional callback function(current_page, total_pages), as for process_document
+            event_callback: Optional callback function(event), as for process_document
+
+        Returns:
+            Summary with "total_pages", "changed" and "removed" (page numbers) and "unchanged" (count)
+        """
+        from qdrant_client.http import models as qdrant_models
+        from tqdm import tqdm
+
+        document = self.metadata_store.get_document(unique_id)
+        if not document or document.get("collection") != self.collection_name:
+            raise Exception(f"Document '{unique_id}' is not in collection '{self.collection_name}'")
+        shard_key = document.get("shard_key")
+        tenant_id = document.get("tenant_id")
+        document_name = document.get("original_name", unique_id)
+
+        timer = StageTimer()
+        started = time.perf_counter()
+
+        # Stored pages: point ID and render hash per page number
+        document_filter = qdrant_models.Filter(must=[
+            qdrant_models.FieldCondition(key="unique_document_id", match=qdrant_models.MatchValue(value=unique_id))
+        ])
+        stored = {}
+        timestamp = document.get("upload_date", "")
+        with timer.stage("load_hashes"):
+            offset = None
+            while True:
+                records, offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=document_filter,
+                    limit=256,
+                    offset=offset,
+                    with_payload=["page_number", "page_hash", "timestamp"],
+                    with_vectors=False,
+                    shard_key_selector=shard_key,
+                )
+                for record in records:
+                    stored[int(record.payload["page_number"])] = (record.id, record.payload.get("page_hash"))
+                    timestamp = record.payload.get("timestamp", timestamp)
+                if offset is None:
+                    break
+
+        with timer.stage("page_count"):
+            total_pages, page_texts = self._read_pdf(new_pdf_path)
+
+        print(f"🔄 Updating: {document_name} ({len(stored)} stored pages, {total_pages} in the new PDF)")
+
+        page_store = PageStore()
+        changed = []
+        pages_processed = 0
+        with tqdm(total=total_pages, desc="Updating Pages") as pbar, page_store.open_writer(unique_id) as page_archive:
+            pages = iter_rendered_pages(new_pdf_path, total_pages, window=convert_batch_size, timer=timer)
+            pending, hashes = [], {}
+
+            def flush():
+                with timer.stage("save_images"):
+                    for page_num, img in pending:
+                        written = page_archive.add_page(page_num, encode_image(img))
+                        INGEST_BYTES.inc(written, kind="image")
+                self._index_pages(
+                    pending, unique_id, document_name, timestamp, total_pages, page_texts,
+                    timer, shard_key=shard_key, tenant_id=tenant_id,
+                    point_ids={page_num: point_id for page_num, (point_id, _) in stored.items()},
+                    page_hashes=hashes,
+                )
+                changed.extend(page_num for page_num, _ in pending)
+                pending.clear()
+
+            # Unchanged pages are released as soon as they are hashed
+            for page_num, img in pages:
+                with timer.stage("hash"):
+                    hashes[page_num] = page_hash(img)
+                if stored.get(page_num, (None, None))[1] != hashes[page_num]:
+                    pending.append((page_num, img))
+                    if len(pending) == batch_size:
+                        flush()
+                pages_processed += 1
+                pbar.update(1)
+                if pages_processed % convert_batch_size == 0:
+                    self._report_progress(
+                        progress_callback, event_callback, unique_id, pages_processed, total_pages, started, timer
+                    )
+            if pending:
+                flush()
+            if pages_processed % convert_batch_size:
+                self._report_progress(
+                    progress_callback, event_callback, unique_id, pages_processed, total_pages, started, timer
+                )
+
+            removed = sorted(page_num for page_num in stored if page_num > total_pages)
+            for page_num in removed:
+                page_archive.remove_page(page_num)
+
+        with timer.stage("upsert"):
+            if removed:
+                self.client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=qdrant_models.FilterSelector(filter=qdrant_models.Filter(must=[
+                        *document_filter.must,
+                        qdrant_models.FieldCondition(key="page_number", range=qdrant_models.Range(gt=total_pages)),
+                    ])),
+                    shard_key_selector=shard_key,
+                )
+            if total_pages != len(stored) or total_pages != int(document.get("total_pages") or 0):
+                # Unchanged pages still carry the old page count
+                self.client.set_payload(
+                    collection_name=self.collection_name,
+                    payload={"total_pages": total_pages},
+                    points=document_filter,
+                    shard_key_selector=shard_key,
+                )
+        bump_generation(self.collection_name)
+        if self.vector_store is not None and removed:
+            self.vector_store.replace_pages(
+                self.collection_name, unique_id, [], [], document_name=document_name, total_pages=total_pages,
+            )
+
+        # Replace the stored PDF last, so a failed update leaves the old version viewable
+        saved_pdf_path = page_store.find_pdf(unique_id) or page_store.pdf_path(unique_id)
+        os.makedirs(os.path.dirname(saved_pdf_path), exist_ok=True)
+        with timer.stage("save_pdf"):
+            shutil.copy2(new_pdf_path, saved_pdf_path + ".tmp")
+            os.replace(saved_pdf_path + ".tmp", saved_pdf_path)
+        if config.PDF_LINEARIZE:
+            from asset_server import linearize_pdf
+            with timer.stage("linearize"):
+                linearize_pdf(saved_pdf_path)
+        INGEST_BYTES.inc(os.path.getsize(saved_pdf_path), kind="pdf")
+
+        document.update({
+            "total_pages": total_pages,
+            "pdf_path": saved_pdf_path,
+            "updated_date": datetime.now().strftime("%Y-%m-%d_%H-%M-%S"),
+        })
+        self.metadata_store.add_document(unique_id, document)
+
+        print(f"✅ Updated {unique_id}: {len(changed)} page(s) re-embedded, {len(removed)} removed")
+        return {
+            "total_pages": total_pages,
+            "changed": changed,
+            "unchanged": total_pages - len(changed),
+            "removed": removed,
+        }
+
+    def _read_pdf(self, pdf_path: str):
+        """Page count of a PDF, and the text of each page for collections with a text index
+
+        Returns:
+            (total_pages, page_texts)
+        """
+        from PyPDF2 import PdfReader
+
+        try:
+            with open(pdf_path, "rb") as file:
+                pdf_reader = PdfReader(file)
+                total_pages = len(pdf_reader.pages)
+                page_texts = []
+                if self.text_index:
+                    for page in pdf_reader.pages:
+                        try:
+                            page_texts.append(page.extract_text() or "")
+                        except Exception as e:
+                            # Broken text layers should not block the visual index
+                            print(f"Warning: Could not extract text: {e}")
+                            page_texts.append("")
+        except Exception as e:
+            raise Exception(f"Error reading PDF: {e}")
+        return total_pages, page_texts
+
+    def _index_pages(
+        self,
+        pages,
+        unique_id: str,
+        document_name: str,
+        timestamp: str,
+        total_pages: int,
+        page_texts,
+        timer: StageTimer,
+        shard_key: str = None,
+        tenant_id: str = None,
+        point_ids: dict = None,
+        page_hashes: dict = None,
+    ):
+        """Embed one batch of rendered pages and upsert their points
+
+        Args:
+            pages: (page_number, PIL image) pairs
+            unique_id: Document the pages belong to
+            document_name: Display name stored in the payload
+            timestamp: Upload timestamp stored in the payload
+            total_pages: Page count of the document
+            page_texts: Text of every page (empty without a text index)
+            timer: Stage timer of the current run
+            shard_key: Shard key the document's points are routed to
+            tenant_id: Tenant the document belongs to
+            point_ids: Optional {page_number: point ID}; pages listed keep their
+                point ID, so the upsert replaces the old point in place
+            page_hashes: Optional {page_number: page_hash} already computed
+
+        Returns:
+            The page vectors, one (n_tokens, dim) array per page
+        """
+        import torch
+        import uuid
+        from qdrant_client.http import models as qdrant_models
+        from qdrant_manager import TENANT_FIELD
+
+        images = [image for _, image in pages]
+        INGEST_BATCH_SIZE.observe(len(images), stage="embed")
+
+        with timer.stage("preprocess"):
+            processed_batch = self.colpali_processor.process_images(images).to(self.colpali_model.device)
+        with timer.stage("forward"), torch.no_grad():
+            embeddings = self.colpali_model(**processed_batch)
+            if torch.cuda.is_available():
+                # Kernels run asynchronously; wait so the time lands in this stage
+                torch.cuda.synchronize()
+        with timer.stage("d2h"):
+            page_vectors = [emb.cpu().float().numpy() for emb in embeddings]
+
+        # Upload to Qdrant
+        points = []
+        for (page_num, image), page_vector in zip(pages, page_vectors):
+            vector = page_vector.tolist()
+            if self.text_index:
+                indices, values = document_sparse_vector(page_texts[page_num - 1])
+                vector = {
+                    "": vector,
+                    TEXT_VECTOR_NAME: qdrant_models.SparseVector(indices=indices, values=values),
+                }
+
+            # Payload uses original name for display, but unique ID for reference
+            payload = {
+                "document_name": document_name, # Display Name
+                "unique_document_id": unique_id,    # Internal ID
+                "page_number": page_num,
+                "page_hash": (page_hashes or {}).get(page_num) or page_hash(image),
+                "timestamp": timestamp,
+                "total_pages": total_pages
+            }
+            if shard_key is not None:
+                payload["shard_key"] = shard_key
+            if tenant_id is not None:
+                payload[TENANT_FIELD] = tenant_id
+
+            points.append(qdrant_models.PointStruct(
+                id=(point_ids or {}).get(page_num) or str(uuid.uuid4()), # Unique Point ID
+                vector=vector,
+                payload=payload
+            ))
+
+        with timer.stage("upsert"):
+            self.client.upsert(
+                collection_name=self.collection_name,
+                points=points,
+                shard_key_selector=shard_key
+            )
+        bump_generation(self.collection_name)
+        INGEST_POINTS.inc(len(points))
+        INGEST_PAGES.inc(len(points))
+
+        # Keep a local float16 copy for exact MaxSim reranking
+        if self.vector_store is not None:
+            page_numbers = [page_num for page_num, _ in pages]
+            if point_ids is None:
+                self.vector_store.append_pages(
+                    self.collection_name, unique_id, page_numbers, page_vectors,
+                    document_name=document_name, total_pages=total_pages,
+                )
+            else:
+                self.vector_store.replace_pages(
+                    self.collection_name, unique_id, page_numbers, page_vectors,
+                    document_name=document_name, total_pages=total_pages,
+                )
+        return page_vectors
+
+    @classmethod
+    def _report_progress(
+        cls, progress_callback, event_callback, unique_id: str, pages_processed: int, total_pages: int,
+        started: float, timer: StageTimer,
+    ):
+        """Call the progress callbacks that were given"""
+        if progress_callback:
+            progress_callback(pages_processed, total_pages)
+        if event_callback:
+            event_callback(cls._progress_event(unique_id, pages_processed, total_pages, started, timer))
+
+    @staticmethod
+    def _progress_event(unique_id: str, pages_processed: int, total_pages: int, started: float, timer: StageTimer) -> dict:
+        """Structured progress event passed to event_callback"""
+        elapsed = time.perf_counter() - started
+        pages_per_second = pages_processed / elapsed if elapsed > 0 else 0.0
+        remaining = total_pages - pages_processed
+        return {
+            "unique_id": unique_id,
+            "pages_processed": pages_processed,
+            "total_pages": total_pages,
+            "elapsed_seconds": elapsed,
+            "pages_per_second": pages_per_second,
+            "eta_seconds": remaining / pages_per_second if pages_per_second > 0 else None,
+            "stage_seconds": dict(timer.totals),
+            "rss_bytes": process_rss_bytes(),
+            "gpu_memory_bytes": gpu_memory_bytes(),
+        }
+
 
@@ -0,0 +1,157 @@
+"""
+Embedding Model Module
+Loads the ColPali model once per process so document ingestion and query
+search share the same weights instead of each loading their own copy.
+- Optional background warm-up (start_warmup), so the first upload or search
+  after a restart does not wait for the weights
+- Safetensors weights loaded with low_cpu_mem_usage (memory-mapped, no
+  second copy in RAM), from a preconverted local copy when configured
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+import config
+
+_model = None
+_processor = None
+_lock = threading.Lock()
+
+# Warm-up state: "idle", "loading", "ready" or "failed"
+_status = {"state": "idle", "error": None, "seconds": None}
+_status_lock = threading.Lock()
+_ready = threading.Event()
+_warmup_thread: Optional[threading.Thread] = None
+
+
+def model_source() -> str:
+    """Local preconverted copy if configured and present, else the hub model name"""
+    local_path = config.COLPALI_LOCAL_MODEL_PATH
+    if local_path and os.path.isdir(local_path):
+        return local_path
+    return config.COLPALI_MODEL_NAME
+
+
+def _load():
+    import torch
+    from colpali_engine.models import ColQwen2_5, ColQwen2_5_Processor
+
+    source = model_source()
+    local = source != config.COLPALI_MODEL_NAME
+    device = "cuda:0" if torch.cuda.is_available() else "cpu"
+    model = ColQwen2_5.from_pretrained(
+        source,
+        torch_dtype=torch.bfloat16,
+        device_map=device,
+        low_cpu_mem_usage=True,
+        use_safetensors=True,
+        local_files_only=local,
+    ).eval()
+    processor = ColQwen2_5_Processor.from_pretrained(source, use_fast=True, local_files_only=local)
+    return model, processor
+
+
+def get_model():
+    """Return the shared (model, processor) pair, loading it on first use
+
+    Waits for a warm-up in progress instead of loading a second copy.
+    """
+    global _model, _processor
+    with _lock:
+        if _model is None:
+            started = time.perf_counter()
+            _set_status("loading")
+            try:
+                _model, _processor = _load()
+            except Exception as e:
+                _set_status("failed", error=str(e))
+                raise
+            _set_status("ready", seconds=time.perf_counter() - started)
+            _ready.set()
+        return _model, _processor
+
+
+def _set_status(state: str, error: Optional[str] = None, seconds: Optional[float] = None):
+    with _status_lock:
+        _status.update(state=state, error=error, seconds=seconds)
+
+
+def model_status() -> Dict:
+    """Warm-up state: {"state": "idle"|"loading"|"ready"|"failed", "error", "seconds"}"""
+    with _status_lock:
+        return dict(_status)
+
+
+def _warm_up():
+    try:
+        model, processor = get_model()
+        if config.MODEL_WARMUP_EMBED:
+            # One tiny forward pass initializes kernels and allocator pools
+            import torch
+            from PIL import Image
+
+            batch = processor.process_images([Image.new("RGB", (64, 64), "white")]).to(model.device)
+            with torch.no_grad():
+                model(**batch)
+    except Exception as e:
+        print(f"Model warm-up failed: {e}")
+
+
+def start_warmup(retry: bool = False) -> Dict:
+    """Load the model in a daemon thread; safe to call on every Streamlit rerun
+
+    Args:
+        retry: Start again after a failed load
+
+    Returns:
+        The current model_status()
+    """
+    global _warmup_thread
+    with _status_lock:
+        state = _status["state"]
+        start = _warmup_thread is None or (retry and state == "failed" and not _warmup_thread.is_alive())
+        if start and state != "ready":
+            _status.update(state="loading", error=None)
+            _warmup_thread = threading.Thread(target=_warm_up, name="model-warmup", daemon=True)
+            _warmup_thread.start()
+    return model_status()
+
+
+def wait_until_ready(timeout: Optional[float] = None) -> bool:
+    """Block until the model is loaded
+
+    Returns:
+        True if ready, False on timeout or if loading failed
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while not _ready.is_set():
+        if model_status()["state"] == "failed" and not (_warmup_thread and _warmup_thread.is_alive()):
+            return False
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            return False
+        _ready.wait(0.5 if remaining is None else min(0.5, remaining))
+    return True
+
+
+def save_local_copy(path: str):
+    """Write the model and processor as bfloat16 safetensors for fast local loading
+
+    Point COLPALI_LOCAL_MODEL_PATH at `path` to use it.
+    """
+    model, processor = get_model()
+    model.save_pretrained(path, safe_serialization=True)
+    processor.save_pretrained(path)
+    print(f"Saved {config.COLPALI_MODEL_NAME} to {path}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Preconvert the ColPali model for fast local loading")
+    parser.add_argument("path", nargs="?", default=config.COLPALI_LOCAL_MODEL_PATH)
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("give a path or set COLPALI_LOCAL_MODEL_PATH")
+    save_local_copy(args.path)
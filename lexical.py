@@ -0,0 +1,58 @@
+"""
+Lexical Module
+Turns page text into BM25-style sparse vectors for Qdrant's sparse index.
+
+Tokens are hashed into the sparse index space, so no vocabulary has to be
+stored or shared. Documents carry the BM25 term-frequency part; the IDF part
+is computed by Qdrant from the collection (Modifier.IDF), which keeps it
+correct as documents are added and deleted.
+"""
+
+import re
+import zlib
+from collections import Counter
+from typing import List, Tuple
+import config
+
+TEXT_VECTOR_NAME = "text"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, ignoring single characters"""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if len(token) > 1]
+
+
+def _token_index(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8")) & 0x7FFFFFFF
+
+
+def document_sparse_vector(
+    text: str,
+    k1: float = config.BM25_K1,
+    b: float = config.BM25_B,
+    avg_length: float = config.BM25_AVG_PAGE_TOKENS,
+) -> Tuple[List[int], List[float]]:
+    """BM25 term-frequency weights of a page
+
+    Returns:
+        (indices, values) of the sparse vector; both empty for pages without text
+    """
+    tokens = tokenize(text or "")
+    if not tokens:
+        return [], []
+    length_norm = k1 * (1 - b + b * len(tokens) / avg_length)
+    weights: dict = {}
+    for token, tf in Counter(tokens).items():
+        index = _token_index(token)
+        # Hash collisions simply add up
+        weights[index] = weights.get(index, 0.0) + tf * (k1 + 1) / (tf + length_norm)
+    indices = sorted(weights)
+    return indices, [weights[i] for i in indices]
+
+
+def query_sparse_vector(text: str) -> Tuple[List[int], List[float]]:
+    """Sparse query vector: weight 1 per distinct query term (IDF is applied by Qdrant)"""
+    indices = sorted({_token_index(token) for token in tokenize(text)})
+    return indices, [1.0] * len(indices)
@@ -1,55 +1,513 @@
 import json
 import os
+import socket
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 import config
 
+# Columns the document list can be ordered by, mapped to their indexed SQL column
+SORT_COLUMNS = {
+    "upload_date": "upload_date",
+    "name": "original_name",
+    "pages": "total_pages",
+}
+
+# Name search modes supported by MetadataStore.search_documents
+SEARCH_MODES = ("substring", "prefix", "token")
+
+
+def _process_alive(pid: int) -> bool:
+    """Whether a process on this host is still running"""
+    if os.name == "nt":
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        ctypes.windll.kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
 class MetadataStore:
-    """Manages document metadata in a JSON file"""
-    
-    def __init__(self, storage_path: str = "document_metadata.json"):
-        self.storage_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), storage_path)
+    """Manages document metadata in an indexed SQLite catalog"""
+
+    def __init__(self, storage_path: str = "document_metadata.db"):
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        self.storage_path = os.path.join(base_dir, storage_path)
+        # Pre-SQLite installs kept everything in a single JSON file
+        self.legacy_json_path = os.path.join(base_dir, "document_metadata.json")
         self._ensure_storage()
-        
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection (Streamlit sessions run in separate threads)"""
+        conn = sqlite3.connect(self.storage_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
     def _ensure_storage(self):
-        """Ensure the JSON file exists"""
-        if not os.path.exists(self.storage_path):
-            with open(self.storage_path, 'w') as f:
-                json.dump({"documents": {}}, f)
-    
-    def _read_data(self) -> Dict:
-        """Read data from JSON file"""
+        """Ensure the catalog schema exists and import the legacy JSON store once"""
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    unique_id TEXT PRIMARY KEY,
+                    collection TEXT,
+                    original_name TEXT COLLATE NOCASE,
+                    total_pages INTEGER,
+                    upload_date TEXT,
+                    metadata TEXT NOT NULL,
+                    tenant_id TEXT
+                )
+                """
+            )
+            columns = [row["name"] for row in conn.execute("PRAGMA table_info(documents)")]
+            if "tenant_id" not in columns:
+                # Catalogs created before multi-tenant collections
+                conn.execute("ALTER TABLE documents ADD COLUMN tenant_id TEXT")
+                conn.execute("UPDATE documents SET tenant_id = json_extract(metadata, '$.tenant_id')")
+            for column in SORT_COLUMNS.values():
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_documents_collection_{column} "
+                    f"ON documents (collection, {column})"
+                )
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_documents_tenant_{column} "
+                    f"ON documents (collection, tenant_id, {column})"
+                )
+            self._ensure_search_tables(conn)
+            # Collections in bulk-load mode: the settings to restore, and who is loading
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bulk_loads ("
+                "collection TEXT PRIMARY KEY, settings TEXT NOT NULL, state TEXT NOT NULL DEFAULT 'active')"
+            )
+            if "state" not in [row["name"] for row in conn.execute("PRAGMA table_info(bulk_loads)")]:
+                conn.execute("ALTER TABLE bulk_loads ADD COLUMN state TEXT NOT NULL DEFAULT 'active'")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bulk_load_holders ("
+                "load_id TEXT PRIMARY KEY, collection TEXT NOT NULL, host TEXT, pid INTEGER, started_at TEXT)"
+            )
+            is_empty = conn.execute("SELECT 1 FROM documents LIMIT 1").fetchone() is None
+
+        if is_empty and os.path.exists(self.legacy_json_path):
+            self._import_legacy_json()
+
+    def _ensure_search_tables(self, conn: sqlite3.Connection):
+        """Create the FTS5 name indexes, falling back to LIKE scans if unavailable"""
+        # Word/prefix-of-word matching ("token" mode)
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5("
+                "unique_id UNINDEXED, original_name, tokenize='unicode61', prefix='2 3')"
+            )
+            self.has_token_index = True
+        except sqlite3.OperationalError:
+            self.has_token_index = False
+        # Arbitrary substring matching ("substring" mode), needs SQLite >= 3.34
         try:
-            with open(self.storage_path, 'r') as f:
-                return json.load(f)
-        except Exception:
-            return {"documents": {}}
-            
-    def _write_data(self, data: Dict):
-        """Write data to JSON file"""
-        with open(self.storage_path, 'w') as f:
-            json.dump(data, f, indent=4)
-            
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS documents_trigram USING fts5("
+                "unique_id UNINDEXED, original_name, tokenize='trigram')"
+            )
+            self.has_trigram_index = True
+        except sqlite3.OperationalError:
+            self.has_trigram_index = False
+
+        # Index documents that were cataloged before the search tables existed
+        for table in self._search_tables():
+            if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is None:
+                conn.execute(
+                    f"INSERT INTO {table} (unique_id, original_name) "
+                    f"SELECT unique_id, original_name FROM documents"
+                )
+
+    def _search_tables(self) -> List[str]:
+        tables = []
+        if self.has_token_index:
+            tables.append("documents_fts")
+        if self.has_trigram_index:
+            tables.append("documents_trigram")
+        return tables
+
+    def _import_legacy_json(self):
+        """Copy documents from the old document_metadata.json into the catalog"""
+        try:
+            with open(self.legacy_json_path, 'r') as f:
+                documents = json.load(f).get("documents", {})
+        except Exception as e:
+            print(f"Warning: Could not read legacy metadata file: {e}")
+            return
+        with self._connect() as conn:
+            for unique_id, metadata in documents.items():
+                self._upsert(conn, unique_id, metadata)
+
+    def _upsert(self, conn: sqlite3.Connection, unique_id: str, metadata: Dict):
+        original_name = metadata.get("original_name", unique_id)
+        for table in self._search_tables():
+            conn.execute(f"DELETE FROM {table} WHERE unique_id = ?", (unique_id,))
+            conn.execute(
+                f"INSERT INTO {table} (unique_id, original_name) VALUES (?, ?)",
+                (unique_id, original_name),
+            )
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO documents
+                (unique_id, collection, original_name, total_pages, upload_date, metadata, tenant_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                unique_id,
+                metadata.get("collection"),
+                original_name,
+                int(metadata.get("total_pages") or 0),
+                metadata.get("upload_date", ""),
+                json.dumps(metadata),
+                metadata.get("tenant_id"),
+            ),
+        )
+
     def add_document(self, unique_id: str, metadata: Dict):
         """Add a document to the store"""
-        data = self._read_data()
-        data["documents"][unique_id] = metadata
-        self._write_data(data)
-        
+        with self._connect() as conn:
+            self._upsert(conn, unique_id, metadata)
+
     def get_document(self, unique_id: str) -> Optional[Dict]:
         """Get document metadata"""
-        data = self._read_data()
-        return data["documents"].get(unique_id)
-        
-    def list_documents(self) -> List[Dict]:
-        """List all documents"""
-        data = self._read_data()
-        return list(data["documents"].values())
-        
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT metadata FROM documents WHERE unique_id = ?", (unique_id,)
+            ).fetchone()
+        return json.loads(row["metadata"]) if row else None
+
+    def list_documents(
+        self,
+        collection: Optional[str] = None,
+        sort_by: str = "upload_date",
+        descending: bool = True,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        tenant_id: Optional[str] = None,
+    ) -> List[Dict]:
+        """List documents, optionally one page of a collection at a time
+
+        Args:
+            collection: Only return documents of this collection (default: all)
+            tenant_id: Only return documents of this tenant (default: all)
+            sort_by: One of "upload_date", "name" or "pages"
+            descending: Sort order
+            limit: Maximum number of documents to return (default: no limit)
+            offset: Number of documents to skip
+        """
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key '{sort_by}', expected one of {list(SORT_COLUMNS)}")
+        order = "DESC" if descending else "ASC"
+        query = "SELECT metadata FROM documents"
+        params: list = []
+        conditions = []
+        if collection is not None:
+            conditions.append("collection = ?")
+            params.append(collection)
+        if tenant_id is not None:
+            conditions.append("tenant_id = ?")
+            params.append(tenant_id)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {SORT_COLUMNS[sort_by]} {order}, unique_id {order}"
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [json.loads(row["metadata"]) for row in rows]
+
+    def search_documents(
+        self,
+        query: str,
+        collection: Optional[str] = None,
+        mode: str = "substring",
+        limit: int = 50,
+        tenant_id: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+    ) -> List[Dict]:
+        """Search documents by name using the catalog's indexes
+
+        Args:
+            query: Text to look for in the document name (case-insensitive)
+            collection: Only search documents of this collection (default: all)
+            mode: "substring" (anywhere in the name), "prefix" (name starts with
+                the query) or "token" (every word matches the start of a word in the name)
+            limit: Maximum number of documents to return
+            tenant_id: Only search documents of this tenant (default: all)
+            sort_by: Order matches like list_documents ("upload_date", "name" or
+                "pages") instead of by relevance/name
+            descending: Sort order when `sort_by` is set
+
+        Returns:
+            List of document metadata dictionaries
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}', expected one of {SEARCH_MODES}")
+        if sort_by is not None and sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key '{sort_by}', expected one of {list(SORT_COLUMNS)}")
+        query = query.strip()
+        if not query:
+            return []
+
+        params: list = []
+        if mode == "token" and self.has_token_index:
+            tokens = query.split()
+            match = " ".join(f'"{token.replace(chr(34), chr(34) * 2)}"*' for token in tokens)
+            sql = (
+                "SELECT d.metadata FROM documents_fts f JOIN documents d ON d.unique_id = f.unique_id "
+                "WHERE documents_fts MATCH ?"
+            )
+            params.append(match)
+            order = " ORDER BY f.rank"
+        elif mode == "substring" and self.has_trigram_index and len(query) >= 3:
+            match = '"' + query.replace('"', '""') + '"'
+            sql = (
+                "SELECT d.metadata FROM documents_trigram t JOIN documents d ON d.unique_id = t.unique_id "
+                "WHERE documents_trigram MATCH ?"
+            )
+            params.append(match)
+            order = " ORDER BY d.original_name"
+        else:
+            # Prefix searches use the (collection, original_name) index through
+            # SQLite's LIKE optimization; short substrings fall back to a scan.
+            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            pattern = f"{escaped}%" if mode == "prefix" else f"%{escaped}%"
+            sql = "SELECT d.metadata FROM documents d WHERE d.original_name LIKE ? ESCAPE '\\'"
+            params.append(pattern)
+            order = " ORDER BY d.original_name"
+
+        if collection is not None:
+            sql += " AND d.collection = ?"
+            params.append(collection)
+        if tenant_id is not None:
+            sql += " AND d.tenant_id = ?"
+            params.append(tenant_id)
+        if sort_by is not None:
+            direction = "DESC" if descending else "ASC"
+            order = f" ORDER BY d.{SORT_COLUMNS[sort_by]} {direction}, d.unique_id {direction}"
+        sql += order + " LIMIT ?"
+        params.append(limit)
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [json.loads(row["metadata"]) for row in rows]
+
+    def count_documents(self, collection: Optional[str] = None, tenant_id: Optional[str] = None) -> int:
+        """Count documents, optionally restricted to a collection and tenant"""
+        with self._connect() as conn:
+            if collection is None:
+                row = conn.execute("SELECT COUNT(*) FROM documents").fetchone()
+            elif tenant_id is None:
+                row = conn.execute(
+                    "SELECT COUNT(*) FROM documents WHERE collection = ?", (collection,)
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT COUNT(*) FROM documents WHERE collection = ? AND tenant_id = ?",
+                    (collection, tenant_id),
+                ).fetchone()
+        return row[0]
+
+    def backfill_collection(self, collection: str, documents: List[Dict]) -> int:
+        """Add catalog entries for documents that exist in Qdrant but not locally
+
+        Args:
+            collection: Collection the documents belong to
+            documents: Output of QdrantManager.list_documents_in_collection
+
+        Returns:
+            Number of documents added
+        """
+        added = 0
+        with self._connect() as conn:
+            for doc in documents:
+                unique_id = doc["unique_document_id"]
+                exists = conn.execute(
+                    "SELECT 1 FROM documents WHERE unique_id = ?", (unique_id,)
+                ).fetchone()
+                if exists:
+                    continue
+                self._upsert(conn, unique_id, {
+                    "unique_id": unique_id,
+                    "original_name": doc.get("document_name", unique_id),
+                    "total_pages": doc.get("total_pages", 0),
+                    "upload_date": doc.get("timestamp", ""),
+                    "collection": collection,
+                    "tenant_id": doc.get("tenant_id"),
+                })
+                added += 1
+        return added
+
     def delete_document(self, unique_id: str):
         """Delete a document from the store"""
-        data = self._read_data()
-        if unique_id in data["documents"]:
-            del data["documents"][unique_id]
-            self._write_data(data)
+        with self._connect() as conn:
+            for table in self._search_tables():
+                conn.execute(f"DELETE FROM {table} WHERE unique_id = ?", (unique_id,))
+            conn.execute("DELETE FROM documents WHERE unique_id = ?", (unique_id,))
+
+    def delete_documents(self, unique_ids: List[str]):
+        """Delete several documents in one transaction"""
+        with self._connect() as conn:
+            for unique_id in unique_ids:
+                for table in self._search_tables():
+                    conn.execute(f"DELETE FROM {table} WHERE unique_id = ?", (unique_id,))
+                conn.execute("DELETE FROM documents WHERE unique_id = ?", (unique_id,))
+
+    def document_ids(self) -> Dict[str, Dict]:
+        """Collection, name and upload date of every cataloged document, keyed by unique ID"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT unique_id, collection, original_name, upload_date FROM documents").fetchall()
+        return {
+            row["unique_id"]: {
+                "collection": row["collection"],
+                "original_name": row["original_name"],
+                "upload_date": row["upload_date"],
+            }
+            for row in rows
+        }
+
+    # Bulk loads (see QdrantManager.bulk_load). Qdrant is called between short
+    # write transactions, never inside one, so catalog writes do not wait for it.
+    # A bulk_loads row is "starting" while its settings are read, "active" once
+    # they are saved and "restoring" while the last load puts them back.
+
+    def _prune_bulk_load_holders(self, conn: sqlite3.Connection, collection: str):
+        """Drop holders whose process on this host has exited (crashed loads)"""
+        host = socket.gethostname()
+        rows = conn.execute(
+            "SELECT load_id, pid FROM bulk_load_holders WHERE collection = ? AND host = ?", (collection, host)
+        ).fetchall()
+        for row in rows:
+            if not _process_alive(row["pid"]):
+                conn.execute("DELETE FROM bulk_load_holders WHERE load_id = ?", (row["load_id"],))
+
+    def _add_bulk_load_holder(self, conn: sqlite3.Connection, collection: str, load_id: str):
+        conn.execute(
+            "INSERT INTO bulk_load_holders (load_id, collection, host, pid, started_at) VALUES (?, ?, ?, ?, ?)",
+            (load_id, collection, socket.gethostname(), os.getpid(), datetime.now().isoformat()),
+        )
+
+    def acquire_bulk_load(
+        self, collection: str, load_id: str, read_settings: Callable[[], Dict], enter: Callable[[], None]
+    ):
+        """Register a bulk load, switching the collection to bulk-load settings if it is the first one
+
+        If this raises, call release_bulk_load with the same `load_id` to clean up.
+
+        Args:
+            collection: Collection being loaded
+            load_id: Unique ID of this load
+            read_settings: Returns the current settings, which are saved for
+                release_bulk_load to restore
+            enter: Applies the bulk-load settings; called after they are saved.
+                Neither is called while a bulk_loads row exists (another load is
+                running, or an earlier one was not restored)
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._prune_bulk_load_holders(conn, collection)
+            self._add_bulk_load_holder(conn, collection, load_id)
+            if conn.execute("SELECT 1 FROM bulk_loads WHERE collection = ?", (collection,)).fetchone():
+                return
+            conn.execute(
+                "INSERT INTO bulk_loads (collection, settings, state) VALUES (?, '{}', 'starting')", (collection,)
+            )
+
+        settings = read_settings()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE bulk_loads SET settings = ?, state = 'active' WHERE collection = ?",
+                (json.dumps(settings), collection),
+            )
+        enter()
+
+    def release_bulk_load(self, collection: str, load_id: Optional[str], restore: Callable[[Dict], None]) -> bool:
+        """Unregister a bulk load, calling `restore` with the saved settings if it was the last one
+
+        Args:
+            collection: Collection being loaded
+            load_id: ID passed to acquire_bulk_load (None only restores crashed loads)
+            restore: Restores the saved settings; if it raises, they stay saved for the next attempt
+
+        Returns:
+            True if the settings were restored
+        """
+        if load_id is None:
+            load_id = uuid.uuid4().hex
+            recovering = True
+        else:
+            recovering = False
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if recovering:
+                self._add_bulk_load_holder(conn, collection, load_id)
+            self._prune_bulk_load_holders(conn, collection)
+            others = conn.execute(
+                "SELECT 1 FROM bulk_load_holders WHERE collection = ? AND load_id != ? LIMIT 1", (collection, load_id)
+            ).fetchone()
+            saved = conn.execute(
+                "SELECT settings, state FROM bulk_loads WHERE collection = ?", (collection,)
+            ).fetchone()
+            if others is not None or saved is None or saved["state"] == "starting":
+                conn.execute("DELETE FROM bulk_load_holders WHERE load_id = ?", (load_id,))
+                if saved is not None and others is None:
+                    # The load that claimed it failed (or crashed) before saving the settings
+                    conn.execute("DELETE FROM bulk_loads WHERE collection = ?", (collection,))
+                return False
+            # This load stays registered while restoring, so others wait for it
+            conn.execute("UPDATE bulk_loads SET state = 'restoring' WHERE collection = ?", (collection,))
+
+        try:
+            restore(json.loads(saved["settings"]))
+            restored = True
+        except Exception as e:
+            print(f"Error restoring settings of '{collection}' after bulk load: {e}")
+            restored = False
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM bulk_load_holders WHERE load_id = ?", (load_id,))
+            if restored:
+                conn.execute("DELETE FROM bulk_loads WHERE collection = ?", (collection,))
+            else:
+                conn.execute("UPDATE bulk_loads SET state = 'active' WHERE collection = ?", (collection,))
+        return restored
+
+    def bulk_load_collections(self) -> List[str]:
+        """Collections with saved bulk-load settings (loads running or not yet restored)"""
+        with self._connect() as conn:
+            return [row["collection"] for row in conn.execute("SELECT collection FROM bulk_loads")]
+
+
+_shared_store: Optional[MetadataStore] = None
+_shared_lock = threading.Lock()
+
 
+def get_metadata_store() -> MetadataStore:
+    """Return the process-wide catalog, opened (and migrated) on first use"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = MetadataStore()
+        return _shared_store
@@ -0,0 +1,306 @@
+"""
+Metrics Module
+Minimal in-process metrics registry with Prometheus/OpenMetrics text export:
+- Counter, Gauge and Histogram with optional labels
+- A local HTTP endpoint serving /metrics for Prometheus to scrape
+- Helpers for process RSS and GPU memory gauges
+"""
+
+import bisect
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Sequence, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.type_name}\n"
+        return header + "".join(self._samples())
+
+    def _samples(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}_total{self._format_labels(key)} {value}\n"
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{self._format_labels(key)} {value}\n"
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def sum(self, **labels) -> float:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[1] if state else 0.0
+
+    def _samples(self):
+        with self._lock:
+            items = [(key, (list(s[0]), s[1], s[2])) for key, s in self._values.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = self._format_labels(key, 'le="%s"' % bound)
+                yield f"{self.name}_bucket{labels} {cumulative}\n"
+            labels = self._format_labels(key, 'le="+Inf"')
+            yield f"{self.name}_bucket{labels} {count}\n"
+            yield f"{self.name}_sum{self._format_labels(key)} {total}\n"
+            yield f"{self.name}_count{self._format_labels(key)} {count}\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus/OpenMetrics text exposition of all metrics"""
+        update_process_gauges()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(metric.render() for metric in metrics) + "# EOF\n"
+
+
+registry = Registry()
+
+# Ingestion metrics (see DocumentProcessor.process_document)
+INGEST_STAGE_SECONDS = registry.histogram(
+    "docmanager_ingest_stage_seconds", "Time spent per ingestion stage", ["stage"]
+)
+INGEST_BATCH_SIZE = registry.histogram(
+    "docmanager_ingest_batch_size", "Pages per rasterize/embedding batch", ["stage"],
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+INGEST_PAGES = registry.counter("docmanager_ingest_pages", "Pages embedded and upserted")
+INGEST_POINTS = registry.counter("docmanager_ingest_points", "Points upserted to Qdrant")
+INGEST_BYTES = registry.counter("docmanager_ingest_bytes", "Bytes written per kind", ["kind"])
+INGEST_DOCUMENTS = registry.counter("docmanager_ingest_documents", "Documents fully processed")
+INGEST_FAILURES = registry.counter("docmanager_ingest_failures", "Failed ingestion steps", ["stage"])
+INGEST_QUEUE_DEPTH = registry.gauge(
+    "docmanager_ingest_queue_depth", "Rendered pages waiting to be embedded"
+)
+# Storage reconciler (see reconciler.py)
+RECONCILE_ORPHANS = registry.gauge(
+    "docmanager_reconcile_orphans", "Orphaned documents found by the last reconciler run", ["kind"]
+)
+RECONCILE_BYTES_FREED = registry.counter("docmanager_reconcile_bytes_freed", "Bytes reclaimed by the reconciler")
+PROCESS_RSS_BYTES = registry.gauge("docmanager_process_rss_bytes", "Resident set size of the process")
+GPU_MEMORY_BYTES = registry.gauge("docmanager_gpu_memory_bytes", "GPU memory allocated by torch")
+
+
+class StageTimer:
+    """Times ingestion stages into INGEST_STAGE_SECONDS and keeps per-run totals"""
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the with-block as stage `name`; exceptions count as a failure of it"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            INGEST_FAILURES.inc(stage=name)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            INGEST_STAGE_SECONDS.observe(elapsed, stage=name)
+            self.totals[name] = self.totals.get(name, 0.0) + elapsed
+
+
+def process_rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+def gpu_memory_bytes() -> int:
+    """GPU memory allocated by torch, 0 without CUDA (torch is not imported here)"""
+    torch = sys.modules.get("torch")
+    if torch is None or not torch.cuda.is_available():
+        return 0
+    return int(torch.cuda.memory_allocated())
+
+
+def update_process_gauges():
+    PROCESS_RSS_BYTES.set(process_rss_bytes())
+    GPU_MEMORY_BYTES.set(gpu_memory_bytes())
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/openmetrics-text; version=1.0.0; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_failed = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics in a daemon thread; safe to call on every Streamlit rerun
+
+    Returns:
+        The running server, or None if the port could not be bound
+    """
+    global _server, _server_failed
+    with _server_lock:
+        if _server is None and not _server_failed:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                # Typically another app process already serves this port
+                print(f"Metrics endpoint not started on {host}:{port}: {e}")
+                _server_failed = True
+                return None
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            print(f"Metrics available at http://{host}:{port}/metrics")
+        return _server
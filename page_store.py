@@ -0,0 +1,304 @@
+"""
+Page Store Module
+Page images and PDFs of ingested documents, laid out so file counts stay
+small at millions of pages:
+- One archive per document (<Images>/<ab>/<unique_id>.pages): page images
+  encoded as WebP or JPEG back to back, closed by an offset index; random
+  page reads mmap the archive, and updates rewrite it without dead pages
+- PDFs in hash-fanned directories (<Documents>/<ab>/<cd>/<unique_id>.pdf)
+- Documents ingested before this layout (Images/<unique_id>/<unique_id>_<n>.png
+  and a flat Documents/) are still read and deleted
+"""
+
+import hashlib
+import io
+import mmap
+import os
+import shutil
+import struct
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+import config
+
+ARCHIVE_SUFFIX = ".pages"
+# Each page record: page number, image length, then the encoded image
+RECORD = struct.Struct("<II")
+# Index entry: page number, offset of the image bytes, image length
+INDEX_ENTRY = struct.Struct("<IQI")
+# Last bytes of a closed archive: index offset, entry count, magic
+FOOTER = struct.Struct("<QI4s")
+MAGIC = b"PGS1"
+
+
+def _fan(unique_id: str, levels: int) -> Tuple[str, ...]:
+    digest = hashlib.sha1(unique_id.encode("utf-8")).hexdigest()
+    return tuple(digest[2 * i:2 * i + 2] for i in range(levels))
+
+
+def _read_index(data) -> Tuple[Dict[int, Tuple[int, int]], int]:
+    """Parse the page index of an archive
+
+    Returns:
+        ({page_number: (offset, length)}, end of the page records)
+    """
+    size = len(data)
+    if size >= FOOTER.size:
+        index_offset, count, magic = FOOTER.unpack_from(data, size - FOOTER.size)
+        if magic == MAGIC and index_offset + count * INDEX_ENTRY.size + FOOTER.size == size:
+            index = {}
+            for i in range(count):
+                page, offset, length = INDEX_ENTRY.unpack_from(data, index_offset + i * INDEX_ENTRY.size)
+                index[page] = (offset, length)
+            return index, index_offset
+
+    # No footer (interrupted ingestion): recover the pages from the records
+    index, position = {}, 0
+    while position + RECORD.size <= size:
+        page, length = RECORD.unpack_from(data, position)
+        if position + RECORD.size + length > size:
+            break
+        index[page] = (position + RECORD.size, length)
+        position += RECORD.size + length
+    return index, position
+
+
+def _is_fan_directory(name: str) -> bool:
+    return len(name) == 2 and all(c in "0123456789abcdef" for c in name)
+
+
+class _ArchiveReplaced(Exception):
+    """The archive at a path is no longer the version a reader opened"""
+
+
+@lru_cache(maxsize=256)
+def _cached_index(path: str, inode: int, mtime_ns: int, size: int) -> Dict[int, Tuple[int, int]]:
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        if (stat.st_ino, stat.st_mtime_ns, stat.st_size) != (inode, mtime_ns, size):
+            raise _ArchiveReplaced(path)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _read_index(data)[0]
+
+
+def _archive_index(path: str, stat: os.stat_result, data) -> Dict[int, Tuple[int, int]]:
+    """Index of the archive version `data` maps (opened file with `stat`)"""
+    try:
+        return _cached_index(path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    except _ArchiveReplaced:
+        # Replaced by an update since it was opened: parse this version directly
+        return _read_index(data)[0]
+
+
+def encode_image(image, image_format: str = None, quality: int = None) -> bytes:
+    """Encode a PIL image for the archive (config.PAGE_IMAGE_FORMAT by default)"""
+    image_format = (image_format or config.PAGE_IMAGE_FORMAT).upper()
+    buffer = io.BytesIO()
+    if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    image.save(buffer, format=image_format, quality=quality or config.PAGE_IMAGE_QUALITY)
+    return buffer.getvalue()
+
+
+class PageArchiveWriter:
+    """Writes page images to a document's archive
+
+    A page written again replaces the earlier copy. The index is written on
+    close(), and an archive left without one is still readable.
+    An existing archive is never modified in place, since readers may have it
+    mapped: new pages go to a temporary file, close() copies over the old
+    pages that were neither replaced nor removed and then replaces the
+    archive with it. Replaced and removed pages are dropped, so the archive
+    does not grow with updates, and an update interrupted before close()
+    leaves the previous archive as it was.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.index: Dict[int, Tuple[int, int]] = {}
+        # Pages of the existing archive still to be carried over on close()
+        self._previous: Dict[int, Tuple[int, int]] = {}
+        self._temp_path = None
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                self._previous = _read_index(data)[0]
+            self._temp_path = path + ".tmp"
+            self._file = open(self._temp_path, "wb")
+        else:
+            self._file = open(path, "wb")
+
+    def add_page(self, page_number: int, image_bytes: bytes) -> int:
+        """Append one encoded page image
+
+        Returns:
+            Bytes written
+        """
+        offset = self._file.tell()
+        self._file.write(RECORD.pack(page_number, len(image_bytes)))
+        self._file.write(image_bytes)
+        self.index[page_number] = (offset + RECORD.size, len(image_bytes))
+        self._previous.pop(page_number, None)
+        return RECORD.size + len(image_bytes)
+
+    def remove_page(self, page_number: int):
+        """Drop a page; it is not carried over to the rewritten archive"""
+        self.index.pop(page_number, None)
+        self._previous.pop(page_number, None)
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self._previous:
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for page, (offset, length) in sorted(self._previous.items()):
+                    self.add_page(page, data[offset:offset + length])
+        index_offset = self._file.tell()
+        for page in sorted(self.index):
+            self._file.write(INDEX_ENTRY.pack(page, *self.index[page]))
+        self._file.write(FOOTER.pack(index_offset, len(self.index), MAGIC))
+        self._file.close()
+        if self._temp_path:
+            os.replace(self._temp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PageStore:
+    """Locates, reads and deletes the page images and PDF of each document"""
+
+    def __init__(self, images_root: Optional[str] = None, documents_root: Optional[str] = None):
+        self.images_root = images_root or config.IMAGES_BASE_PATH
+        self.documents_root = documents_root or config.BASE_STORAGE_PATH
+
+    # Page images
+
+    def archive_path(self, unique_id: str) -> str:
+        return os.path.join(self.images_root, *_fan(unique_id, 1), unique_id + ARCHIVE_SUFFIX)
+
+    def legacy_image_path(self, unique_id: str, page_number: int) -> str:
+        return os.path.join(self.images_root, unique_id, f"{unique_id}_{page_number}.png")
+
+    def open_writer(self, unique_id: str) -> PageArchiveWriter:
+        return PageArchiveWriter(self.archive_path(unique_id))
+
+    def page_numbers(self, unique_id: str) -> Iterable[int]:
+        """Page numbers stored in a document's archive"""
+        path = self.archive_path(unique_id)
+        try:
+            with open(path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                if stat.st_size == 0:
+                    return []
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return sorted(_archive_index(path, stat, data))
+        except FileNotFoundError:
+            return []
+
+    def read_page(self, unique_id: str, page_number: int) -> Optional[bytes]:
+        """Encoded image of one page (WebP/JPEG, or PNG for legacy documents), or None"""
+        path = self.archive_path(unique_id)
+        try:
+            # Index and bytes come from the same opened version, even if an update replaces it meanwhile
+            with open(path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                if stat.st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        entry = _archive_index(path, stat, data).get(int(page_number))
+                        if entry is not None:
+                            offset, length = entry
+                            return data[offset:offset + length]
+        except FileNotFoundError:
+            pass
+        # Legacy documents, including ones updated since (archive holds only the changed pages)
+        legacy = self.legacy_image_path(unique_id, page_number)
+        if os.path.exists(legacy):
+            with open(legacy, "rb") as f:
+                return f.read()
+        return None
+
+    # PDFs
+
+    def pdf_path(self, unique_id: str) -> str:
+        """Where a new document's PDF is stored"""
+        return os.path.join(self.documents_root, *_fan(unique_id, 2), unique_id + ".pdf")
+
+    def find_pdf(self, unique_id: str) -> Optional[str]:
+        """Path of a document's PDF in the fanned or legacy flat layout, or None"""
+        for path in (self.pdf_path(unique_id), os.path.join(self.documents_root, unique_id + ".pdf")):
+            if os.path.exists(path):
+                return path
+        return None
+
+    # Inventory
+
+    def scan_documents(self) -> Dict[str, float]:
+        """Every document ID with files on disk (archives, PDFs, legacy image folders)
+
+        Returns:
+            {unique_id: newest modification time of its files}
+        """
+        found: Dict[str, float] = {}
+
+        def add(unique_id: str, entry: os.DirEntry):
+            found[unique_id] = max(found.get(unique_id, 0.0), entry.stat().st_mtime)
+
+        def scan(directory: str, depth: int, suffix: str):
+            if not os.path.isdir(directory):
+                return
+            for entry in os.scandir(directory):
+                if entry.is_dir():
+                    if _is_fan_directory(entry.name) and depth:
+                        scan(entry.path, depth - 1, suffix)
+                    elif suffix == ARCHIVE_SUFFIX and depth == 1:
+                        # Legacy per-document image folder (only at the top level)
+                        add(entry.name, entry)
+                elif entry.name.endswith(suffix):
+                    add(entry.name[:-len(suffix)], entry)
+
+        scan(self.images_root, 1, ARCHIVE_SUFFIX)
+        scan(self.documents_root, 2, ".pdf")
+        return found
+
+    # Deletion
+
+    def document_bytes(self, unique_id: str) -> int:
+        """Disk usage of a document's archive and PDF"""
+        total = 0
+        for path in (self.archive_path(unique_id), self.find_pdf(unique_id)):
+            if path and os.path.exists(path):
+                total += os.path.getsize(path)
+        legacy_dir = os.path.join(self.images_root, unique_id)
+        if os.path.isdir(legacy_dir):
+            total += sum(entry.stat().st_size for entry in os.scandir(legacy_dir) if entry.is_file())
+        return total
+
+    def delete_document(self, unique_id: str, legacy_names: Iterable[str] = ()):
+        """Delete a document's page images and PDF
+
+        Args:
+            unique_id: Document to delete
+            legacy_names: Other image directory names used by old versions (e.g. the document name)
+        """
+        archive = self.archive_path(unique_id)
+        # Includes the temporary file of an interrupted update
+        for path in (archive, archive + ".tmp", self.find_pdf(unique_id)):
+            if path and os.path.exists(path):
+                try:
+                    os.unlink(path)
+                except OSError as e:
+                    print(f"Warning: Could not delete {path}: {e}")
+
+        for name in (unique_id, *legacy_names):
+            # Never mistake a two-hex-digit fan directory for a legacy image directory
+            if not name or _is_fan_directory(name):
+                continue
+            legacy_dir = os.path.join(self.images_root, name)
+            if os.path.isdir(legacy_dir):
+                try:
+                    shutil.rmtree(legacy_dir)
+                except Exception as e:
+                    print(f"Warning: Could not delete images at {legacy_dir}: {e}")
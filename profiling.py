@@ -0,0 +1,167 @@
+"""
+Profiling Module
+Opt-in per-rerun profiling of the Streamlit app:
+- Times every QdrantManager and MetadataStore method call
+- Counts Qdrant round trips (one per QdrantClient API call)
+- Optionally runs cProfile (or pyinstrument, if installed) over a whole script run
+- Keeps a short history of reruns for the sidebar panel in app.py
+"""
+
+import cProfile
+import functools
+import inspect
+import io
+import pstats
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+try:
+    import pyinstrument
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    PYINSTRUMENT_AVAILABLE = False
+
+SCRIPT_PROFILERS = ("cProfile", "pyinstrument") if PYINSTRUMENT_AVAILABLE else ("cProfile",)
+
+# Profiler collecting calls on the current thread (Streamlit runs each session in its own thread)
+_active = threading.local()
+_instrumented: set = set()
+_instrument_lock = threading.Lock()
+# One whole-script profiler at a time: only one cProfile can be active per
+# process on newer Pythons, and concurrent profiles would mix sessions anyway
+_script_profiler_lock = threading.Lock()
+
+
+class RerunProfiler:
+    """Collects call timings for one session, one script run at a time"""
+
+    def __init__(self, history_size: int = 20):
+        self.history: deque = deque(maxlen=history_size)
+        self.current: Optional[Dict] = None
+        self._script_profiler = None
+
+    def start_rerun(self, script_profiler: Optional[str] = None):
+        """Begin recording a script run on this thread
+
+        Args:
+            script_profiler: None, or one of SCRIPT_PROFILERS to profile the whole run
+        """
+        if self.current is not None:
+            # The previous run stopped early (st.rerun / st.stop)
+            self.end_rerun(interrupted=True)
+        self.current = {"started": time.perf_counter(), "calls": [], "round_trips": 0}
+        _active.profiler = self
+        if not script_profiler:
+            return
+        if not _script_profiler_lock.acquire(blocking=False):
+            self.current["profile"] = "Skipped: another session is running the script profiler"
+            return
+        try:
+            if script_profiler == "pyinstrument" and PYINSTRUMENT_AVAILABLE:
+                self._script_profiler = pyinstrument.Profiler()
+                self._script_profiler.start()
+            else:
+                self._script_profiler = cProfile.Profile()
+                self._script_profiler.enable()
+        except Exception as e:
+            self._script_profiler = None
+            _script_profiler_lock.release()
+            self.current["profile"] = f"Skipped: {e}"
+
+    def end_rerun(self, page: str = "", interrupted: bool = False) -> Optional[Dict]:
+        """Finish the current run and add it to the history"""
+        if self.current is None:
+            return None
+        record = self.current
+        self.current = None
+        if getattr(_active, "profiler", None) is self:
+            _active.profiler = None
+
+        record["total_ms"] = (time.perf_counter() - record.pop("started")) * 1000
+        record["page"] = page
+        record["interrupted"] = interrupted
+        if self._script_profiler is not None:
+            record["profile"] = self._stop_script_profiler()
+        self.history.append(record)
+        return record
+
+    def _stop_script_profiler(self) -> str:
+        profiler, self._script_profiler = self._script_profiler, None
+        try:
+            if isinstance(profiler, cProfile.Profile):
+                profiler.disable()
+            else:
+                profiler.stop()
+        finally:
+            _script_profiler_lock.release()
+        if isinstance(profiler, cProfile.Profile):
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(25)
+            return stream.getvalue()
+        return profiler.output_text(unicode=True)
+
+    def record(self, component: str, method: str, elapsed_ms: float, round_trip: bool):
+        if self.current is None:
+            return
+        self.current["calls"].append((component, method, elapsed_ms))
+        if round_trip:
+            self.current["round_trips"] += 1
+
+    @staticmethod
+    def summarize(record: Dict) -> List[Dict]:
+        """Aggregate a run's calls per component.method, slowest first"""
+        totals: Dict[str, Dict] = {}
+        for component, method, elapsed_ms in record["calls"]:
+            entry = totals.setdefault(f"{component}.{method}", {"call": f"{component}.{method}", "count": 0, "total_ms": 0.0})
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+        return sorted(totals.values(), key=lambda e: e["total_ms"], reverse=True)
+
+
+def _wrap(func, component: str, name: str, round_trip: bool):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = getattr(_active, "profiler", None)
+        if profiler is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.record(component, name, (time.perf_counter() - start) * 1000, round_trip)
+    return wrapper
+
+
+def instrument_class(cls, component: Optional[str] = None, round_trip: bool = False):
+    """Time all public methods of a class
+
+    Patching is done once per process; calls are only recorded on threads
+    with an active RerunProfiler, so other sessions are unaffected.
+
+    Args:
+        cls: Class to patch
+        component: Name shown in the panel (default: class name)
+        round_trip: Count each call as one network round trip
+    """
+    with _instrument_lock:
+        if cls in _instrumented:
+            return
+        component = component or cls.__name__
+        for name, func in inspect.getmembers(cls, inspect.isfunction):
+            if name.startswith("_"):
+                continue
+            setattr(cls, name, _wrap(func, component, name, round_trip))
+        _instrumented.add(cls)
+
+
+def instrument_app():
+    """Instrument the classes the Streamlit pages talk to"""
+    from qdrant_client import QdrantClient
+    from qdrant_manager import QdrantManager
+    from metadata_store import MetadataStore
+
+    instrument_class(QdrantManager)
+    instrument_class(MetadataStore)
+    instrument_class(QdrantClient, "Qdrant", round_trip=True)
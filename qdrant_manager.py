@@ -4,32 +4,85 @@ Handles all interactions with the Qdrant vector database including:
 - Collection management (list, create, delete)
 - Document management (list, delete by document)
 - Point operations
+- Optional multi-tenancy: many tenants' documents in one collection,
+  separated by a `tenant_id` payload field
 """
 
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qdrant_models
-from typing import List, Dict, Optional
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Set
 import os
+import threading
+import time
+import uuid
+import config
+from query_cache import bump_generation
+from lexical import TEXT_VECTOR_NAME
+from qdrant_pool import get_client, get_health
+
+# Payload field holding the tenant of a point in multi-tenant collections
+TENANT_FIELD = "tenant_id"
+
+# Most distinct documents counted per collection; larger counts are reported as lower bounds
+DOCUMENT_COUNT_LIMIT = 100_000
+
+# Sampled vectors per point of each collection: name -> (vectors per point, sampled at)
+_vectors_per_point: Dict[str, tuple] = {}
+_vectors_per_point_lock = threading.Lock()
+
+
+def tenant_filter(
+    tenant_id: Optional[str], *conditions: qdrant_models.Condition
+) -> Optional[qdrant_models.Filter]:
+    """Filter matching all `conditions`, restricted to one tenant if `tenant_id` is set
+
+    Returns:
+        The filter, or None when there is nothing to filter on
+    """
+    must = [condition for condition in conditions if condition is not None]
+    if tenant_id is not None:
+        must.insert(0, qdrant_models.FieldCondition(
+            key=TENANT_FIELD, match=qdrant_models.MatchValue(value=tenant_id)
+        ))
+    return qdrant_models.Filter(must=must) if must else None
 
 
 class QdrantManager:
     """Manager class for Qdrant operations"""
     
-    def __init__(self, url: str = "http://localhost:6333", api_key: Optional[str] = None):
+    def __init__(
+        self,
+        url: str = "http://localhost:6333",
+        api_key: Optional[str] = None,
+        client: Optional[QdrantClient] = None,
+    ):
         """Initialize Qdrant client
         
         Args:
             url: Qdrant server URL (default: http://localhost:6333)
             api_key: Optional API key for authentication
+            client: Existing client to use instead (e.g. QdrantClient(":memory:"));
+                by default the process-wide pooled client for `url` is used
         """
-        self.client = QdrantClient(url=url, api_key=api_key)
+        if client is None:
+            self.client = get_client(url, api_key)
+            self.health = get_health(url, api_key)
+        else:
+            self.client = client
+            self.health = None
         
     def test_connection(self) -> bool:
         """Test connection to Qdrant server
         
+        Pooled clients report the status cached by the background health
+        checker instead of making a request.
+        
         Returns:
             True if connection is successful, False otherwise
         """
+        if self.health is not None:
+            return self.health.is_healthy()
         try:
             self.client.get_collections()
             return True
@@ -40,16 +93,68 @@ class QdrantManager:
     def list_collections(self) -> List[str]:
         """Get list of all collections
         
+        Collections reached through an alias (e.g. after a migration) are
+        listed under the alias name instead of their own.
+        
         Returns:
             List of collection names
         """
         try:
             collections = self.client.get_collections()
-            return [col.name for col in collections.collections]
+            aliases = self.get_aliases()
+            aliased = set(aliases.values())
+            return [col.name for col in collections.collections if col.name not in aliased] + list(aliases)
         except Exception as e:
             print(f"Error listing collections: {e}")
             return []
     
+    def get_aliases(self) -> Dict[str, str]:
+        """Get all collection aliases
+        
+        Returns:
+            Dictionary of alias name to collection name
+        """
+        try:
+            response = self.client.get_aliases()
+            return {alias.alias_name: alias.collection_name for alias in response.aliases}
+        except Exception as e:
+            print(f"Error listing aliases: {e}")
+            return {}
+    
+    def resolve_collection(self, name: str) -> str:
+        """Return the collection an alias points to, or `name` itself if it is not an alias"""
+        return self.get_aliases().get(name, name)
+    
+    def switch_alias(self, alias: str, collection_name: str) -> bool:
+        """Point an alias at a collection
+        
+        Moving an existing alias is atomic: readers see either the old or the
+        new collection, never neither.
+        
+        Args:
+            alias: Alias name the app uses
+            collection_name: Collection the alias should point to
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            operations = []
+            if alias in self.get_aliases():
+                operations.append(qdrant_models.DeleteAliasOperation(
+                    delete_alias=qdrant_models.DeleteAlias(alias_name=alias)
+                ))
+            operations.append(qdrant_models.CreateAliasOperation(
+                create_alias=qdrant_models.CreateAlias(collection_name=collection_name, alias_name=alias)
+            ))
+            self.client.update_collection_aliases(change_aliases_operations=operations)
+            bump_generation(alias)
+            print(f"Alias '{alias}' now points to collection '{collection_name}'")
+            return True
+        except Exception as e:
+            print(f"Error switching alias: {e}")
+            return False
+    
     def get_collection_info(self, collection_name: str) -> Optional[Dict]:
         """Get detailed information about a collection
         
@@ -64,19 +169,57 @@ class QdrantManager:
             return {
                 "name": collection_name,
                 "points_count": info.points_count,
-                "vectors_count": info.vectors_count,
+                "vectors_count": getattr(info, "vectors_count", None),
                 "status": info.status,
             }
         except Exception as e:
             print(f"Error getting collection info: {e}")
             return None
     
-    def create_collection(self, collection_name: str, vector_size: int = 128) -> bool:
+    def create_collection(
+        self,
+        collection_name: str,
+        vector_size: int = 128,
+        text_index: bool = True,
+        shard_number: Optional[int] = None,
+        replication_factor: Optional[int] = None,
+        write_consistency_factor: Optional[int] = None,
+        shard_keys: Optional[List[str]] = None,
+        multi_tenant: bool = False,
+        on_disk: bool = False,
+        datatype: Optional[str] = None,
+        quantization: Optional[str] = None,
+        hnsw_m: Optional[int] = config.HNSW_M,
+        ef_construct: Optional[int] = config.HNSW_EF_CONSTRUCT,
+    ) -> bool:
         """Create a new collection with multivector configuration for ColPali
         
         Args:
             collection_name: Name for the new collection
             vector_size: Size of the vectors (default: 128 for ColQwen2.5)
+            text_index: Also create a BM25 sparse vector for the PDF text layer,
+                used by hybrid search
+            shard_number: Shards of the collection, or per shard key with
+                custom sharding (default: server default)
+            replication_factor: Copies of each shard (default: server default)
+            write_consistency_factor: Replicas that must acknowledge a write
+                (default: server default)
+            shard_keys: Create the collection with custom sharding and these
+                shard keys (e.g. tenants or years); documents are then routed
+                to a shard key at ingestion. More keys can be added with
+                add_shard_key.
+            multi_tenant: Hold many tenants' documents in this one collection.
+                Points get a tenant_id with a tenant keyword index, and HNSW
+                graphs are built per tenant instead of globally, so memory and
+                optimizer work stay flat as tenants are added.
+            on_disk: Keep the original vectors on disk (memory-mapped) instead of in RAM
+            datatype: Vector storage type: "float32" (default), "float16" or "uint8"
+            quantization: "int8" (scalar) or "binary" quantized copies kept in RAM
+                for search, rescored against the original vectors
+            hnsw_m: HNSW graph links per node; more links raise recall and
+                memory (default: config.HNSW_M or Qdrant's default)
+            ef_construct: HNSW build-time beam width; larger builds a better
+                graph more slowly (default: config.HNSW_EF_CONSTRUCT or Qdrant's default)
             
         Returns:
             True if successful, False otherwise
@@ -94,8 +237,39 @@ class QdrantManager:
                 multivector_config=qdrant_models.MultiVectorConfig(
                     comparator=qdrant_models.MultiVectorComparator.MAX_SIM
                 ),
+                on_disk=on_disk or None,
+                datatype=qdrant_models.Datatype(datatype) if datatype else None,
             )
             
+            quantization_config = None
+            if quantization == "int8":
+                quantization_config = qdrant_models.ScalarQuantization(
+                    scalar=qdrant_models.ScalarQuantizationConfig(
+                        type=qdrant_models.ScalarType.INT8, always_ram=True
+                    )
+                )
+            elif quantization == "binary":
+                quantization_config = qdrant_models.BinaryQuantization(
+                    binary=qdrant_models.BinaryQuantizationConfig(always_ram=True)
+                )
+            
+            # Sparse text vectors carry BM25 term frequencies; Qdrant applies IDF
+            sparse_vectors_config = None
+            if text_index:
+                sparse_vectors_config = {
+                    TEXT_VECTOR_NAME: qdrant_models.SparseVectorParams(
+                        modifier=qdrant_models.Modifier.IDF
+                    )
+                }
+            
+            if multi_tenant:
+                # Tenant searches are always filtered: index per tenant (payload_m), no global graph (m=0)
+                hnsw_config = qdrant_models.HnswConfigDiff(payload_m=hnsw_m or 16, m=0, ef_construct=ef_construct)
+            elif hnsw_m is not None or ef_construct is not None:
+                hnsw_config = qdrant_models.HnswConfigDiff(m=hnsw_m, ef_construct=ef_construct)
+            else:
+                hnsw_config = None
+            
             self.client.create_collection(
                 collection_name=collection_name,
                 on_disk_payload=True,
@@ -103,13 +277,192 @@ class QdrantManager:
                     indexing_threshold=100
                 ),
                 vectors_config=vector_params,
+                sparse_vectors_config=sparse_vectors_config,
+                quantization_config=quantization_config,
+                shard_number=shard_number,
+                replication_factor=replication_factor,
+                write_consistency_factor=write_consistency_factor,
+                sharding_method=qdrant_models.ShardingMethod.CUSTOM if shard_keys else None,
+                hnsw_config=hnsw_config,
             )
+            try:
+                for shard_key in shard_keys or []:
+                    self.client.create_shard_key(collection_name, shard_key)
+            except Exception:
+                # Do not leave a keyed collection behind that cannot take writes
+                self.client.delete_collection(collection_name)
+                raise
+            self.ensure_payload_indexes(collection_name, multi_tenant=multi_tenant)
+            bump_generation(collection_name)
             print(f"Created collection '{collection_name}'")
             return True
         except Exception as e:
             print(f"Error creating collection: {e}")
             return False
     
+    def uses_shard_keys(self, collection_name: str) -> bool:
+        """Check whether a collection uses custom sharding (documents routed by shard key)
+        
+        Args:
+            collection_name: Name of the collection
+            
+        Returns:
+            True if points must be written with a shard key, False otherwise
+        """
+        try:
+            info = self.client.get_collection(collection_name)
+            return info.config.params.sharding_method == qdrant_models.ShardingMethod.CUSTOM
+        except Exception as e:
+            print(f"Error getting collection info: {e}")
+            return False
+    
+    def list_shard_keys(self, collection_name: str) -> List[str]:
+        """List the shard keys of a custom-sharded collection
+        
+        Args:
+            collection_name: Name of the collection
+            
+        Returns:
+            Sorted shard keys (empty for automatically sharded collections)
+        """
+        if not self.uses_shard_keys(collection_name):
+            return []
+        try:
+            cluster = self.client.collection_cluster_info(collection_name)
+            shards = list(cluster.local_shards) + list(cluster.remote_shards)
+            return sorted({str(shard.shard_key) for shard in shards if shard.shard_key is not None})
+        except Exception as e:
+            print(f"Error listing shard keys: {e}")
+            return []
+    
+    def add_shard_key(self, collection_name: str, shard_key: str, shard_number: Optional[int] = None) -> bool:
+        """Add a shard key to a custom-sharded collection
+        
+        Args:
+            collection_name: Name of the collection
+            shard_key: New shard key (e.g. a tenant or a year)
+            shard_number: Shards for this key (default: the collection's shard_number)
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            self.client.create_shard_key(collection_name, shard_key, shards_number=shard_number)
+            print(f"Created shard key '{shard_key}' in collection '{collection_name}'")
+            return True
+        except Exception as e:
+            print(f"Error creating shard key: {e}")
+            return False
+    
+    def has_text_index(self, collection_name: str) -> bool:
+        """Check whether a collection stores sparse text vectors for hybrid search
+        
+        Args:
+            collection_name: Name of the collection
+            
+        Returns:
+            True if the collection has the text sparse vector, False otherwise
+        """
+        try:
+            info = self.client.get_collection(collection_name)
+            return TEXT_VECTOR_NAME in (info.config.params.sparse_vectors or {})
+        except Exception as e:
+            print(f"Error getting collection info: {e}")
+            return False
+    
+    def is_multi_tenant(self, collection_name: str) -> bool:
+        """Check whether a collection holds documents of many tenants
+        
+        Args:
+            collection_name: Name of the collection
+            
+        Returns:
+            True if the collection has a tenant index, False otherwise
+        """
+        try:
+            info = self.client.get_collection(collection_name)
+            return TENANT_FIELD in (info.payload_schema or {})
+        except Exception as e:
+            print(f"Error getting collection info: {e}")
+            return False
+    
+    def list_tenants(self, collection_name: str, limit: int = 10000) -> Dict[str, int]:
+        """List the tenants of a multi-tenant collection with a facet over the tenant index
+        
+        Args:
+            collection_name: Name of the collection
+            limit: Maximum number of tenants returned
+            
+        Returns:
+            Dictionary of tenant ID to number of points, sorted by tenant ID
+        """
+        try:
+            response = self.client.facet(
+                collection_name=collection_name,
+                key=TENANT_FIELD,
+                limit=limit,
+                exact=True,
+            )
+            return {str(hit.value): hit.count for hit in sorted(response.hits, key=lambda hit: str(hit.value))}
+        except Exception as e:
+            print(f"Error listing tenants: {e}")
+            return {}
+    
+    def delete_tenant(self, collection_name: str, tenant_id: str) -> bool:
+        """Delete all points of one tenant
+        
+        Args:
+            collection_name: Name of the collection
+            tenant_id: Tenant to delete
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            self.client.delete(
+                collection_name=collection_name,
+                points_selector=qdrant_models.FilterSelector(filter=tenant_filter(tenant_id)),
+            )
+            bump_generation(collection_name)
+            print(f"Deleted tenant '{tenant_id}' from collection '{collection_name}'")
+            return True
+        except Exception as e:
+            print(f"Error deleting tenant: {e}")
+            return False
+    
+    def ensure_payload_indexes(self, collection_name: str, multi_tenant: bool = False) -> bool:
+        """Create the keyword payload indexes used for per-document filters and facets
+
+        Safe to call on existing collections; Qdrant ignores indexes that already exist.
+        
+        Args:
+            collection_name: Name of the collection
+            multi_tenant: Also create the tenant index (marks the collection as multi-tenant)
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            self.client.create_payload_index(
+                collection_name=collection_name,
+                field_name="unique_document_id",
+                field_schema=qdrant_models.PayloadSchemaType.KEYWORD,
+            )
+            if multi_tenant:
+                # is_tenant co-locates each tenant's points in storage
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=TENANT_FIELD,
+                    field_schema=qdrant_models.KeywordIndexParams(
+                        type=qdrant_models.KeywordIndexType.KEYWORD,
+                        is_tenant=True,
+                    ),
+                )
+            return True
+        except Exception as e:
+            print(f"Error creating payload indexes: {e}")
+            return False
+    
     def delete_collection(self, collection_name: str) -> bool:
         """Delete a collection
         
@@ -120,18 +473,28 @@ class QdrantManager:
             True if successful, False otherwise
         """
         try:
-            self.client.delete_collection(collection_name)
+            collection = self.resolve_collection(collection_name)
+            if collection != collection_name:
+                # Deleting through an alias removes the alias and the collection behind it
+                self.client.update_collection_aliases(change_aliases_operations=[
+                    qdrant_models.DeleteAliasOperation(
+                        delete_alias=qdrant_models.DeleteAlias(alias_name=collection_name)
+                    )
+                ])
+            self.client.delete_collection(collection)
+            bump_generation(collection_name)
             print(f"Deleted collection '{collection_name}'")
             return True
         except Exception as e:
             print(f"Error deleting collection: {e}")
             return False
     
-    def list_documents_in_collection(self, collection_name: str) -> List[Dict]:
+    def list_documents_in_collection(self, collection_name: str, tenant_id: Optional[str] = None) -> List[Dict]:
         """Get list of unique documents in a collection
         
         Args:
             collection_name: Name of the collection
+            tenant_id: Only list documents of this tenant
             
         Returns:
             List of dictionaries with document information
@@ -146,6 +509,7 @@ class QdrantManager:
                     collection_name=collection_name,
                     limit=100,
                     offset=offset,
+                    scroll_filter=tenant_filter(tenant_id),
                     with_payload=True,
                     with_vectors=False,
                 )
@@ -163,6 +527,7 @@ class QdrantManager:
                             "document_name": payload.get("document_name", "Unknown"),
                             "total_pages": payload.get("total_pages", 0),
                             "timestamp": payload.get("timestamp", ""),
+                            "tenant_id": payload.get(TENANT_FIELD),
                         }
                 
                 if offset is None:
@@ -174,13 +539,19 @@ class QdrantManager:
             return []
     
     def delete_document_from_collection(
-        self, collection_name: str, unique_document_id: str
+        self,
+        collection_name: str,
+        unique_document_id: str,
+        shard_key: Optional[str] = None,
+        tenant_id: Optional[str] = None,
     ) -> bool:
         """Delete all points associated with a specific document
         
         Args:
             collection_name: Name of the collection
             unique_document_id: Unique document identifier
+            shard_key: Shard key the document was ingested with, if any
+            tenant_id: Tenant the document belongs to; nothing outside it is deleted
             
         Returns:
             True if successful, False otherwise
@@ -190,45 +561,382 @@ class QdrantManager:
             self.client.delete(
                 collection_name=collection_name,
                 points_selector=qdrant_models.FilterSelector(
-                    filter=qdrant_models.Filter(
-                        must=[
-                            qdrant_models.FieldCondition(
-                                key="unique_document_id",
-                                match=qdrant_models.MatchValue(value=unique_document_id),
-                            )
-                        ]
+                    filter=tenant_filter(
+                        tenant_id,
+                        qdrant_models.FieldCondition(
+                            key="unique_document_id",
+                            match=qdrant_models.MatchValue(value=unique_document_id),
+                        ),
                     )
                 ),
+                shard_key_selector=shard_key,
             )
+            bump_generation(collection_name)
             print(f"Deleted document '{unique_document_id}' from collection '{collection_name}'")
             return True
         except Exception as e:
             print(f"Error deleting document: {e}")
             return False
     
-    def get_collection_stats(self, collection_name: str) -> Optional[Dict]:
+    def count_points(
+        self, collection_name: str, exact: bool = True, tenant_id: Optional[str] = None
+    ) -> Optional[int]:
+        """Count points in a collection without fetching them
+        
+        Args:
+            collection_name: Name of the collection
+            exact: Exact count (default) or Qdrant's cheaper approximation
+            tenant_id: Only count points of this tenant
+            
+        Returns:
+            Number of points or None if error
+        """
+        try:
+            return self.client.count(
+                collection_name=collection_name,
+                count_filter=tenant_filter(tenant_id),
+                exact=exact,
+            ).count
+        except Exception as e:
+            print(f"Error counting points: {e}")
+            return None
+    
+    def count_documents(
+        self, collection_name: str, limit: int = DOCUMENT_COUNT_LIMIT, tenant_id: Optional[str] = None
+    ) -> Optional[int]:
+        """Count distinct documents with a facet over the unique_document_id index
+        
+        The cost grows with the number of documents, not points, and nothing is
+        transferred except one (value, count) pair per document.
+        
+        Args:
+            collection_name: Name of the collection
+            limit: Maximum number of distinct documents counted
+            tenant_id: Only count documents of this tenant
+            
+        Returns:
+            Number of documents (at least `limit` when it equals `limit`),
+            or None if the collection has no usable index
+        """
+        try:
+            response = self.client.facet(
+                collection_name=collection_name,
+                key="unique_document_id",
+                facet_filter=tenant_filter(tenant_id),
+                limit=limit,
+                exact=True,
+            )
+            return len(response.hits)
+        except Exception as e:
+            print(f"Error counting documents: {e}")
+            return None
+    
+    def document_ids(self, collection_name: str, limit: int = 1_000_000) -> Set[str]:
+        """Unique IDs of all documents with points in a collection
+        
+        Uses a facet over the unique_document_id index, and a payload-only scroll
+        for collections without one (created before the index existed) or with
+        more than `limit` documents. Errors are raised rather than printed:
+        callers partition or diff this set, and a partial one would lose documents.
+        
+        Args:
+            collection_name: Name of the collection
+            limit: Largest number of documents listed with a facet
+            
+        Returns:
+            Set of document IDs
+        """
+        try:
+            response = self.client.facet(
+                collection_name=collection_name,
+                key="unique_document_id",
+                limit=limit,
+                exact=True,
+            )
+            if len(response.hits) < limit:
+                return {str(hit.value) for hit in response.hits}
+        except Exception as e:
+            if "index" not in str(e).lower():
+                raise
+        
+        ids, offset = set(), None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=collection_name,
+                limit=1024,
+                offset=offset,
+                with_payload=qdrant_models.PayloadSelectorInclude(include=["unique_document_id"]),
+                with_vectors=False,
+            )
+            ids.update(str(record.payload["unique_document_id"]) for record in records
+                       if record.payload and record.payload.get("unique_document_id"))
+            if offset is None:
+                return ids
+    
+    def get_collection_stats(self, collection_name: str, tenant_id: Optional[str] = None) -> Optional[Dict]:
         """Get statistics about a collection
         
+        Uses only count/facet/info calls, so the cost does not depend on the
+        number of points. ``total_documents`` is None when the collection has
+        no ``unique_document_id`` index (collections created before it existed);
+        call ensure_payload_indexes to add one. ``documents_lower_bound`` is set
+        when there are more than DOCUMENT_COUNT_LIMIT documents. The collection
+        flags the pages need on every rerun (multi-tenancy and tenant IDs, text
+        index, shard keys) are included, so they can be read from the cached
+        snapshot instead of asking Qdrant.
+        
         Args:
             collection_name: Name of the collection
+            tenant_id: Count points and documents of this tenant only (the
+                storage and optimizer fields still describe the collection)
             
         Returns:
             Dictionary with statistics or None if error
         """
         try:
             info = self.client.get_collection(collection_name)
-            documents = self.list_documents_in_collection(collection_name)
+            total_points = self.count_points(collection_name, tenant_id=tenant_id)
+            multi_tenant = TENANT_FIELD in (info.payload_schema or {})
+            vector_params = info.config.params.vectors
+            quantization = info.config.quantization_config or getattr(vector_params, "quantization_config", None)
+            total_documents = self.count_documents(collection_name, tenant_id=tenant_id)
+            tenants = self.list_tenants(collection_name) if multi_tenant and tenant_id is None else None
+            custom_sharding = info.config.params.sharding_method == qdrant_models.ShardingMethod.CUSTOM
             
             return {
-                "total_points": info.points_count,
-                "total_documents": len(documents),
+                "total_points": total_points if total_points is not None else info.points_count,
+                "total_documents": total_documents,
+                "documents_lower_bound": total_documents is not None and total_documents >= DOCUMENT_COUNT_LIMIT,
+                "tenants": len(tenants) if tenants is not None else None,
+                "tenant_ids": sorted(tenants) if tenants is not None else [],
+                "multi_tenant": multi_tenant,
+                "text_index": TEXT_VECTOR_NAME in (info.config.params.sparse_vectors or {}),
                 "status": info.status,
+                "optimizer_status": info.optimizer_status,
+                "indexed_vectors_count": info.indexed_vectors_count,
+                "segments_count": info.segments_count,
+                "vectors_on_disk": bool(getattr(vector_params, "on_disk", False)),
+                "payload_on_disk": bool(info.config.params.on_disk_payload),
+                "quantized": quantization is not None,
+                "indexing_threshold": info.config.optimizer_config.indexing_threshold,
+                "shard_number": info.config.params.shard_number,
+                "replication_factor": info.config.params.replication_factor,
+                "custom_sharding": custom_sharding,
+                "shard_keys": self.list_shard_keys(collection_name) if custom_sharding else [],
+                "estimated_vector_bytes": self._estimate_vector_bytes(
+                    collection_name, vector_params, total_points or 0
+                ),
             }
         except Exception as e:
             print(f"Error getting collection stats: {e}")
             return None
+    
+    @contextmanager
+    def bulk_load(self, collection_name: str, wait: bool = False):
+        """Defer HNSW indexing while many points are written to a collection
+        
+        On entry indexing is disabled (indexing_threshold=0; the HNSW graph
+        already built is kept) and flushes and segment merges are made less
+        frequent; on exit the previous optimizer settings are restored and
+        Qdrant indexes the new points. The settings to restore are kept in the
+        catalog, so overlapping loads from several sessions or processes
+        restore them when the last one ends, and a crashed load is restored
+        by the next load or by recover_bulk_loads.
+        
+        Args:
+            collection_name: Name of the collection
+            wait: After restoring, block until the collection is green again
+                (at most config.BULK_LOAD_WAIT_TIMEOUT seconds)
+        """
+        load_id = self._begin_bulk_load(collection_name)
+        try:
+            yield
+        finally:
+            if load_id is not None and self._end_bulk_load(collection_name, load_id) and wait:
+                self.wait_for_green(collection_name)
+    
+    def _begin_bulk_load(self, collection_name: str) -> Optional[str]:
+        """Returns the load ID, or None if bulk-load mode could not be entered"""
+        from metadata_store import get_metadata_store
+        
+        saved = {}
+        
+        def read_settings() -> Dict:
+            optimizer = self.client.get_collection(collection_name).config.optimizer_config
+            saved.update(
+                indexing_threshold=optimizer.indexing_threshold,
+                flush_interval_sec=optimizer.flush_interval_sec,
+                default_segment_number=optimizer.default_segment_number,
+            )
+            return saved
+        
+        def enter():
+            self.client.update_collection(
+                collection_name=collection_name,
+                optimizers_config=qdrant_models.OptimizersConfigDiff(
+                    indexing_threshold=0,
+                    flush_interval_sec=max(config.BULK_LOAD_FLUSH_INTERVAL, saved["flush_interval_sec"]),
+                    default_segment_number=config.BULK_LOAD_SEGMENT_NUMBER,
+                ),
+            )
+            print(f"Bulk load of '{collection_name}' started, indexing deferred")
+        
+        load_id = uuid.uuid4().hex
+        try:
+            get_metadata_store().acquire_bulk_load(collection_name, load_id, read_settings, enter)
+            return load_id
+        except Exception as e:
+            # Loading still works, just without the speed-up
+            print(f"Error starting bulk load: {e}")
+            self._end_bulk_load(collection_name, load_id)
+            return None
+    
+    def _end_bulk_load(self, collection_name: str, load_id: Optional[str]) -> bool:
+        """Returns True if this ended the last bulk load and the settings were restored"""
+        from metadata_store import get_metadata_store
+        
+        def restore(settings: Dict):
+            self.client.update_collection(
+                collection_name=collection_name,
+                optimizers_config=qdrant_models.OptimizersConfigDiff(**settings),
+            )
+            print(f"Bulk load of '{collection_name}' finished, indexing resumed")
+        
+        try:
+            return get_metadata_store().release_bulk_load(collection_name, load_id, restore)
+        except Exception as e:
+            print(f"Error ending bulk load: {e}")
+            return False
+    
+    def recover_bulk_loads(self) -> List[str]:
+        """Restore the settings of collections whose bulk loads crashed
+        
+        Returns:
+            Names of the collections whose settings were restored
+        """
+        from metadata_store import get_metadata_store
+        
+        try:
+            collections = get_metadata_store().bulk_load_collections()
+        except Exception as e:
+            print(f"Error listing bulk loads: {e}")
+            return []
+        return [name for name in collections if self._end_bulk_load(name, None)]
+    
+    def wait_for_green(self, collection_name: str, timeout: float = config.BULK_LOAD_WAIT_TIMEOUT) -> bool:
+        """Wait until a collection's optimizers are done (status green)
+        
+        Args:
+            collection_name: Name of the collection
+            timeout: Maximum seconds to wait
+            
+        Returns:
+            True if the collection turned green in time, False otherwise
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if self.client.get_collection(collection_name).status == qdrant_models.CollectionStatus.GREEN:
+                    return True
+            except Exception as e:
+                print(f"Error getting collection status: {e}")
+                return False
+            if time.monotonic() >= deadline:
+                print(f"Collection '{collection_name}' is still indexing after {timeout:.0f}s")
+                return False
+            time.sleep(1)
+    
+    def export_collection(self, collection_name: str, output_dir: str, **kwargs) -> Optional[Dict]:
+        """Export a collection (vectors, payloads, catalog entries) to an archive directory
+
+        Streams float16 npz shards with a parallel scroll in bounded memory;
+        running it again on the same directory resumes an interrupted export.
+        See collection_archive.export_collection for the options.
+
+        Args:
+            collection_name: Collection to export
+            output_dir: Archive directory
+
+        Returns:
+            Summary with points, documents, shards and bytes, or None if error
+        """
+        from collection_archive import export_collection
+        return export_collection(self, collection_name, output_dir, **kwargs)
 
+    def import_collection(self, input_dir: str, collection_name: Optional[str] = None, **kwargs) -> Optional[Dict]:
+        """Restore an archive written by export_collection with parallel upload_points
 
+        Creates the collection with the exported settings if it does not exist.
+        See collection_archive.import_collection for the options.
 
+        Args:
+            input_dir: Archive directory
+            collection_name: Target collection (default: the exported collection's name)
 
+        Returns:
+            Summary with points, documents and shards imported, or None if error
+        """
+        from collection_archive import import_collection
+        return import_collection(self, input_dir, collection_name, **kwargs)
 
+    def migrate_collection(self, source: str, target: str, **kwargs) -> Optional[Dict]:
+        """Copy a collection into a newly configured one without re-embedding
+        
+        See collection_migration.migrate_collection for transforms, settings
+        and the alias switch-over.
+        
+        Args:
+            source: Collection (or alias) to copy
+            target: Name of the new collection
+            
+        Returns:
+            Summary with points copied, seconds and whether the alias was switched, or None if error
+        """
+        from collection_migration import migrate_collection
+        return migrate_collection(self, source, target, **kwargs)
+    
+    def _estimate_vector_bytes(self, collection_name: str, vector_params, total_points: int) -> Optional[int]:
+        """Estimate raw vector storage from the collection info
+        
+        Qdrant does not report multivector storage size, so the average number
+        of vectors per point is measured on a handful of points and reused for
+        config.STATS_VECTOR_SAMPLE_MAX_AGE seconds; the estimate is that times
+        the point count, vector size and datatype width.
+        """
+        if not total_points or not isinstance(vector_params, qdrant_models.VectorParams):
+            return 0 if not total_points else None
+        vectors_per_point = 1.0
+        if vector_params.multivector_config:
+            vectors_per_point = self._sample_vectors_per_point(collection_name)
+            if vectors_per_point is None:
+                return None
+        bytes_per_value = {
+            qdrant_models.Datatype.FLOAT16: 2,
+            qdrant_models.Datatype.UINT8: 1,
+        }.get(vector_params.datatype, 4)
+        return int(total_points * vectors_per_point * vector_params.size * bytes_per_value)
+    
+    def _sample_vectors_per_point(self, collection_name: str) -> Optional[float]:
+        with _vectors_per_point_lock:
+            cached = _vectors_per_point.get(collection_name)
+        if cached and time.monotonic() - cached[1] < config.STATS_VECTOR_SAMPLE_MAX_AGE:
+            return cached[0]
+        try:
+            records, _ = self.client.scroll(
+                collection_name=collection_name,
+                limit=8,
+                with_payload=False,
+                with_vectors=True,
+            )
+        except Exception as e:
+            print(f"Error sampling vectors: {e}")
+            return None
+        if not records:
+            return 0.0
+        
+        # Collections with a text index return named vectors; the ColPali one is unnamed
+        dense = [r.vector.get("") if isinstance(r.vector, dict) else r.vector for r in records]
+        vectors_per_point = sum(len(v or []) for v in dense) / len(records)
+        with _vectors_per_point_lock:
+            _vectors_per_point[collection_name] = (vectors_per_point, time.monotonic())
+        return vectors_per_point
@@ -0,0 +1,189 @@
+"""
+Qdrant Pool Module
+One Qdrant client per server for the whole process, shared by every
+Streamlit session and DocumentProcessor:
+- HTTP keep-alive connection limits, optional gRPC transport, timeouts
+- Retries with exponential backoff for transient failures of idempotent calls
+- A background health checker whose cached status the sidebar reads
+"""
+
+import functools
+import sys
+from collections.abc import Iterator
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from qdrant_client import QdrantClient
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+import config
+
+# HTTP statuses worth retrying (overloaded or restarting server, proxy errors)
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+
+# Calls that are safe to repeat: reads, and writes that overwrite by point ID.
+# Creating/deleting collections, aliases and shard keys is not (a request that
+# succeeded but timed out would fail or act twice on retry)
+IDEMPOTENT_METHODS = {
+    "info", "get_collection", "get_collections", "collection_exists", "get_aliases",
+    "get_collection_aliases", "collection_cluster_info", "list_shard_keys",
+    "count", "facet", "scroll", "retrieve", "query_points", "query_batch_points", "query_points_groups",
+    "upsert", "upload_points", "set_payload", "overwrite_payload",
+}
+
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a failed request is worth retrying"""
+    if isinstance(error, ResponseHandlingException):
+        # Connection refused/reset, timeouts and other transport errors
+        return True
+    if isinstance(error, UnexpectedResponse):
+        return error.status_code in RETRY_STATUS_CODES
+    grpc = sys.modules.get("grpc")
+    if grpc is not None and isinstance(error, grpc.RpcError):
+        return error.code() in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
+    return False
+
+
+class RetryingClient:
+    """Wraps a QdrantClient so idempotent API calls are retried on transient failures
+
+    Attribute access is forwarded to the wrapped client, so this can be used
+    wherever a QdrantClient is expected. Only IDEMPOTENT_METHODS are retried,
+    and not when an argument is an iterator (a retry would resume a half-consumed
+    generator and silently drop points). Calls are not retried while the
+    health checker reports the server as down, so pages fail fast.
+    """
+
+    def __init__(self, client: QdrantClient, retries: int = 3, backoff: float = 0.5,
+                 health: Optional['HealthChecker'] = None):
+        self.client = client
+        self.retries = retries
+        self.backoff = backoff
+        self.health = health
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name.startswith("_") or not callable(attr) or name not in IDEMPOTENT_METHODS:
+            return attr
+        return functools.partial(self._call, attr)
+
+    def _call(self, method, *args, **kwargs):
+        if any(isinstance(arg, Iterator) for arg in (*args, *kwargs.values())):
+            return method(*args, **kwargs)
+        delay = self.backoff
+        for attempt in range(self.retries + 1):
+            try:
+                return method(*args, **kwargs)
+            except Exception as e:
+                server_down = self.health is not None and self.health.healthy is False
+                if attempt == self.retries or server_down or not _is_transient(e):
+                    raise
+                print(f"Qdrant {method.__name__} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                delay *= 2
+
+
+class HealthChecker:
+    """Periodically checks a Qdrant server and caches the result"""
+
+    def __init__(self, client: QdrantClient, interval: float = 15):
+        """
+        Args:
+            client: Client to check (without retries, so failures show quickly)
+            interval: Seconds between background checks
+        """
+        self.client = client
+        self.interval = interval
+        self.healthy: Optional[bool] = None
+        self.error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> bool:
+        """Check the server now and update the cached status"""
+        try:
+            self.client.info()
+            healthy, error = True, None
+        except Exception as e:
+            healthy, error = False, str(e)
+        with self._lock:
+            if healthy != self.healthy:
+                print(f"Qdrant is {'reachable' if healthy else 'unreachable'}" + (f": {error}" if error else ""))
+            self.healthy, self.error, self.checked_at = healthy, error, time.time()
+        return healthy
+
+    def is_healthy(self) -> bool:
+        """Cached status; checks synchronously only before the first check"""
+        if self.checked_at is None:
+            return self.check()
+        return bool(self.healthy)
+
+    def start(self):
+        """Start the background check thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="qdrant-health", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.check()
+
+
+def create_client(url: str, api_key: Optional[str] = None) -> QdrantClient:
+    """Create a client for `url` with the pool settings from config"""
+    if url == ":memory:":
+        return QdrantClient(location=":memory:")
+
+    import httpx
+    return QdrantClient(
+        url=url,
+        api_key=api_key,
+        prefer_grpc=config.QDRANT_PREFER_GRPC,
+        grpc_port=config.QDRANT_GRPC_PORT,
+        timeout=config.QDRANT_TIMEOUT,
+        # Without explicit limits the REST transport does not keep connections alive
+        limits=httpx.Limits(
+            max_connections=config.QDRANT_MAX_CONNECTIONS,
+            max_keepalive_connections=config.QDRANT_MAX_KEEPALIVE,
+            keepalive_expiry=config.QDRANT_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+_pool: Dict[Tuple[str, Optional[str]], Tuple[RetryingClient, HealthChecker]] = {}
+_pool_lock = threading.Lock()
+
+
+def _entry(url: Optional[str], api_key: Optional[str]) -> Tuple[RetryingClient, HealthChecker]:
+    url = url or config.QDRANT_URL
+    if api_key is None:
+        api_key = config.QDRANT_API_KEY
+    key = (url, api_key)
+    with _pool_lock:
+        if key not in _pool:
+            client = create_client(url, api_key)
+            health = HealthChecker(client, interval=config.QDRANT_HEALTH_CHECK_INTERVAL)
+            health.start()
+            _pool[key] = (
+                RetryingClient(client, retries=config.QDRANT_RETRIES, backoff=config.QDRANT_RETRY_BACKOFF,
+                               health=health),
+                health,
+            )
+        return _pool[key]
+
+
+def get_client(url: Optional[str] = None, api_key: Optional[str] = None) -> RetryingClient:
+    """Return the shared client for a server (default: config.QDRANT_URL)"""
+    return _entry(url, api_key)[0]
+
+
+def get_health(url: Optional[str] = None, api_key: Optional[str] = None) -> HealthChecker:
+    """Return the background health checker for a server (default: config.QDRANT_URL)"""
+    return _entry(url, api_key)[1]
@@ -0,0 +1,101 @@
+"""
+Query Cache Module
+Process-wide caches for the search path:
+- Query embeddings (LRU + TTL), keyed by model and normalized query text
+- Search results (short TTL), keyed by collection, query, filter and top-k
+- Per-collection generation counters, bumped on every mutation so cached
+  results of a changed collection are never served again
+"""
+
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import config
+
+
+def normalize_query(text: str) -> str:
+    """Normalize query text for cache keys (Unicode form and whitespace only)"""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a fixed time"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        """Initialize the cache
+
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+            ttl: Seconds an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entries if full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+# Collection generation counters
+_generations: dict = {}
+_generations_lock = threading.Lock()
+
+
+def get_generation(collection_name: str) -> int:
+    """Current mutation generation of a collection"""
+    with _generations_lock:
+        return _generations.get(collection_name, 0)
+
+
+def bump_generation(collection_name: str) -> int:
+    """Mark a collection as changed (upsert, delete, recreate)
+
+    Cached results are keyed by generation, so this invalidates them without
+    scanning the cache. Returns the new generation.
+    """
+    with _generations_lock:
+        _generations[collection_name] = _generations.get(collection_name, 0) + 1
+        return _generations[collection_name]
+
+
+# Shared caches
+query_embedding_cache = TTLCache(
+    max_entries=config.QUERY_EMBEDDING_CACHE_SIZE,
+    ttl=config.QUERY_EMBEDDING_CACHE_TTL,
+)
+result_cache = TTLCache(
+    max_entries=config.SEARCH_RESULT_CACHE_SIZE,
+    ttl=config.SEARCH_RESULT_CACHE_TTL,
+)
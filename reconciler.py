@@ -0,0 +1,247 @@
+"""
+Storage Reconciler Module
+Finds and reclaims documents whose stores have drifted apart:
+- Files on disk (page archives, PDFs, legacy image folders) with no points in Qdrant
+- Catalog entries with no points (e.g. failed uploads)
+- Local MaxSim vector copies of deleted documents or collections
+Document-ID sets come from Qdrant facets, a scan of the storage directories
+and the catalog, and are diffed with set operations. Recent documents are
+left alone (an upload in progress has files and a catalog entry before its
+points), and a run reclaims at most a bounded number of documents, so a
+scheduled reconciler works through a large backlog incrementally.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+import config
+from metadata_store import get_metadata_store
+from metrics import RECONCILE_BYTES_FREED, RECONCILE_ORPHANS
+from page_store import PageStore
+
+if TYPE_CHECKING:
+    from maxsim import PageVectorStore
+    from metadata_store import MetadataStore
+    from qdrant_manager import QdrantManager
+
+
+def collection_document_ids(qdrant_manager: 'QdrantManager', collection_name: str) -> Set[str]:
+    """Unique IDs of all documents with points in a collection
+
+    Errors are raised: an incomplete set would mark live documents as orphans.
+    """
+    return qdrant_manager.document_ids(collection_name, limit=config.RECONCILE_FACET_LIMIT)
+
+
+def live_document_ids(qdrant_manager: 'QdrantManager') -> Dict[str, Set[str]]:
+    """Document IDs with points, per collection and per alias
+
+    Raises instead of returning a partial result when Qdrant is unavailable.
+    """
+    # The client calls raise on connection errors (list_collections and get_aliases return empty)
+    names = [collection.name for collection in qdrant_manager.client.get_collections().collections]
+    live = {name: collection_document_ids(qdrant_manager, name) for name in names}
+    for alias in qdrant_manager.client.get_aliases().aliases:
+        live[alias.alias_name] = live.get(alias.collection_name, set())
+    return live
+
+
+def _upload_time(upload_date: Optional[str]) -> Optional[float]:
+    try:
+        return datetime.strptime(upload_date or "", "%Y-%m-%d_%H-%M-%S").timestamp()
+    except ValueError:
+        return None
+
+
+def reconcile(
+    qdrant_manager: 'QdrantManager',
+    dry_run: bool = False,
+    grace_seconds: float = None,
+    batch_size: int = None,
+    max_documents: int = None,
+    page_store: Optional[PageStore] = None,
+    metadata_store: Optional['MetadataStore'] = None,
+    vector_store: Optional['PageVectorStore'] = None,
+) -> Dict:
+    """Find orphaned documents and (unless dry_run) reclaim them
+
+    Args:
+        qdrant_manager: QdrantManager instance
+        dry_run: Only report what would be reclaimed
+        grace_seconds: Leave documents younger than this alone (default: config.RECONCILE_GRACE_SECONDS)
+        batch_size: Documents reclaimed per batch (default: config.RECONCILE_BATCH_SIZE)
+        max_documents: Documents reclaimed per run (default: config.RECONCILE_MAX_PER_RUN)
+        page_store: Optional PageStore (default: the configured storage directories)
+        metadata_store: Optional catalog (default: the shared catalog)
+        vector_store: Optional PageVectorStore (default: config.VECTOR_STORE_PATH)
+
+    Returns:
+        Report with orphan counts per kind, documents reclaimed and remaining,
+        bytes freed and seconds taken; "error" is set (and nothing deleted)
+        if Qdrant could not be read
+    """
+    from maxsim import PageVectorStore
+
+    grace_seconds = config.RECONCILE_GRACE_SECONDS if grace_seconds is None else grace_seconds
+    batch_size = batch_size or config.RECONCILE_BATCH_SIZE
+    max_documents = config.RECONCILE_MAX_PER_RUN if max_documents is None else max_documents
+    page_store = page_store or PageStore()
+    metadata_store = metadata_store or get_metadata_store()
+    vector_store = vector_store or PageVectorStore()
+
+    started = time.perf_counter()
+    report = {
+        "dry_run": dry_run,
+        "orphaned_files": 0,
+        "orphaned_catalog": 0,
+        "orphaned_vectors": 0,
+        "missing_files": 0,
+        "reclaimed": 0,
+        "remaining": 0,
+        "bytes_freed": 0,
+        "error": None,
+    }
+    try:
+        live = live_document_ids(qdrant_manager)
+    except Exception as e:
+        report["error"] = f"Could not read Qdrant, nothing reclaimed: {e}"
+        print(f"Reconciler: {report['error']}")
+        return report
+
+    all_live = set().union(*live.values()) if live else set()
+    catalog = metadata_store.document_ids()
+    files = page_store.scan_documents()
+    cutoff = time.time() - grace_seconds
+
+    # Young catalog entries may be uploads whose points are still being written
+    recent = {
+        uid for uid, entry in catalog.items()
+        if (_upload_time(entry["upload_date"]) or 0) > cutoff
+    }
+    live_names = {catalog[uid]["original_name"] for uid in all_live & catalog.keys()}
+
+    orphaned_catalog = set(catalog) - all_live - recent
+    orphaned_files = {
+        uid for uid, mtime in files.items()
+        if mtime <= cutoff and uid not in recent and uid not in live_names
+    } - all_live
+    orphaned_vectors = []
+    for collection in _vector_collections(vector_store):
+        owned = live.get(collection, set())
+        orphaned_vectors.extend(
+            (collection, uid) for uid in vector_store.list_documents(collection)
+            if uid not in owned and uid not in recent
+        )
+
+    report["orphaned_files"] = len(orphaned_files)
+    report["orphaned_catalog"] = len(orphaned_catalog)
+    report["orphaned_vectors"] = len(orphaned_vectors)
+    # Reported only: points whose PDF and images are gone cannot be restored here
+    report["missing_files"] = len(all_live - files.keys())
+    for kind in ("files", "catalog", "vectors"):
+        RECONCILE_ORPHANS.set(report[f"orphaned_{kind}"], kind=kind)
+
+    documents = sorted(orphaned_files | orphaned_catalog)[:max_documents]
+    vector_documents = sorted(orphaned_vectors)[:max(0, max_documents - len(documents))]
+    total = len(orphaned_files | orphaned_catalog) + len(orphaned_vectors)
+    if dry_run:
+        report["bytes_freed"] = sum(page_store.document_bytes(uid) for uid in documents) + sum(
+            vector_store.document_bytes(collection, uid) for collection, uid in vector_documents
+        )
+        report["remaining"] = total
+        report["seconds"] = time.perf_counter() - started
+        return report
+
+    for start in range(0, len(documents), batch_size):
+        batch = documents[start:start + batch_size]
+        for uid in batch:
+            report["bytes_freed"] += page_store.document_bytes(uid)
+            # Image folders of the oldest layout are named after the document
+            names = [catalog[uid]["original_name"]] if uid in catalog else []
+            page_store.delete_document(uid, legacy_names=[name for name in names if name not in live_names])
+        metadata_store.delete_documents([uid for uid in batch if uid in orphaned_catalog])
+        report["reclaimed"] += len(batch)
+
+    for collection, uid in vector_documents:
+        report["bytes_freed"] += vector_store.document_bytes(collection, uid)
+        vector_store.delete_document(collection, uid)
+        report["reclaimed"] += 1
+    report["remaining"] = total - report["reclaimed"]
+
+    RECONCILE_BYTES_FREED.inc(report["bytes_freed"])
+    report["seconds"] = time.perf_counter() - started
+    if report["reclaimed"]:
+        print(f"Reconciler: reclaimed {report['reclaimed']} document(s), "
+              f"{report['bytes_freed'] / 1024 ** 2:.1f} MB freed, {report['remaining']} remaining")
+    return report
+
+
+def _vector_collections(vector_store: 'PageVectorStore') -> List[str]:
+    if not os.path.isdir(vector_store.root):
+        return []
+    return sorted(entry.name for entry in os.scandir(vector_store.root) if entry.is_dir())
+
+
+_thread: Optional[threading.Thread] = None
+_stop = threading.Event()
+_last_report: Optional[Dict] = None
+_thread_lock = threading.Lock()
+
+
+def start_scheduled_reconcile(qdrant_manager: 'QdrantManager', interval: float) -> bool:
+    """Run reconcile() every `interval` seconds in a daemon thread; safe to call on every Streamlit rerun
+
+    Returns:
+        True if the thread is running
+    """
+    global _thread
+    with _thread_lock:
+        if _thread is not None and _thread.is_alive():
+            return True
+
+        def _run():
+            global _last_report
+            while not _stop.wait(interval):
+                try:
+                    _last_report = reconcile(qdrant_manager)
+                except Exception as e:
+                    print(f"Reconciler run failed: {e}")
+
+        _stop.clear()
+        _thread = threading.Thread(target=_run, name="storage-reconciler", daemon=True)
+        _thread.start()
+        return True
+
+
+def stop_scheduled_reconcile():
+    _stop.set()
+
+
+def last_report() -> Optional[Dict]:
+    """Report of the last scheduled run, if any"""
+    return _last_report
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from qdrant_manager import QdrantManager
+
+    parser = argparse.ArgumentParser(description="Reclaim storage of documents that no longer have points")
+    parser.add_argument("--url", default=config.QDRANT_URL)
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be reclaimed")
+    parser.add_argument("--max-documents", type=int, default=config.RECONCILE_MAX_PER_RUN)
+    parser.add_argument("--grace", type=float, default=config.RECONCILE_GRACE_SECONDS,
+                        help="Seconds a new document is left alone")
+    args = parser.parse_args()
+
+    result = reconcile(
+        QdrantManager(url=args.url, api_key=config.QDRANT_API_KEY),
+        dry_run=args.dry_run,
+        grace_seconds=args.grace,
+        max_documents=args.max_documents,
+    )
+    print(json.dumps(result, indent=2))
+    raise SystemExit(1 if result["error"] else 0)
@@ -0,0 +1,330 @@
+"""
+Search Engine Module
+Query-side retrieval over the ColPali collections created by QdrantManager:
+- Query embedding with the shared ColPali model
+- Cached query multivectors and cached search results (see query_cache)
+- Page-level search returning document/page payloads with scores
+- Hybrid search fusing BM25 text vectors with the visual scores (see lexical)
+- Optional exact MaxSim reranking or fully local search (see maxsim)
+"""
+
+from typing import List, Dict, Optional, TYPE_CHECKING
+import numpy as np
+from qdrant_client.http import models as qdrant_models
+import config
+from maxsim import LocalMaxSimIndex
+from qdrant_manager import tenant_filter
+from lexical import TEXT_VECTOR_NAME, query_sparse_vector
+from query_cache import (
+    normalize_query,
+    get_generation,
+    query_embedding_cache,
+    result_cache,
+)
+
+if TYPE_CHECKING:
+    from qdrant_manager import QdrantManager
+
+SEARCH_MODES = ("visual", "hybrid", "lexical_prefilter")
+
+
+class SearchEngine:
+    """Embeds queries and searches page multivectors in Qdrant"""
+
+    def __init__(
+        self,
+        qdrant_manager: 'QdrantManager',
+        model=None,
+        processor=None,
+        local_index: Optional[LocalMaxSimIndex] = None,
+    ):
+        """Initialize the search engine
+
+        Args:
+            qdrant_manager: Manager whose client is used for queries
+            model: Optional ColPali model (default: the shared model, loaded on first embed)
+            processor: Optional ColPali processor matching `model`
+            local_index: Exact MaxSim index used for reranking and the "local" backend
+        """
+        self.client = qdrant_manager.client
+        self._model = model
+        self._processor = processor
+        self.local_index = local_index or LocalMaxSimIndex()
+
+    def _get_model(self):
+        if self._model is None:
+            from embedding_model import get_model
+            self._model, self._processor = get_model()
+        return self._model, self._processor
+
+    def _embed_uncached(self, queries: List[str]) -> List[np.ndarray]:
+        """Run the model on a list of queries in one padded forward pass
+
+        Returns one float32 array of shape (n_tokens, dim) per query with the
+        padding positions removed.
+        """
+        import torch
+
+        model, processor = self._get_model()
+        with torch.no_grad():
+            batch = processor.process_queries(queries).to(model.device)
+            embeddings = model(**batch)
+        mask = batch["attention_mask"].bool()
+        return [
+            emb[token_mask].float().cpu().numpy()
+            for emb, token_mask in zip(embeddings, mask)
+        ]
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Return the query multivector, from cache when the same text was seen before"""
+        return self.embed_queries([query])[0]
+
+    def embed_queries(self, queries: List[str]) -> List[np.ndarray]:
+        """Return one multivector per query, embedding all cache misses together
+
+        Misses are embedded in padded batches of config.QUERY_EMBED_BATCH_SIZE,
+        so a batch of N new queries costs ceil(N / batch size) forward passes.
+        """
+        keys = [(config.COLPALI_MODEL_NAME, normalize_query(q)) for q in queries]
+        embeddings = [query_embedding_cache.get(key) for key in keys]
+
+        missing = list(dict.fromkeys(key for key, emb in zip(keys, embeddings) if emb is None))
+        computed = {}
+        batch_size = config.QUERY_EMBED_BATCH_SIZE
+        for start in range(0, len(missing), batch_size):
+            chunk = missing[start:start + batch_size]
+            for key, embedding in zip(chunk, self._embed_uncached([k[1] for k in chunk])):
+                query_embedding_cache.put(key, embedding)
+                computed[key] = embedding
+
+        return [emb if emb is not None else computed[key] for key, emb in zip(keys, embeddings)]
+
+    def search(
+        self,
+        collection_name: str,
+        query: str,
+        top_k: int = config.DEFAULT_TOP_K,
+        query_filter: Optional[qdrant_models.Filter] = None,
+        backend: Optional[str] = None,
+        rerank_candidates: Optional[int] = None,
+        mode: Optional[str] = None,
+        shard_key: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        hnsw_ef: Optional[int] = None,
+        exact: Optional[bool] = None,
+    ) -> List[Dict]:
+        """Search a collection for the pages that best match a text query
+
+        Args:
+            collection_name: Name of the collection
+            query: Natural language query
+            top_k: Number of pages to return
+            query_filter: Optional Qdrant filter applied to the payload
+            backend: "qdrant" or "local" (exact search over the local vector
+                store, for small collections); default config.SEARCH_BACKEND.
+                Filtered and shard-key searches always go to Qdrant.
+            rerank_candidates: With the qdrant backend, fetch this many candidates
+                and rerank them with exact local MaxSim (0 = off); default
+                config.EXACT_RERANK_CANDIDATES
+            mode: "visual" (ColPali MaxSim only), "hybrid" (RRF fusion of the
+                visual and BM25 text retrievers) or "lexical_prefilter" (BM25
+                candidates rescored with MaxSim); default config.SEARCH_MODE.
+                The text modes need a collection created with a text index.
+            shard_key: Only search this shard key of a custom-sharded
+                collection (default: all shards, searched in parallel)
+            tenant_id: Only search this tenant's documents of a multi-tenant
+                collection (added to query_filter)
+            hnsw_ef: HNSW beam width of the visual search; larger is more
+                accurate and slower (default config.SEARCH_HNSW_EF, None =
+                Qdrant's default)
+            exact: Skip the HNSW index and score every page (default
+                config.SEARCH_EXACT)
+
+        Returns:
+            List of result dictionaries ordered by descending score
+        """
+        return self.search_batch(
+            collection_name,
+            [query],
+            top_k=top_k,
+            query_filter=query_filter,
+            backend=backend,
+            rerank_candidates=rerank_candidates,
+            mode=mode,
+            shard_key=shard_key,
+            tenant_id=tenant_id,
+            hnsw_ef=hnsw_ef,
+            exact=exact,
+        )[0]
+
+    def search_batch(
+        self,
+        collection_name: str,
+        queries: List[str],
+        top_k: int = config.DEFAULT_TOP_K,
+        query_filter: Optional[qdrant_models.Filter] = None,
+        backend: Optional[str] = None,
+        rerank_candidates: Optional[int] = None,
+        mode: Optional[str] = None,
+        shard_key: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        hnsw_ef: Optional[int] = None,
+        exact: Optional[bool] = None,
+    ) -> List[List[Dict]]:
+        """Search a collection with many queries at once
+
+        Uncached queries are embedded in one padded forward pass and sent to
+        Qdrant in a single query_batch_points request. Arguments are the same
+        as for search().
+
+        Returns:
+            One result list per query, in the order of `queries`
+        """
+        if tenant_id is not None:
+            query_filter = tenant_filter(tenant_id, query_filter)
+        backend = backend or config.SEARCH_BACKEND
+        if query_filter is not None or shard_key is not None:
+            backend = "qdrant"
+        if rerank_candidates is None:
+            rerank_candidates = config.EXACT_RERANK_CANDIDATES
+        mode = mode or config.SEARCH_MODE
+        if hnsw_ef is None:
+            hnsw_ef = config.SEARCH_HNSW_EF
+        if exact is None:
+            exact = config.SEARCH_EXACT
+        search_params = None
+        if hnsw_ef is not None or exact:
+            search_params = qdrant_models.SearchParams(hnsw_ef=hnsw_ef, exact=exact)
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}', expected one of {SEARCH_MODES}")
+
+        generation = get_generation(collection_name)
+        cache_keys = [
+            (
+                collection_name,
+                generation,
+                config.COLPALI_MODEL_NAME,
+                normalize_query(query),
+                _filter_key(query_filter),
+                top_k,
+                backend,
+                rerank_candidates,
+                mode,
+                shard_key,
+                hnsw_ef,
+                exact,
+            )
+            for query in queries
+        ]
+        results: List[Optional[List[Dict]]] = [None] * len(queries)
+        for i, key in enumerate(cache_keys):
+            cached = result_cache.get(key)
+            if cached is not None:
+                results[i] = [dict(result) for result in cached]
+
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+
+        embeddings = self.embed_queries([queries[i] for i in pending])
+        if backend == "local":
+            fetched = self.local_index.search(collection_name, embeddings, top_k)
+        else:
+            responses = self.client.query_batch_points(
+                collection_name=collection_name,
+                requests=[
+                    qdrant_models.QueryRequest(
+                        **self._build_query(embedding, queries[i], mode, query_filter, search_params),
+                        filter=query_filter,
+                        limit=max(top_k, rerank_candidates),
+                        with_payload=True,
+                        with_vector=False,
+                        shard_key=shard_key,
+                    )
+                    for i, embedding in zip(pending, embeddings)
+                ],
+            )
+            fetched = []
+            for embedding, response in zip(embeddings, responses):
+                page_results = [_to_result(point) for point in response.points]
+                if rerank_candidates:
+                    page_results = self._rerank(collection_name, embedding, page_results, top_k)
+                fetched.append(page_results[:top_k])
+
+        for i, page_results in zip(pending, fetched):
+            result_cache.put(cache_keys[i], tuple(page_results))
+            results[i] = [dict(result) for result in page_results]
+        return results
+
+    def _build_query(
+        self,
+        embedding: np.ndarray,
+        query: str,
+        mode: str,
+        query_filter: Optional[qdrant_models.Filter],
+        search_params: Optional[qdrant_models.SearchParams] = None,
+    ) -> Dict:
+        """Build the query/prefetch arguments of query_points for a search mode
+
+        `search_params` (hnsw_ef/exact) apply to the visual (dense) search.
+        """
+        dense = embedding.tolist()
+        indices, values = query_sparse_vector(query)
+        if mode == "visual" or not indices:
+            return {"query": dense, "params": search_params}
+
+        sparse = qdrant_models.SparseVector(indices=indices, values=values)
+        text_prefetch = qdrant_models.Prefetch(
+            query=sparse,
+            using=TEXT_VECTOR_NAME,
+            filter=query_filter,
+            limit=config.HYBRID_PREFETCH_LIMIT,
+        )
+        if mode == "lexical_prefilter":
+            # MaxSim only runs on the pages the text index selected
+            return {"prefetch": text_prefetch, "query": dense}
+        return {
+            "prefetch": [
+                qdrant_models.Prefetch(
+                    query=dense, filter=query_filter, params=search_params, limit=config.HYBRID_PREFETCH_LIMIT
+                ),
+                text_prefetch,
+            ],
+            "query": qdrant_models.FusionQuery(fusion=qdrant_models.Fusion.RRF),
+        }
+
+    def _rerank(self, collection_name: str, embedding: np.ndarray, results: List[Dict], top_k: int) -> List[Dict]:
+        """Reorder Qdrant candidates by exact MaxSim over the local vector store
+
+        Keeps Qdrant's order if any candidate is missing from the store (e.g.
+        documents ingested before LOCAL_VECTOR_STORE_ENABLED was turned on).
+        """
+        candidates = [(r["unique_document_id"], r["page_number"]) for r in results]
+        reranked = self.local_index.score_pages(collection_name, [embedding], candidates)[0]
+        if len(reranked) != len(results):
+            return results
+        point_ids = {(r["unique_document_id"], r["page_number"]): r["point_id"] for r in results}
+        for result in reranked:
+            result["point_id"] = point_ids[(result["unique_document_id"], result["page_number"])]
+        return reranked[:top_k]
+
+
+def _filter_key(query_filter: Optional[qdrant_models.Filter]) -> Optional[str]:
+    """Stable, hashable representation of a filter for cache keys"""
+    if query_filter is None:
+        return None
+    # pydantic v2 / v1
+    dump = getattr(query_filter, "model_dump_json", None) or query_filter.json
+    return dump(exclude_none=True)
+
+
+def _to_result(point) -> Dict:
+    payload = point.payload or {}
+    return {
+        "point_id": point.id,
+        "score": point.score,
+        "unique_document_id": payload.get("unique_document_id"),
+        "document_name": payload.get("document_name", "Unknown"),
+        "page_number": payload.get("page_number"),
+        "total_pages": payload.get("total_pages", 0),
+    }
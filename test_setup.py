@@ -156,6 +156,30 @@ def test_directories():
     return all_ok
 
 
+def test_import_time():
+    """Test that app modules import quickly and without the model stack"""
+    print()
+    print("Testing Import Time...")
+    print("-" * 60)
+    
+    try:
+        # The benchmarks package lives next to this script
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from benchmarks.bench_imports import check
+        problems = check(repeat=1)
+    except Exception as e:
+        print(f"⚠️  Cannot measure import time: {e}")
+        return False
+    
+    if problems:
+        for problem in problems:
+            print(f"⚠️  {problem}")
+        return False
+    
+    print("✅ App modules import within budget")
+    return True
+
+
 def main():
     """Run all tests"""
     
@@ -165,6 +189,7 @@ def main():
         'poppler': test_poppler(),
         'cuda': test_cuda(),
         'directories': test_directories(),
+        'import_time': test_import_time(),
     }
     
     print()
@@ -188,6 +213,9 @@ def main():
     if not results['cuda']:
         warnings.append("CUDA not available (processing will be slower)")
     
+    if not results['import_time']:
+        warnings.append("Slow imports (startup and first page visits will be slower)")
+    
     if critical_issues:
         print("❌ CRITICAL ISSUES:")
         for issue in critical_issues:
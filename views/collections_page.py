@@ -5,6 +5,10 @@ Collections Page - Manage vector store collections
 import streamlit as st
 from typing import TYPE_CHECKING
 import config
+from collection_stats import get_collector
+from maxsim import PageVectorStore
+from metadata_store import get_metadata_store
+from views.manage_page import delete_document_files
 
 if TYPE_CHECKING:
     from qdrant_manager import QdrantManager
@@ -22,16 +26,73 @@ def render(qdrant_manager: 'QdrantManager'):
                 new_collection_name = st.text_input("Name", placeholder="my_collection")
             with col2:
                 vector_size = st.number_input("Vector Size", value=config.VECTOR_SIZE)
+            text_index = st.checkbox(
+                "Index PDF text for hybrid search",
+                value=config.TEXT_INDEX_ENABLED,
+                help="Stores BM25 sparse vectors of each page's text layer next to the ColPali vectors"
+            )
+            multi_tenant = st.checkbox(
+                "Multi-tenant",
+                help="Keep many teams' document sets in this one collection instead of one collection each; "
+                     "tenants are chosen on upload and listed like collections"
+            )
+            with st.expander("Sharding (multi-node Qdrant)"):
+                s1, s2, s3 = st.columns(3)
+                with s1:
+                    shard_number = st.number_input(
+                        "Shards", min_value=0, value=0,
+                        help="0 = server default; per shard key with custom sharding"
+                    )
+                with s2:
+                    replication_factor = st.number_input("Replicas", min_value=0, value=0, help="0 = server default")
+                with s3:
+                    write_consistency_factor = st.number_input(
+                        "Write Consistency", min_value=0, value=0,
+                        help="Replicas that must confirm a write (0 = server default)"
+                    )
+                shard_keys_text = st.text_input(
+                    "Shard keys",
+                    placeholder="e.g. 2023, 2024 or tenant names",
+                    help="Comma-separated; enables custom sharding, documents are then uploaded to one shard key"
+                )
+
+            with st.expander("Index tuning (HNSW)"):
+                h1, h2 = st.columns(2)
+                with h1:
+                    hnsw_m = st.number_input(
+                        "M", min_value=0, value=config.HNSW_M or 0,
+                        help="Graph links per page vector; more raise recall and memory (0 = default, 16)"
+                    )
+                with h2:
+                    ef_construct = st.number_input(
+                        "ef_construct", min_value=0, value=config.HNSW_EF_CONSTRUCT or 0,
+                        help="Build-time beam width; larger builds a better graph more slowly (0 = default, 100)"
+                    )
             
             if st.form_submit_button("Create", type="primary"):
                 if new_collection_name and new_collection_name.replace("_", "").replace("-", "").isalnum():
-                    if qdrant_manager.create_collection(new_collection_name, vector_size):
+                    shard_keys = [key.strip() for key in shard_keys_text.split(",") if key.strip()]
+                    if qdrant_manager.create_collection(
+                        new_collection_name,
+                        vector_size,
+                        text_index=text_index,
+                        shard_number=int(shard_number) or None,
+                        replication_factor=int(replication_factor) or None,
+                        write_consistency_factor=int(write_consistency_factor) or None,
+                        shard_keys=shard_keys or None,
+                        multi_tenant=multi_tenant,
+                        hnsw_m=int(hnsw_m) or None,
+                        ef_construct=int(ef_construct) or None,
+                    ):
+                        get_collector(qdrant_manager).invalidate()
                         st.success(f"Created '{new_collection_name}'")
                         st.rerun()
                     else:
                         st.error("Failed.")
                 else:
                     st.error("Invalid name.")
+
+    render_storage_cleanup(qdrant_manager)
     
     st.markdown("---")
     
@@ -42,11 +103,13 @@ def render(qdrant_manager: 'QdrantManager'):
         st.info("No collections found.")
         return
 
+    snapshot = get_collector(qdrant_manager).snapshot()
+
     for collection in collections:
         with st.container(border=True):
-            stats = qdrant_manager.get_collection_stats(collection)
-            docs = stats.get('total_documents', 0) if stats else 0
-            points = stats.get('total_points', 0) if stats else 0
+            stats = snapshot.get(collection)
+            docs = (stats.get('total_documents') or 0) if stats else 0
+            points = (stats.get('total_points') or 0) if stats else 0
             
             # Revised Layout: Info Left, Actions Right
             # Removed Vector Size and Status as requested
@@ -55,7 +118,15 @@ def render(qdrant_manager: 'QdrantManager'):
             with c1:
                 st.subheader(f"📁 {collection}")
                 # Combined metrics for cleaner look
-                st.caption(f"**{docs}** Documents • **{points:,}** Points")
+                more = "+" if stats and stats.get('documents_lower_bound') else ""
+                caption = f"**{docs}{more}** Documents • **{points:,}** Points"
+                if stats and ((stats.get('shard_number') or 1) > 1 or (stats.get('replication_factor') or 1) > 1):
+                    caption += f" • {stats.get('shard_number') or 1} Shards × {stats.get('replication_factor') or 1} Replicas"
+                if stats and stats.get('custom_sharding'):
+                    caption += " • Sharded by key"
+                if stats and stats.get('tenants') is not None:
+                    caption += f" • **{stats['tenants']}** Tenants"
+                st.caption(caption)
             
             with c2:
                 # Actions pushed to the right
@@ -66,12 +137,14 @@ def render(qdrant_manager: 'QdrantManager'):
                 with b1:
                     if st.button("📤 Upload Data", key=f"up_{collection}", use_container_width=True):
                         st.session_state.selected_collection = collection
+                        st.session_state.selected_tenant = None
                         st.session_state.page = "Upload"
                         st.rerun()
                 
                 with b2:
                     if st.button("🔎 Manage & Search", key=f"man_{collection}", use_container_width=True, type="primary"):
                         st.session_state.selected_collection = collection
+                        st.session_state.selected_tenant = None
                         st.session_state.page = "Manage"
                         st.rerun()
                 
@@ -79,16 +152,105 @@ def render(qdrant_manager: 'QdrantManager'):
                     if st.button("🗑️", key=f"del_{collection}", type="secondary", help="Delete Collection"):
                         st.session_state[f"confirm_{collection}"] = True
 
+            if stats and stats.get('tenants'):
+                render_tenants(qdrant_manager, collection)
+
             # Confirmation Dialog
             if st.session_state.get(f"confirm_{collection}"):
                 st.warning(f"Permanently delete '{collection}'?")
                 col_yes, col_no = st.columns(2)
                 with col_yes:
                     if st.button("Yes, Delete", key=f"yes_{collection}", type="primary", use_container_width=True):
-                        qdrant_manager.delete_collection(collection)
+                        # Catalog entries may use the alias or the collection behind it
+                        names = {collection, qdrant_manager.resolve_collection(collection)}
+                        documents = [doc for name in names for doc in get_metadata_store().list_documents(name)]
+                        if qdrant_manager.delete_collection(collection):
+                            for doc in documents:
+                                delete_document_files(doc["collection"], doc["unique_id"], doc.get("original_name", doc["unique_id"]))
+                        for name in names:
+                            PageVectorStore().delete_collection(name)
+                        get_collector(qdrant_manager).invalidate()
                         st.session_state[f"confirm_{collection}"] = False
                         st.rerun()
                 with col_no:
                     if st.button("Cancel", key=f"no_{collection}", use_container_width=True):
                         st.session_state[f"confirm_{collection}"] = False
                         st.rerun()
+
+
+def render_tenants(qdrant_manager: 'QdrantManager', collection: str):
+    """List the tenants of a multi-tenant collection with the same actions as collections"""
+    with st.expander("Tenants"):
+        for tenant, points in qdrant_manager.list_tenants(collection).items():
+            t1, t2, t3, t4 = st.columns([2, 1, 1, 0.5])
+            with t1:
+                st.markdown(f"**{tenant}**")
+                st.caption(f"{points:,} Points")
+            with t2:
+                if st.button("📤 Upload", key=f"up_{collection}_{tenant}", use_container_width=True):
+                    st.session_state.selected_collection = collection
+                    st.session_state.selected_tenant = tenant
+                    st.session_state.page = "Upload"
+                    st.rerun()
+            with t3:
+                if st.button("🔎 Manage", key=f"man_{collection}_{tenant}", use_container_width=True):
+                    st.session_state.selected_collection = collection
+                    st.session_state.selected_tenant = tenant
+                    st.session_state.page = "Manage"
+                    st.rerun()
+            with t4:
+                if st.button("🗑️", key=f"del_{collection}_{tenant}", help="Delete Tenant"):
+                    st.session_state[f"confirm_{collection}_{tenant}"] = True
+
+            if st.session_state.get(f"confirm_{collection}_{tenant}"):
+                st.warning(f"Permanently delete tenant '{tenant}' and its documents?")
+                col_yes, col_no = st.columns(2)
+                with col_yes:
+                    if st.button("Yes, Delete", key=f"yes_{collection}_{tenant}", type="primary", use_container_width=True):
+                        if qdrant_manager.delete_tenant(collection, tenant):
+                            for doc in get_metadata_store().list_documents(collection, tenant_id=tenant):
+                                delete_document_files(collection, doc["unique_id"], doc.get("original_name", doc["unique_id"]))
+                        get_collector(qdrant_manager).invalidate()
+                        st.session_state[f"confirm_{collection}_{tenant}"] = False
+                        st.rerun()
+                with col_no:
+                    if st.button("Cancel", key=f"no_{collection}_{tenant}", use_container_width=True):
+                        st.session_state[f"confirm_{collection}_{tenant}"] = False
+                        st.rerun()
+
+
+def render_storage_cleanup(qdrant_manager: 'QdrantManager'):
+    """Find and reclaim files, catalog entries and vectors of documents that no longer have points"""
+    from reconciler import last_report, reconcile
+
+    with st.expander("Storage Cleanup"):
+        st.caption(
+            f"Documents younger than {config.RECONCILE_GRACE_SECONDS / 60:.0f} minutes are left alone; "
+            f"a run reclaims at most {config.RECONCILE_MAX_PER_RUN:,} documents."
+        )
+        c1, c2 = st.columns(2)
+        with c1:
+            if st.button("🔍 Scan", key="reconcile_scan", use_container_width=True):
+                st.session_state.reconcile_report = reconcile(qdrant_manager, dry_run=True)
+        with c2:
+            if st.button("🧹 Reclaim", key="reconcile_run", type="primary", use_container_width=True):
+                st.session_state.reconcile_report = reconcile(qdrant_manager)
+                get_collector(qdrant_manager).invalidate()
+
+        report = st.session_state.get("reconcile_report") or last_report()
+        if not report:
+            return
+        if report["error"]:
+            st.error(report["error"])
+            return
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Orphaned Files", report["orphaned_files"])
+        m2.metric("Orphaned Catalog Entries", report["orphaned_catalog"])
+        m3.metric("Orphaned Vectors", report["orphaned_vectors"])
+        m4.metric("MB " + ("to Free" if report["dry_run"] else "Freed"), f"{report['bytes_freed'] / 1024 ** 2:.1f}")
+        if report["dry_run"]:
+            st.caption(f"Dry run: nothing deleted. {report['remaining']} document(s) to reclaim.")
+        else:
+            st.caption(f"Reclaimed {report['reclaimed']} document(s), {report['remaining']} remaining.")
+        if report["missing_files"]:
+            st.warning(f"{report['missing_files']} indexed document(s) have no PDF or page images on disk.")
@@ -5,6 +5,7 @@ Home Page - Dashboard view with overview statistics
 import streamlit as st
 from typing import TYPE_CHECKING
 import pandas as pd
+from collection_stats import get_collector
 
 if TYPE_CHECKING:
     from qdrant_manager import QdrantManager
@@ -26,30 +27,46 @@ def render(qdrant_manager: 'QdrantManager'):
             st.rerun()
         return
 
+    # One snapshot of count/info calls per collection, shared across sessions
+    collector = get_collector(qdrant_manager)
+    snapshot = collector.snapshot()
+
     # Prepare data for a clean table
     data = []
     total_docs = 0
     total_points = 0
+    total_vector_bytes = 0
+    documents_lower_bound = False
     
     for collection in collections:
-        stats = qdrant_manager.get_collection_stats(collection)
+        stats = snapshot.get(collection)
         if stats:
-            docs = stats.get('total_documents', 0)
-            points = stats.get('total_points', 0)
+            docs = stats.get('total_documents') or 0
+            points = stats.get('total_points') or 0
+            vector_bytes = stats.get('estimated_vector_bytes') or 0
             total_docs += docs
+            documents_lower_bound = documents_lower_bound or bool(stats.get('documents_lower_bound'))
             total_points += points
+            total_vector_bytes += vector_bytes
             
             data.append({
                 "Collection Name": collection,
                 "Documents": docs,
+                "Tenants": stats.get('tenants'),
                 "Vector Points": f"{points:,}",
+                "Indexed": f"{stats.get('indexed_vectors_count') or 0:,}",
+                "Segments": stats.get('segments_count', 0),
+                "Vector Storage": f"{vector_bytes / (1024 ** 3):.2f} GB {'(disk)' if stats.get('vectors_on_disk') else '(RAM)'}",
+                "Optimizer": str(stats.get('optimizer_status', 'Unknown')),
                 "Status": stats.get('status', 'Unknown')
             })
     
     # Summary Metrics (Simple)
-    m1, m2 = st.columns(2)
-    m1.metric("Total Documents", total_docs)
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Total Documents", f"{total_docs:,}+" if documents_lower_bound else total_docs)
     m2.metric("Total Collections", len(collections))
+    m3.metric("Total Points", f"{total_points:,}")
+    m4.metric("Est. Vector Storage", f"{total_vector_bytes / (1024 ** 3):.2f} GB")
     
     st.markdown("### Active Collections")
     if data:
@@ -62,9 +79,16 @@ def render(qdrant_manager: 'QdrantManager'):
                 "Collection Name": st.column_config.TextColumn("Name", width="medium"),
                 "Documents": st.column_config.NumberColumn("Docs", format="%d"),
                 "Vector Points": st.column_config.TextColumn("Vectors"),
+                "Indexed": st.column_config.TextColumn("Indexed", help="Vectors covered by the HNSW index"),
+                "Segments": st.column_config.NumberColumn("Segments", format="%d"),
+                "Vector Storage": st.column_config.TextColumn("Vector Storage", help="Estimated from a sample of points"),
+                "Optimizer": st.column_config.TextColumn("Optimizer"),
                 "Status": st.column_config.TextColumn("Status")
             }
         )
+        age = collector.age()
+        if age is not None:
+            st.caption(f"Statistics updated {age:.0f}s ago")
     else:
         st.caption("No data available.")
 
@@ -5,14 +5,15 @@ Manage Page - View and delete documents from collections
 import streamlit as st
 from typing import TYPE_CHECKING
 import os
-import shutil
-import base64
-import urllib.parse
+import html
+import time
 import config
-from metadata_store import MetadataStore
-
-# Initialize metadata store
-metadata_store = MetadataStore()
+from asset_server import document_url, page_url
+from collection_stats import get_collector
+from metadata_store import get_metadata_store
+from maxsim import PageVectorStore
+from page_store import PageStore
+from views.targets import select_target
 
 if TYPE_CHECKING:
     from qdrant_manager import QdrantManager
@@ -21,6 +22,7 @@ def render(qdrant_manager: "QdrantManager"):
     """Render the document management page"""
 
     st.title("Manage Documents")
+    metadata_store = get_metadata_store()
 
     # Get collections
     collections = qdrant_manager.list_collections()
@@ -32,23 +34,27 @@ def render(qdrant_manager: "QdrantManager"):
     # Collection selection
     col_sel_1, col_sel_2 = st.columns([2, 1])
     with col_sel_1:
-        default_idx = 0
-        if st.session_state.get("selected_collection") in collections:
-            default_idx = collections.index(st.session_state.selected_collection)
-
-        selected_collection = st.selectbox(
-            "Select Collection",
-            collections,
-            index=default_idx
-        )
-        st.session_state.selected_collection = selected_collection
+        # Tenants of multi-tenant collections are listed like collections
+        selected_collection, tenant_id = select_target(qdrant_manager, collections, "Select Collection")
+    if selected_collection is None:
+        return
+    with col_sel_2:
+        # Documents indexed before the catalog existed are only known to Qdrant
+        st.write("")
+        if st.button("🔄 Rebuild index", help="Scan the collection once and add missing documents to the local catalog", use_container_width=True):
+            with st.spinner("Scanning collection..."):
+                qdrant_docs = qdrant_manager.list_documents_in_collection(selected_collection, tenant_id=tenant_id)
+                added = metadata_store.backfill_collection(selected_collection, qdrant_docs)
+            st.toast(f"Indexed {added} document(s)")
     
     st.divider()
 
-    # Get documents from Qdrant
-    qdrant_docs = qdrant_manager.list_documents_in_collection(selected_collection)
+    render_page_search(qdrant_manager, selected_collection, tenant_id)
+
+    # Documents are listed from the local catalog, which is indexed by collection and tenant
+    total_documents = metadata_store.count_documents(selected_collection, tenant_id=tenant_id)
     
-    if not qdrant_docs:
+    if total_documents == 0:
         st.info("No documents in this collection.")
         if st.button("Upload Document", type="primary"):
             st.session_state.page = "Upload"
@@ -56,118 +62,277 @@ def render(qdrant_manager: "QdrantManager"):
         return
 
     # Search
-    search_term = st.text_input("🔍 Search Documents", placeholder="Filter by name...")
-    
-    filtered_documents = qdrant_docs
+    search_col, mode_col = st.columns([3, 1])
+    with search_col:
+        search_term = st.text_input("🔍 Search Documents", placeholder="Filter by name...")
+    with mode_col:
+        search_mode = st.selectbox(
+            "Match",
+            ["substring", "prefix", "token"],
+            format_func=lambda m: {"substring": "Contains", "prefix": "Starts with", "token": "Words"}[m],
+            key="manage_search_mode"
+        )
+
+    # Sorting and pagination controls
+    sort_labels = {"Date": "upload_date", "Name": "name", "Pages": "pages"}
+    ctl1, ctl2, ctl3 = st.columns([2, 1, 1])
+    with ctl1:
+        sort_label = st.selectbox("Sort by", list(sort_labels), key="manage_sort_by")
+    with ctl2:
+        descending = st.selectbox("Order", ["Descending", "Ascending"], key="manage_sort_order") == "Descending"
+    with ctl3:
+        page_size_options = config.MANAGE_PAGE_SIZE_OPTIONS
+        page_size = st.selectbox(
+            "Per page",
+            page_size_options,
+            index=page_size_options.index(config.MANAGE_PAGE_SIZE) if config.MANAGE_PAGE_SIZE in page_size_options else 0,
+            key="manage_page_size"
+        )
+
+    if search_term:
+        matches = metadata_store.search_documents(
+            search_term,
+            collection=selected_collection,
+            mode=search_mode,
+            limit=config.SEARCH_RESULT_LIMIT,
+            tenant_id=tenant_id,
+            sort_by=sort_labels[sort_label],
+            descending=descending,
+        )
+        total_matches = len(matches)
+        if total_matches >= config.SEARCH_RESULT_LIMIT:
+            st.caption(f"Showing the first {total_matches} matches, refine the search to narrow it down")
+        else:
+            st.caption(f"Found {total_matches} matches")
+    else:
+        total_matches = total_documents
+
+    total_pages = max(1, -(-total_matches // page_size))
+    # A new search starts on its first page
+    if st.session_state.get("manage_search_term") != search_term:
+        st.session_state.manage_search_term = search_term
+        st.session_state.manage_page_number = 1
+    if st.session_state.get("manage_page_number", 1) > total_pages:
+        st.session_state.manage_page_number = total_pages
+    page_number = st.number_input(
+        "Page",
+        min_value=1,
+        max_value=total_pages,
+        key="manage_page_number",
+        help=f"{total_pages} page(s)",
+    )
+    offset = (page_number - 1) * page_size
+
     if search_term:
-        filtered_documents = [
-            doc for doc in qdrant_docs 
-            if search_term.lower() in doc["document_name"].lower()
-        ]
-        st.caption(f"Found {len(filtered_documents)} matches")
+        page_documents = matches[offset:offset + page_size]
+    else:
+        page_documents = metadata_store.list_documents(
+            selected_collection,
+            sort_by=sort_labels[sort_label],
+            descending=descending,
+            limit=page_size,
+            offset=offset,
+            tenant_id=tenant_id,
+        )
 
     # List Header
     st.subheader("Documents List")
+    st.caption(f"Showing {offset + 1}-{offset + len(page_documents)} of {total_matches}")
+
+    for doc in page_documents:
+        render_document_row(qdrant_manager, selected_collection, doc)
+
+def render_page_search(qdrant_manager, collection_name, tenant_id=None):
+    """Render the visual page search over the selected collection"""
+    with st.expander("🔎 Search Page Content", expanded=False):
+        with st.form("page_search_form"):
+            q1, q2 = st.columns([4, 1])
+            with q1:
+                query = st.text_input("Query", placeholder="What are you looking for?", label_visibility="collapsed")
+            with q2:
+                top_k = st.number_input("Results", min_value=1, max_value=50, value=config.DEFAULT_TOP_K, label_visibility="collapsed")
+            # Collection flags come from the cached stats snapshot, not a Qdrant call per rerun
+            flags = get_collector(qdrant_manager).flags(collection_name)
+            mode = "visual"
+            if flags.get("text_index"):
+                mode_labels = {"visual": "Visual", "hybrid": "Hybrid (text + visual)", "lexical_prefilter": "Keyword-filtered visual"}
+                mode = st.radio(
+                    "Mode",
+                    list(mode_labels),
+                    index=list(mode_labels).index(config.SEARCH_MODE),
+                    format_func=mode_labels.get,
+                    horizontal=True
+                )
+            shard_key = None
+            shard_keys = flags.get("shard_keys") or []
+            if shard_keys:
+                shard_key = st.selectbox(
+                    "Shard key",
+                    [None] + shard_keys,
+                    format_func=lambda key: "All shard keys" if key is None else key
+                )
+            exact = st.checkbox(
+                "Exact search",
+                value=config.SEARCH_EXACT,
+                help="Score every page instead of using the HNSW index; slower, shows what the index misses"
+            )
+            submitted = st.form_submit_button("Search", type="primary")
+
+        if not (submitted and query):
+            return
+
+        if 'search_engine' not in st.session_state:
+            from search_engine import SearchEngine
+            st.session_state.search_engine = SearchEngine(qdrant_manager)
+
+        with st.spinner("Searching..."):
+            started = time.perf_counter()
+            results = st.session_state.search_engine.search(
+                collection_name, query, top_k=int(top_k), mode=mode, shard_key=shard_key, tenant_id=tenant_id,
+                exact=exact
+            )
+            elapsed_ms = (time.perf_counter() - started) * 1000
 
-    for idx, doc in enumerate(filtered_documents, 1):
-        # Merge with local metadata if available
-        unique_id = doc["unique_document_id"]
-        meta = metadata_store.get_document(unique_id)
-        
-        display_name = doc["document_name"]
-        pdf_path = None
-        
-        if meta:
-            if "original_name" in meta:
-                display_name = meta["original_name"]
-            if "pdf_path" in meta:
-                pdf_path = meta["pdf_path"]
-        
-        # Fallback for PDF path if not in metadata but exists on disk
-        if not pdf_path:
-             potential_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Documents", f"{unique_id}.pdf")
-             if os.path.exists(potential_path):
-                 pdf_path = potential_path
-
-        with st.container(border=True):
-            # Header
-            c1, c2 = st.columns([4, 1])
-            with c1:
-                st.markdown(f"#### 📄 {display_name}")
-                st.caption(f"ID: `{unique_id}` | Pages: {doc['total_pages']} | Date: {doc['timestamp']}")
-                
-                # PDF Link
-                if pdf_path and os.path.exists(pdf_path):
-                     # Construct static URL relative to the app
-                     # Files in 'static' at root are served at 'app/static/...'
-                     # We symlinked Documents to static/documents
-                     # URL encode the filename to handle spaces
-                     encoded_filename = urllib.parse.quote(f"{unique_id}.pdf")
-                     pdf_url = f"/app/static/documents/{encoded_filename}"
-                     
-                     # Expander for inline viewing
-                     with st.expander("📄 View Document", expanded=False):
-                        if os.path.exists(pdf_path):
-                             # Use static URL for iframe as well to avoid base64 overhead
-                             pdf_display = f'<iframe src="{pdf_url}" width="100%" height="800" type="application/pdf"></iframe>'
-                             st.markdown(pdf_display, unsafe_allow_html=True)
-                else:
-                    st.caption("PDF file not available")
-
-            with c2:
-                if st.button("🗑️ Delete", key=f"del_btn_{idx}", type="secondary", use_container_width=True):
-                    st.session_state[f"confirm_delete_doc_{unique_id}"] = True
-
-            # Delete Confirmation
-            if st.session_state.get(f"confirm_delete_doc_{unique_id}", False):
-                st.error("Delete this document and all its embeddings?")
-                dc1, dc2 = st.columns(2)
-                with dc1:
-                     if st.button("Yes, Delete", key=f"confirm_yes_doc_{idx}", type="primary", use_container_width=True):
-                        delete_document(
-                            qdrant_manager,
-                            selected_collection,
-                            unique_id,
-                            doc["document_name"]
-                        )
-                with dc2:
-                     if st.button("Cancel", key=f"confirm_no_doc_{idx}", use_container_width=True):
-                        st.session_state[f"confirm_delete_doc_{unique_id}"] = False
-                        st.rerun()
-
-def delete_document(qdrant_manager, collection_name, unique_document_id, document_name):
+        st.caption(f"{len(results)} result(s) in {elapsed_ms:.0f} ms")
+        for result in results:
+            unique_id = result["unique_document_id"]
+            page_number = result["page_number"]
+            r1, r2 = st.columns([1, 3])
+            with r1:
+                # The browser fetches (and caches) thumbnails from the asset server when it runs
+                image = page_url(unique_id, page_number) or PageStore().read_page(unique_id, page_number)
+                if image is not None:
+                    st.image(image, use_container_width=True)
+            with r2:
+                st.markdown(f"**{result['document_name']}** — page {page_number}")
+                st.caption(f"Score: {result['score']:.3f} | ID: `{unique_id}`")
+
+def render_document_row(qdrant_manager, collection_name, doc):
+    """Render a single catalog entry with its actions and (if opened) the PDF viewer"""
+    unique_id = doc["unique_id"]
+    display_name = doc.get("original_name", unique_id)
+    pdf_path = doc.get("pdf_path")
+    
+    # Fallback for PDF path if not in metadata (or moved) but exists on disk
+    if not pdf_path or not os.path.exists(pdf_path):
+         pdf_path = PageStore().find_pdf(unique_id)
+
+    is_open = st.session_state.get("open_document") == unique_id
+
+    with st.container(border=True):
+        # Header
+        c1, c2, c4, c3 = st.columns([4, 1, 1, 1])
+        with c1:
+            st.markdown(f"#### 📄 {display_name}")
+            st.caption(f"ID: `{unique_id}` | Pages: {doc.get('total_pages', 0)} | Date: {doc.get('upload_date', '')}")
+            if not pdf_path:
+                st.caption("PDF file not available")
+
+        with c2:
+            if pdf_path:
+                if st.button("Close" if is_open else "📄 View", key=f"view_btn_{unique_id}", use_container_width=True):
+                    st.session_state.open_document = None if is_open else unique_id
+                    st.rerun()
+
+        with c4:
+            if st.button("🔁 Update", key=f"update_btn_{unique_id}", use_container_width=True,
+                         help="Replace the PDF; only changed pages are re-embedded"):
+                st.session_state.update_document = None if st.session_state.get("update_document") == unique_id else unique_id
+
+        with c3:
+            if st.button("🗑️ Delete", key=f"del_btn_{unique_id}", type="secondary", use_container_width=True):
+                st.session_state[f"confirm_delete_doc_{unique_id}"] = True
+
+        # The viewer is only sent to the browser for the one explicitly opened document
+        if is_open and pdf_path and os.path.exists(pdf_path):
+            pdf_url = html.escape(document_url(pdf_path))
+            pdf_display = f'<iframe src="{pdf_url}" width="100%" height="800" type="application/pdf"></iframe>'
+            st.markdown(pdf_display, unsafe_allow_html=True)
+
+        if st.session_state.get("update_document") == unique_id:
+            render_update_form(collection_name, unique_id)
+
+        # Delete Confirmation
+        if st.session_state.get(f"confirm_delete_doc_{unique_id}", False):
+            st.error("Delete this document and all its embeddings?")
+            dc1, dc2 = st.columns(2)
+            with dc1:
+                 if st.button("Yes, Delete", key=f"confirm_yes_doc_{unique_id}", type="primary", use_container_width=True):
+                    delete_document(
+                        qdrant_manager,
+                        collection_name,
+                        unique_id,
+                        display_name,
+                        shard_key=doc.get("shard_key"),
+                        tenant_id=doc.get("tenant_id")
+                    )
+            with dc2:
+                 if st.button("Cancel", key=f"confirm_no_doc_{unique_id}", use_container_width=True):
+                    st.session_state[f"confirm_delete_doc_{unique_id}"] = False
+                    st.rerun()
+
+def render_update_form(collection_name, unique_id):
+    """Upload a new version of a document's PDF and re-embed the pages that changed"""
+    new_file = st.file_uploader("New version of the PDF", type=["pdf"], key=f"update_file_{unique_id}")
+    if not new_file or not st.button("Update document", key=f"update_go_{unique_id}", type="primary"):
+        return
+
+    # Imported here: pulls in the model stack
+    import tempfile
+    from document_processor import DocumentProcessor
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
+        tmp_file.write(new_file.getvalue())
+        tmp_file_path = tmp_file.name
+    try:
+        progress_placeholder = st.empty()
+        with st.spinner("Updating..."):
+            summary = DocumentProcessor(collection_name).update_document(
+                unique_id,
+                tmp_file_path,
+                batch_size=config.DEFAULT_BATCH_SIZE,
+                convert_batch_size=config.DEFAULT_CONVERT_BATCH_SIZE,
+                progress_callback=lambda current, total: progress_placeholder.caption(
+                    f"Checked {current}/{total} pages"
+                ),
+            )
+        st.success(
+            f"Updated: {len(summary['changed'])} page(s) re-embedded, {summary['unchanged']} unchanged, "
+            f"{len(summary['removed'])} removed"
+        )
+        st.session_state.update_document = None
+    except Exception as e:
+        st.error(f"Error updating document: {e}")
+    finally:
+        try:
+            os.unlink(tmp_file_path)
+        except OSError:
+            pass
+
+def delete_document(qdrant_manager, collection_name, unique_document_id, document_name, shard_key=None, tenant_id=None):
     """Delete a document from the collection and remove its images"""
     
     with st.spinner("Deleting..."):
         # Delete from Qdrant
-        if qdrant_manager.delete_document_from_collection(collection_name, unique_document_id):
-            
-            # Delete images (check both new and old paths)
-            paths_to_check = [
-                os.path.join(config.IMAGES_BASE_PATH, unique_document_id),
-                os.path.join(config.IMAGES_BASE_PATH, document_name)
-            ]
+        if qdrant_manager.delete_document_from_collection(
+            collection_name, unique_document_id, shard_key=shard_key, tenant_id=tenant_id
+        ):
             
-            for path in paths_to_check:
-                if os.path.exists(path):
-                    try:
-                        shutil.rmtree(path)
-                    except Exception as e:
-                        print(f"Warning: Could not delete images at {path}: {e}")
-
-            # Also delete PDF from Documents folder if exists
-            pdf_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Documents", f"{unique_document_id}.pdf")
-            if os.path.exists(pdf_path):
-                try:
-                    os.unlink(pdf_path)
-                except:
-                    pass
-
-            # Remove from metadata store
-            metadata_store.delete_document(unique_document_id)
+            delete_document_files(collection_name, unique_document_id, document_name)
             
             st.success(f"Deleted document")
             st.session_state[f"confirm_delete_doc_{unique_document_id}"] = False
             st.rerun()
         else:
             st.error("Failed to delete from vector store")
+
+def delete_document_files(collection_name, unique_document_id, document_name):
+    """Remove a document's images, local vectors, PDF and catalog entry"""
+    # Page archive and PDF (plus image folders of the old layouts)
+    PageStore().delete_document(unique_document_id, legacy_names=[document_name])
+
+    # Local vector copy used for exact reranking
+    PageVectorStore().delete_document(collection_name, unique_document_id)
+
+    # Remove from metadata store
+    get_metadata_store().delete_document(unique_document_id)
@@ -0,0 +1,61 @@
+"""
+Profiling Panel - Sidebar breakdown of the last reruns (debug mode only)
+"""
+
+import streamlit as st
+import pandas as pd
+from profiling import RerunProfiler, SCRIPT_PROFILERS
+
+
+def render(profiler: RerunProfiler):
+    """Render the profiling panel in the sidebar"""
+
+    with st.sidebar.expander("⏱️ Profiling", expanded=True):
+        if not profiler.history:
+            st.caption("No reruns recorded yet.")
+            return
+
+        last = profiler.history[-1]
+        col1, col2 = st.columns(2)
+        col1.metric("Rerun", f"{last['total_ms']:.0f} ms")
+        col2.metric("Qdrant Calls", last["round_trips"])
+
+        calls = RerunProfiler.summarize(last)
+        if calls:
+            st.dataframe(
+                pd.DataFrame(calls),
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "call": st.column_config.TextColumn("Call"),
+                    "count": st.column_config.NumberColumn("#", format="%d"),
+                    "total_ms": st.column_config.NumberColumn("ms", format="%.1f"),
+                },
+            )
+        else:
+            st.caption("No QdrantManager or MetadataStore calls in this rerun.")
+
+        st.caption("History")
+        history = pd.DataFrame([
+            {
+                "Page": record["page"] or "(interrupted)",
+                "ms": round(record["total_ms"], 1),
+                "Qdrant Calls": record["round_trips"],
+                "Calls": len(record["calls"]),
+            }
+            for record in profiler.history
+        ])
+        st.dataframe(history.iloc[::-1], hide_index=True, use_container_width=True)
+
+        st.selectbox(
+            "Script profiler",
+            ["Off", *SCRIPT_PROFILERS],
+            key="profiling_script_profiler",
+            help="Profiles the whole script from the next rerun on",
+        )
+        if "profile" in last:
+            st.code(last["profile"], language=None)
+
+        if st.button("Clear History", use_container_width=True):
+            profiler.history.clear()
+            st.rerun()
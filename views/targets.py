@@ -0,0 +1,85 @@
+"""
+Target selection shared by the Upload and Manage pages: tenants of
+multi-tenant collections are listed like collections ("collection › tenant")
+"""
+
+import streamlit as st
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from collection_stats import get_collector
+
+if TYPE_CHECKING:
+    from qdrant_manager import QdrantManager
+
+# Tenant placeholder for "create a new tenant" entries
+NEW_TENANT = ""
+
+
+def list_targets(
+    qdrant_manager: 'QdrantManager', collections: List[str], new_tenant: bool = False
+) -> List[Tuple[str, Optional[str]]]:
+    """List (collection, tenant_id) pairs; tenant_id is None for plain collections
+
+    Tenants are read from the cached collection stats snapshot.
+
+    Args:
+        qdrant_manager: QdrantManager instance
+        collections: Collection names
+        new_tenant: Add a NEW_TENANT entry for every multi-tenant collection
+    """
+    collector = get_collector(qdrant_manager)
+    targets = []
+    for collection in collections:
+        flags = collector.flags(collection)
+        if not flags.get("multi_tenant"):
+            targets.append((collection, None))
+            continue
+        targets.extend((collection, tenant) for tenant in flags.get("tenant_ids", []))
+        if new_tenant:
+            targets.append((collection, NEW_TENANT))
+    return targets
+
+
+def format_target(target: Tuple[str, Optional[str]]) -> str:
+    collection, tenant = target
+    if tenant is None:
+        return collection
+    if tenant == NEW_TENANT:
+        return f"{collection} › ➕ New tenant"
+    return f"{collection} › {tenant}"
+
+
+def select_target(
+    qdrant_manager: 'QdrantManager',
+    collections: List[str],
+    label: str,
+    new_tenant: bool = False,
+    **kwargs,
+) -> Tuple[Optional[str], Optional[str]]:
+    """Selectbox over collections and tenants, remembered in the session
+
+    Returns:
+        (collection, tenant_id); tenant_id is None for plain collections and
+        None with a collection when a new tenant was chosen but not yet named
+    """
+    targets = list_targets(qdrant_manager, collections, new_tenant=new_tenant)
+    if not targets:
+        st.info("No tenants yet.")
+        return None, None
+
+    current = (st.session_state.get("selected_collection"), st.session_state.get("selected_tenant"))
+    if current not in targets:
+        current = next((t for t in targets if t[0] == current[0]), targets[0])
+
+    collection, tenant = st.selectbox(
+        label,
+        targets,
+        index=targets.index(current),
+        format_func=format_target,
+        **kwargs,
+    )
+    st.session_state.selected_collection = collection
+    st.session_state.selected_tenant = tenant
+
+    if tenant == NEW_TENANT:
+        tenant = st.text_input("New tenant", placeholder="e.g. team or customer name").strip() or None
+    return collection, tenant
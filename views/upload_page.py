@@ -7,8 +7,11 @@ from typing import TYPE_CHECKING
 import os
 import sys
 import tempfile
+from contextlib import nullcontext
 import config
-from document_processor import DocumentProcessor
+from metadata_store import get_metadata_store
+from collection_stats import get_collector
+from views.targets import select_target
 
 if TYPE_CHECKING:
     from qdrant_manager import QdrantManager
@@ -21,6 +24,7 @@ def render(qdrant_manager: 'QdrantManager'):
     """Render the document upload page"""
     
     st.title("Upload Document")
+    model_ready = render_model_status()
     
     # Get collections
     collections = qdrant_manager.list_collections()
@@ -38,23 +42,41 @@ def render(qdrant_manager: 'QdrantManager'):
     with center_col:
         with st.container(border=True):
             st.subheader("Select Target")
-            # Collection Selection
-            default_idx = 0
-            if st.session_state.get('selected_collection') in collections:
-                default_idx = collections.index(st.session_state.selected_collection)
-            
-            selected_collection = st.selectbox(
-                "Collection",
+            # Collection Selection (tenants of multi-tenant collections are listed like collections)
+            selected_collection, tenant_id = select_target(
+                qdrant_manager,
                 collections,
-                index=default_idx,
+                "Collection",
+                new_tenant=True,
                 label_visibility="collapsed"
             )
-            st.session_state.selected_collection = selected_collection
+            if selected_collection is None:
+                return
+            needs_tenant = st.session_state.get('selected_tenant') is not None
             
             # Tiny stat
-            stats = qdrant_manager.get_collection_stats(selected_collection)
-            if stats:
-                st.caption(f"Contains {stats.get('total_documents', 0)} documents")
+            if tenant_id is not None:
+                st.caption(f"Contains {get_metadata_store().count_documents(selected_collection, tenant_id)} documents")
+            elif not needs_tenant:
+                stats = get_collector(qdrant_manager).snapshot().get(selected_collection)
+                if stats and stats.get('total_documents') is not None:
+                    more = "+" if stats.get('documents_lower_bound') else ""
+                    st.caption(f"Contains {stats.get('total_documents', 0)}{more} documents")
+            
+            # Custom-sharded collections route each document to a shard key
+            shard_key = None
+            new_shard_key = False
+            flags = get_collector(qdrant_manager).flags(selected_collection)
+            if flags.get("custom_sharding"):
+                shard_keys = list(flags.get("shard_keys") or [])
+                shard_key = st.selectbox(
+                    "Shard Key",
+                    shard_keys + ["➕ New shard key"],
+                    help="Documents are stored on, and can be searched within, the shards of this key"
+                )
+                if shard_key == "➕ New shard key":
+                    shard_key = st.text_input("New shard key", placeholder="e.g. tenant or year").strip() or None
+                    new_shard_key = True
 
         st.markdown("") # Spacer
 
@@ -83,9 +105,42 @@ def render(qdrant_manager: 'QdrantManager'):
                 "PDF Conversion Batch Size",
                 min_value=5, max_value=50, value=config.DEFAULT_CONVERT_BATCH_SIZE
             )
+            bulk_load = st.checkbox(
+                "Bulk load (defer indexing)",
+                value=False,
+                help="Qdrant indexes the new pages once after all files instead of while they are "
+                     "uploaded; faster for large batches into a small collection, new pages are searched "
+                     "exhaustively meanwhile"
+            )
+            wait_for_index = st.checkbox(
+                "Wait for indexing to finish", value=False, disabled=not bulk_load
+            )
         
         if uploaded_files:
             if st.button("Start Processing", type="primary", use_container_width=True):
+                if needs_tenant and not tenant_id:
+                    st.error("Name the new tenant for the documents.")
+                    return
+                if qdrant_manager.uses_shard_keys(selected_collection) and not shard_key:
+                    st.error("Choose a shard key for the documents.")
+                    return
+                if new_shard_key and not qdrant_manager.add_shard_key(selected_collection, shard_key):
+                    st.error(f"Could not create shard key '{shard_key}'.")
+                    return
+                if new_shard_key:
+                    get_collector(qdrant_manager).invalidate()
+                
+                # Uploads wait here (files already received) until the warm-up has loaded the model
+                if not model_ready:
+                    from embedding_model import wait_until_ready
+                    with st.spinner("Waiting for the embedding model to finish loading..."):
+                        if not wait_until_ready():
+                            st.error("The embedding model could not be loaded.")
+                            return
+
+                # Imported here: pulls in the model stack, only needed once processing starts
+                from document_processor import DocumentProcessor
+
                 # Initialize processor once for all documents
                 processor = DocumentProcessor(selected_collection)
                 
@@ -98,61 +153,69 @@ def render(qdrant_manager: 'QdrantManager'):
                 successful_uploads = []
                 failed_uploads = []
                 
-                # Process each file
-                for file_idx, uploaded_file in enumerate(uploaded_files):
-                    # Save uploaded file to temp
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                        tmp_file.write(uploaded_file.getvalue())
-                        tmp_file_path = tmp_file.name
+                bulk = qdrant_manager.bulk_load(selected_collection, wait=wait_for_index) if bulk_load else nullcontext()
+                with bulk:
+                    # Process each file
+                    for file_idx, uploaded_file in enumerate(uploaded_files):
+                        # Save uploaded file to temp
+                        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
+                            tmp_file.write(uploaded_file.getvalue())
+                            tmp_file_path = tmp_file.name
                     
-                    try:
-                        # Create a status container for this document
-                        status_container = st.status(
-                            f"Processing {uploaded_file.name}...", 
-                            expanded=True
-                        )
-                        with status_container:
-                            st.write(f"📄 Document {file_idx + 1} of {len(uploaded_files)}")
+                        try:
+                            # Create a status container for this document
+                            status_container = st.status(
+                                f"Processing {uploaded_file.name}...", 
+                                expanded=True
+                            )
+                            with status_container:
+                                st.write(f"📄 Document {file_idx + 1} of {len(uploaded_files)}")
                             
-                            # Create a placeholder for page progress
-                            progress_placeholder = st.empty()
+                                # Create a placeholder for page progress
+                                progress_placeholder = st.empty()
                             
-                            # Process document with progress callback
-                            unique_id = processor.process_document(
-                                temp_file_path=tmp_file_path,
-                                original_filename=uploaded_file.name,
-                                batch_size=batch_size,
-                                convert_batch_size=convert_batch_size,
-                                progress_callback=lambda current, total: progress_placeholder.write(
-                                    f"📊 Pages processed: {current}/{total}"
+                                # Process document with progress callback
+                                unique_id = processor.process_document(
+                                    temp_file_path=tmp_file_path,
+                                    original_filename=uploaded_file.name,
+                                    batch_size=batch_size,
+                                    convert_batch_size=convert_batch_size,
+                                    event_callback=lambda event: progress_placeholder.write(
+                                        format_progress(event)
+                                    ),
+                                    shard_key=shard_key,
+                                    tenant_id=tenant_id
                                 )
-                            )
                             
-                            st.write("✅ Complete!")
-                            status_container.update(
-                                label=f"✅ {uploaded_file.name}", 
-                                state="complete", 
-                                expanded=False
-                            )
+                                st.write("✅ Complete!")
+                                status_container.update(
+                                    label=f"✅ {uploaded_file.name}", 
+                                    state="complete", 
+                                    expanded=False
+                                )
                         
-                        successful_uploads.append(uploaded_file.name)
+                            successful_uploads.append(uploaded_file.name)
                         
-                    except Exception as e:
-                        st.error(f"❌ Error processing {uploaded_file.name}: {e}")
-                        failed_uploads.append((uploaded_file.name, str(e)))
-                    finally:
-                        try:
-                            os.unlink(tmp_file_path)
-                        except:
-                            pass
+                        except Exception as e:
+                            st.error(f"❌ Error processing {uploaded_file.name}: {e}")
+                            failed_uploads.append((uploaded_file.name, str(e)))
+                        finally:
+                            try:
+                                os.unlink(tmp_file_path)
+                            except:
+                                pass
                     
-                    # Update overall progress
-                    progress_pct = (file_idx + 1) / len(uploaded_files)
-                    overall_progress.progress(
-                        progress_pct, 
-                        text=f"Completed {file_idx + 1}/{len(uploaded_files)} documents"
-                    )
+                        # Update overall progress
+                        progress_pct = (file_idx + 1) / len(uploaded_files)
+                        overall_progress.progress(
+                            progress_pct, 
+                            text=f"Completed {file_idx + 1}/{len(uploaded_files)} documents"
+                        )
                 
+                if successful_uploads:
+                    # Document counts and new tenants show up on the next snapshot
+                    get_collector(qdrant_manager).invalidate()
+
                 # Show final summary
                 st.markdown("---")
                 if successful_uploads:
@@ -167,3 +230,37 @@ def render(qdrant_manager: 'QdrantManager'):
                 
                 if st.button("Upload More Documents"):
                     st.rerun()
+
+def render_model_status() -> bool:
+    """Start the model warm-up if needed and show whether the model is ready
+
+    Returns:
+        True if the model is loaded, or warm-up is off (processing then loads it itself)
+    """
+    if config.MODEL_WARMUP == "off":
+        return True
+    from embedding_model import start_warmup
+
+    status = start_warmup()
+    if status["state"] == "ready":
+        st.caption(f"🟢 Embedding model ready (loaded in {status['seconds'] or 0:.0f}s)")
+        return True
+    if status["state"] == "failed":
+        st.caption(f"🔴 Embedding model could not be loaded: {status['error']}")
+        if st.button("Retry loading the model"):
+            start_warmup(retry=True)
+            st.rerun()
+        return False
+    st.caption("🟡 Loading the embedding model... uploads start as soon as it is ready")
+    return False
+
+def format_progress(event):
+    """Progress line with throughput and ETA from a DocumentProcessor progress event"""
+    line = (
+        f"📊 Pages processed: {event['pages_processed']}/{event['total_pages']} • "
+        f"{event['pages_per_second']:.2f} pages/s"
+    )
+    if event.get("eta_seconds") is not None:
+        minutes, seconds = divmod(int(event["eta_seconds"]), 60)
+        line += f" • ETA {minutes}m {seconds:02d}s"
+    return line